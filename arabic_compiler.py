@@ -0,0 +1,292 @@
+"""
+Command-Line Batch Compiler for the Arabic Programming Language
+المترجم من سطر الأوامر - ترجمة كل برامج مجلد على عدة عمليات دون الواجهة
+
+كل ملف مصدر (.txt / .code) في الشجرة يُترجم إلى ملف .py بجانبه عبر الواجهة
+الأمامية المباشرة (ASTBuilder) التي تُبلغ عن الأخطاء النحوية. العمليات العاملة
+تُحمّل ذاكرة DFA مرة عند بدئها، وحالات DFA في ANTLR مشتركة بين كل نسخ المحلل
+المعجمي داخل العملية، فكل ملف بعد ذلك يُحلَّل معجمياً بمحلل دافئ. الملفات التي لم
+تتغير (نفس mtime والحجم، أو نفس بصمة sha256) منذ آخر بناء بنفس الخيارات
+ونسخة المترجم تُتخطى، وسجلها في BUILD_MANIFEST بجذر المجلد. النتيجة ملخص
+JSON على stdout.
+
+Every source file (.txt / .code) in the tree is compiled to a .py file
+next to it by the direct front end (ASTBuilder), which reports syntax
+errors. Worker processes load the DFA cache once at start-up, and ANTLR
+shares DFA states between all lexer instances in a process, so every
+file after that is tokenized by a warm lexer. Files unchanged since the
+last build with the same options and compiler version (same mtime and
+size, or failing that the same sha256) are skipped; their record lives
+in BUILD_MANIFEST at the root of the tree. The result is a JSON summary
+on stdout.
+
+مصدران بنفس الاسم (foo.txt و foo.code) يفشلان معاً لأن ناتجهما foo.py واحد،
+وملف .py بناه بناء سابق يُحذف إذا فشل مصدره الآن.
+Two sources with the same stem (foo.txt and foo.code) both fail, since
+they would write the same foo.py; a .py written by an earlier build is
+deleted when its source now fails.
+
+Usage:
+    python -m arabic_compiler build submissions/ --jobs 8
+    python -m arabic_compiler build submissions/ --force --fast-io
+
+رمز الخروج 1 إذا فشلت ترجمة أي ملف - The exit status is 1 if any file failed.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from compilation_unit import CompilationUnit
+from compile_cache import COMPILER_VERSION
+from dfa_cache import DEFAULT_CACHE_PATH, SOURCE_EXTENSIONS, load_dfa_cache
+
+
+# سجل آخر بناء في جذر المجلد - Last build's record, at the root of the tree
+BUILD_MANIFEST = '.arabic_build.json'
+
+
+# ==================== Worker Side ====================
+
+def _init_worker(dfa_path):
+    """تهيئة العملية العاملة: تسخين المحلل المعجمي - Worker start-up: warm the lexer"""
+    if dfa_path:
+        load_dfa_cache(dfa_path)
+
+
+def file_digest(path):
+    """بصمة sha256 لملف - sha256 of a file's bytes"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def output_path_for(source_path):
+    """ملف .py بجانب المصدر - The .py file next to a source"""
+    return os.path.splitext(source_path)[0] + '.py'
+
+
+def compile_file(source_path, fast_io=False):
+    """ترجمة ملف واحد وكتابة .py بجانبه - Compile one file and write the .py next to it
+
+    الكود يُبث إلى ملف مؤقت يحل محل الناتج عند الاكتمال فقط، ويُحذف إن فشلت
+    الكتابة.
+    The code is streamed to a temporary file that replaces the output
+    only once complete, and is removed if writing fails.
+
+    Returns:
+        dict: الحالة ('compiled' / 'failed') والأخطاء وبيانات الملف للسجل
+              status ('compiled' / 'failed'), errors and the file's manifest data
+    """
+    start = time.perf_counter()
+    stat = os.stat(source_path)
+    with open(source_path, 'rb') as f:
+        data = f.read()
+    result = {
+        'source': source_path,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': hashlib.sha256(data).hexdigest(),
+    }
+
+    output_path = output_path_for(source_path)
+    temporary_path = output_path + '.tmp'
+    try:
+        unit = CompilationUnit(data.decode('utf-8'), front_end='direct', fast_io=fast_io)
+        errors = [str(error) for error in unit.errors]
+        if not errors:
+            with open(temporary_path, 'w', encoding='utf-8') as f:
+                unit.write_python(f)
+            os.replace(temporary_path, output_path)
+    except Exception as e:
+        errors = [f"{type(e).__name__}: {e}"]
+    finally:
+        try:
+            os.remove(temporary_path)
+        except FileNotFoundError:
+            pass
+
+    result['status'] = 'failed' if errors else 'compiled'
+    result['errors'] = errors
+    result['seconds'] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def _compile_task(task):
+    return compile_file(*task)
+
+
+# ==================== Build ====================
+
+def find_sources(root):
+    """ملفات المصدر في شجرة، بترتيب ثابت - Source files in a tree, in a stable order"""
+    sources = []
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(d for d in subdirectories if not d.startswith('.') and d != '__pycache__')
+        sources.extend(os.path.join(directory, name) for name in sorted(files) if name.endswith(SOURCE_EXTENSIONS))
+    return sources
+
+
+def load_manifest(path):
+    """سجل البناء السابق أو سجل فارغ - The previous build record, or an empty one"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(path, manifest):
+    """حفظ سجل البناء - Save the build record"""
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporary_path, path)
+
+
+def remove_output(source_path):
+    """حذف ملف .py لمصدر إن وُجد - Delete a source's .py file, if there is one"""
+    try:
+        os.remove(output_path_for(source_path))
+    except FileNotFoundError:
+        pass
+
+
+def is_unchanged(source_path, entry):
+    """هل الملف كما سُجل في البناء السابق؟ - Is the file as recorded by the previous build?
+
+    mtime والحجم أولاً، وعند اختلافهما بصمة المحتوى (ملف نُسخ أو لُمس فقط).
+    mtime and size first; when they differ, the content hash (a file that
+    was only copied or touched). A matching hash refreshes the entry.
+    """
+    if entry is None:
+        return False
+    if entry['status'] == 'compiled' and not os.path.exists(output_path_for(source_path)):
+        return False
+    stat = os.stat(source_path)
+    if stat.st_mtime_ns == entry['mtime_ns'] and stat.st_size == entry['size']:
+        return True
+    if file_digest(source_path) != entry['sha256']:
+        return False
+    entry['mtime_ns'], entry['size'] = stat.st_mtime_ns, stat.st_size
+    return True
+
+
+def build(root, jobs=None, force=False, fast_io=False, dfa_path=DEFAULT_CACHE_PATH):
+    """ترجمة كل ملفات المصدر في مجلد - Compile every source file in a directory
+
+    Args:
+        root: المجلد - the directory
+        jobs: عدد العمليات (عدد المعالجات افتراضياً؛ 1 في نفس العملية)
+              worker processes (CPU count by default; 1 runs in-process)
+        force: ترجمة كل الملفات ولو لم تتغير - compile even unchanged files
+        fast_io: توليد بـ arabic_runtime لـ اطبع/اقرا - generate with arabic_runtime I/O
+        dfa_path: ملف ذاكرة DFA للتسخين - DFA cache file to warm from
+
+    Returns:
+        dict: الملخص - the summary
+    """
+    start = time.perf_counter()
+    jobs = jobs or os.cpu_count() or 1
+    manifest_path = os.path.join(root, BUILD_MANIFEST)
+    options = {'compiler_version': COMPILER_VERSION, 'fast_io': fast_io}
+    manifest = load_manifest(manifest_path)
+    previous = manifest.get('files', {}) if manifest.get('options') == options and not force else {}
+
+    sources = find_sources(root)
+    outputs = {}
+    for source_path in sources:
+        outputs.setdefault(output_path_for(source_path), []).append(source_path)
+
+    files = {}
+    results = []
+    tasks = []
+    for source_path in sources:
+        key = os.path.relpath(source_path, root)
+        same_output = outputs[output_path_for(source_path)]
+        if len(same_output) > 1:
+            others = ", ".join(os.path.relpath(path, root) for path in same_output if path != source_path)
+            results.append({'source': source_path, 'status': 'failed',
+                            'errors': [f"نفس ملف الناتج مثل - same output file as: {others}"]})
+            continue
+        entry = previous.get(key)
+        if is_unchanged(source_path, entry):
+            files[key] = entry
+            results.append({'source': source_path, 'status': 'unchanged' if entry['status'] == 'compiled' else 'failed',
+                            'errors': entry['errors']})
+        else:
+            tasks.append((source_path, fast_io))
+
+    if jobs > 1 and len(tasks) > 1:
+        chunksize = max(1, len(tasks) // (jobs * 8))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(dfa_path,)) as executor:
+            compiled = list(executor.map(_compile_task, tasks, chunksize=chunksize))
+    else:
+        _init_worker(dfa_path)
+        compiled = [_compile_task(task) for task in tasks]
+
+    for result in compiled:
+        files[os.path.relpath(result['source'], root)] = {
+            name: result[name] for name in ('mtime_ns', 'size', 'sha256', 'status', 'errors')
+        }
+        results.append({name: result[name] for name in ('source', 'status', 'errors', 'seconds')})
+
+    # ناتج بناء سابق لمصدر فشل الآن قديم
+    # An earlier build's output for a source that now fails is stale
+    built = manifest.get('files', {})
+    for result in results:
+        entry = built.get(os.path.relpath(result['source'], root))
+        if result['status'] == 'failed' and entry is not None and entry['status'] == 'compiled':
+            try:
+                remove_output(result['source'])
+            except OSError as e:
+                result['errors'].append(f"{type(e).__name__}: {e}")
+    save_manifest(manifest_path, {'options': options, 'files': files})
+
+    results.sort(key=lambda result: result['source'])
+    counts = {status: 0 for status in ('compiled', 'unchanged', 'failed')}
+    for result in results:
+        counts[result['status']] += 1
+    return {
+        'root': root,
+        'jobs': jobs,
+        'files': len(results),
+        **counts,
+        'seconds': round(time.perf_counter() - start, 3),
+        'failures': [result for result in results if result['status'] == 'failed'],
+    }
+
+
+# ==================== Command Line ====================
+
+def main(argv=None):
+    """نقطة الدخول من سطر الأوامر - Command-line entry point"""
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(prog='python -m arabic_compiler',
+                                         description="المترجم من سطر الأوامر - Command-line compiler")
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help="ترجمة كل ملفات مجلد - Compile every file in a directory")
+    build_parser.add_argument('directory', help="مجلد ملفات المصدر - source directory")
+    build_parser.add_argument('-j', '--jobs', type=int, default=None,
+                              help="عدد العمليات (عدد المعالجات افتراضياً) - worker processes (default: CPU count)")
+    build_parser.add_argument('--force', action='store_true', help="ترجمة الملفات غير المتغيرة أيضاً - rebuild unchanged files")
+    build_parser.add_argument('--fast-io', action='store_true',
+                              help="اطبع/اقرا عبر arabic_runtime - buffered print/read through arabic_runtime")
+    build_parser.add_argument('--dfa-cache', default=DEFAULT_CACHE_PATH, help="ملف ذاكرة DFA - DFA cache file")
+
+    args = arg_parser.parse_args(argv)
+    if not os.path.isdir(args.directory):
+        arg_parser.error(f"ليس مجلداً - not a directory: {args.directory}")
+
+    summary = build(args.directory, args.jobs, args.force, args.fast_io, args.dfa_cache)
+    json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Runtime Support for Generated Programs
+وقت التشغيل للبرامج المولدة - إدخال وإخراج مخزَّن لـ اطبع و اقرا
+
+الكود المولد بخيار fast_io ينشئ Streams عند بدئه ويستخدمها بدلاً من print و
+input. كل خطوة لكل قيمة تجري في C: الإدخال مكرر كلمات (itertools.chain على
+أسطر sys.stdin)، والإخراج سطر كامل يُنسَّق بعامل % ويُكتب في ملف نصي
+بمخزن OUTPUT_BUFFER بايت على نفس واصف sys.stdout، يُفرَّغ عند امتلائه وعند
+نهاية البرنامج.
+
+Code generated with fast_io creates a Streams when it starts and uses it
+instead of print and input. Every per-value step runs in C: input is a
+token iterator (itertools.chain over the lines of sys.stdin), and each
+output line is built with %-formatting (_write("%s %s\\n" % (...))) and
+written to a text file with an OUTPUT_BUFFER-byte buffer on sys.stdout's
+file descriptor, flushed when full and when the program ends.
+
+مخرج بلا واصف ملف (StringIO، أنبوب محرك التنفيذ) يُكتب إليه مباشرة.
+An output stream with no file descriptor (StringIO, the execution
+engine's pipe) is written to directly.
+"""
+
+import io
+import sys
+from itertools import chain
+
+
+# حجم مخزن الإخراج بالبايت - Output buffer size in bytes
+OUTPUT_BUFFER = 1 << 16
+
+# قيم الإدخال المنطقية الصحيحة - Input spellings read as true
+_TRUE_WORDS = ('صح', 'true', '1', 'yes')
+
+
+def _end_of_input():
+    """نهاية مكرر الكلمات - The end of the token iterator"""
+    raise EOFError("انتهى الإدخال - end of input")
+    yield
+
+
+class Streams:
+    """إدخال وإخراج برنامج مولد واحد - Input and output of one generated program
+
+    Args:
+        stdin: مصدر الإدخال (sys.stdin افتراضياً) - input source, sys.stdin by default
+        stdout: وجهة الإخراج (sys.stdout افتراضياً) - output target, sys.stdout by default
+        buffer_size: حجم مخزن الإخراج - output buffer size
+
+    token() تُرجع الكلمة التالية (نص بلا مسافات)، و read_line() السطر التالي كاملاً
+    للنصوص كما كان input() يفعل؛ كلمات باقية في السطر الحالي تبقى لـ token().
+    token() returns the next whitespace-separated word, and read_line() the
+    next whole line for text, the way input() did; words left on the
+    current line stay queued for token().
+    """
+
+    def __init__(self, stdin=None, stdout=None, buffer_size=OUTPUT_BUFFER):
+        self.stdin = stdin if stdin is not None else sys.stdin
+        self.output = self._open_output(stdout if stdout is not None else sys.stdout, buffer_size)
+        self.interactive = self.stdin.isatty()
+        lines = self._prompted_lines() if self.interactive else self.stdin
+        self.token = chain(chain.from_iterable(map(str.split, lines)), _end_of_input()).__next__
+        self.write = self.output.write
+
+    @staticmethod
+    def _open_output(stream, buffer_size):
+        """ملف نصي مخزَّن على واصف المخرج، أو المخرج نفسه - A buffered text file on the stream's descriptor, or the stream itself"""
+        try:
+            fileno = stream.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return stream
+        stream.flush()
+        return open(fileno, 'w', encoding=getattr(stream, 'encoding', None) or 'utf-8',
+                    errors=getattr(stream, 'errors', None) or 'strict',
+                    buffering=buffer_size, closefd=False)
+
+    def _prompted_lines(self):
+        """أسطر طرفية تفاعلية، بعد إظهار المخرجات السابقة - Terminal lines, after showing pending output"""
+        while True:
+            self.output.flush()
+            line = self.stdin.readline()
+            if not line:
+                return
+            yield line
+
+    def read_bool(self):
+        """قراءة منطقي - Read a boolean"""
+        return self.token().lower() in _TRUE_WORDS
+
+    def read_line(self):
+        """قراءة سطر نصي - Read a line of text
+
+        Raises:
+            EOFError: انتهى الإدخال - end of input
+        """
+        if self.interactive:
+            self.output.flush()
+        line = self.stdin.readline()
+        if not line:
+            raise EOFError("انتهى الإدخال - end of input")
+        return line[:-1] if line.endswith('\n') else line
+
+    def flush(self):
+        """تفريغ مخزن الإخراج - Flush the output buffer"""
+        self.output.flush()
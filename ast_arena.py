@@ -0,0 +1,487 @@
+"""
+Flat AST Arena for Arabic Programming Language
+ساحة AST المسطحة - عقد الشجرة في مصفوفات متوازية تُفهرس بأرقام صحيحة
+
+كل عقدة رقم صحيح (id)، وخصائصها في مصفوفات array متوازية: النوع، السطر،
+العمود، بداية الأبناء وعددهم في مصفوفة children، ورقم الحمولة (القيم غير
+العقدية مثل الاسم والعامل والقيمة) في جدول حمولات مشترك بلا تكرار. العقد
+تُضاف بعد أبنائها، فترتيب الأرقام ترتيب لاحق (post-order).
+
+Every node is an integer id; its kind, line, column, child range and
+payload index live in parallel typed arrays. Non-node fields (names,
+operators, literal values) are stored once each in a shared payload table.
+Nodes are added after their children, so ids are in post-order.
+
+الحقول التي تحمل قائمة عقد (statements، arguments، ...) تُخزن كعقدة قائمة
+(LIST_KIND) أبناؤها العناصر؛ والابن الغائب (None) رقمه -1.
+List-valued fields are stored as a LIST_KIND node whose children are the
+items; a missing child (None) is -1.
+
+ArenaBuilder يسطّح كل عبارة فور تحليلها، فالذاكرة القصوى أثناء البناء بحجم
+أكبر عبارة وليس البرنامج كله. ArenaVisitor (ومنه UsageAnalyzer) يمر على
+الأرقام مباشرة دون إنشاء كائنات.
+ArenaBuilder flattens each statement as soon as it is parsed, so peak
+memory while building is bounded by the largest statement. ArenaVisitor
+(and UsageAnalyzer on top of it) works on ids directly, without allocating.
+
+arena.view(id) يُرجع كائن عرض من صنف ast_nodes نفسه (isinstance واسم الصنف)
+ليعمل CodeGenerator عليه دون تعديل، لكن العروض لا تُحفظ: كل وصول إلى عقدة أو
+حقل قائمة يُنشئ عرضاً جديداً، فتوليد الكود على الساحة أبطأ بنحو الضعف منه على
+شجرة الكائنات (0.92 ث مقابل 0.47 ث لعشرين ألف عبارة في benchmarks.py arena).
+لا يوجد مسار توليد على الأرقام بعد، ولا يستخدم CompilationUnit ولا المحرر
+ولا سطر الأوامر الساحة؛ هي للقياس وللتحليل بـ ArenaVisitor فقط حالياً.
+arena.view(id) returns a view that is an instance of the ast_nodes class
+so CodeGenerator runs on it unchanged, but views are not cached: every
+node or list-field access allocates a fresh one, which makes code
+generation over the arena about 2x slower than over the object tree
+(0.92 s vs 0.47 s for 20k statements in `benchmarks.py arena`). There is
+no id-based code generation path yet, and CompilationUnit, the IDE and
+the command line do not use the arena; for now it is benchmark and
+ArenaVisitor analysis only.
+"""
+
+from array import array
+from collections import Counter
+
+from ast_builder import ASTBuilder, ParseError
+from ast_nodes import *
+
+
+# ==================== Schema ====================
+
+# أدوار الحقول - Field roles
+NODE = 0      # عقدة أو None - a node or None
+NODES = 1     # قائمة عقد - a list of nodes
+PAIRS = 2     # قائمة أزواج (شرط، عبارة) - a list of (condition, statement) pairs
+VALUE = 3     # قيمة في جدول الحمولة - a payload value
+
+# حقول كل صنف بالترتيب - Fields of each class, in order
+SCHEMA = {
+    ProgramNode: (('name', VALUE), ('block', NODE)),
+    BlockNode: (('constants', NODES), ('types', NODES), ('variables', NODES),
+                ('procedures', NODES), ('instructions', NODE)),
+    ConstantDefNode: (('name', VALUE), ('value', VALUE), ('value_node', NODE)),
+    TypeDefNode: (('name', VALUE), ('type_spec', VALUE)),
+    ListTypeNode: (('size', VALUE), ('element_type', VALUE)),
+    RecordTypeNode: (('fields', NODES),),
+    FieldDefNode: (('names', VALUE), ('data_type', VALUE)),
+    VarDeclNode: (('names', VALUE), ('data_type', VALUE)),
+    ProcedureDefNode: (('name', VALUE), ('params', NODES), ('block', NODE), ('source_range', VALUE)),
+    ParamDefNode: (('names', VALUE), ('data_type', VALUE), ('pass_mode', VALUE)),
+    AssignmentNode: (('variable', NODE), ('expression', NODE)),
+    InputNode: (('variable', NODE),),
+    OutputNode: (('items', NODES),),
+    CallNode: (('procedure_name', VALUE), ('arguments', NODES)),
+    IfNode: (('condition', NODE), ('then_stmt', NODE), ('elif_parts', PAIRS), ('else_stmt', NODE)),
+    ForLoopNode: (('loop_var', VALUE), ('start_expr', NODE), ('end_expr', NODE),
+                  ('step_expr', NODE), ('body', NODE)),
+    WhileLoopNode: (('condition', NODE), ('body', NODE)),
+    RepeatUntilNode: (('body', NODE), ('condition', NODE)),
+    CompoundStmtNode: (('statements', NODES),),
+    BinOpNode: (('left', NODE), ('operator', VALUE), ('right', NODE)),
+    UnaryOpNode: (('operator', VALUE), ('operand', NODE)),
+    VarAccessNode: (('name', VALUE), ('selector', NODE)),
+    IndexedSelectorNode: (('index_expr', NODE),),
+    FieldSelectorNode: (('field_name', VALUE),),
+    LiteralNode: (('value', VALUE), ('literal_type', VALUE)),
+    ConstantRefNode: (('name', VALUE),),
+}
+
+# رقم نوع كل صنف - Kind number of each class
+NODE_CLASSES = tuple(SCHEMA)
+KIND_OF = {cls: kind for kind, cls in enumerate(NODE_CLASSES)}
+LIST_KIND = len(NODE_CLASSES)
+
+# أصناف التعابير التي لها expr_type - Expression classes carrying expr_type
+_EXPRESSION_CLASSES = (BinOpNode, UnaryOpNode, VarAccessNode, LiteralNode, ConstantRefNode)
+
+
+def _payload_key(kind, payload):
+    """مفتاح إزالة التكرار أو None - Dedup key, or None if unhashable
+
+    الأنواع جزء من المفتاح حتى لا تتطابق 1 و True و 1.0.
+    Types are part of the key so 1, True and 1.0 stay distinct.
+    """
+    key = (kind, payload, tuple(type(value) for value in payload))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+# ==================== Arena ====================
+
+class ASTArena:
+    """ساحة AST - Parallel-array AST storage
+
+    Attributes:
+        kinds: نوع كل عقدة (فهرس في NODE_CLASSES أو LIST_KIND) - array('B')
+        lines, columns: الموقع، -1 إن لم يوجد - position, -1 when missing
+        child_start, child_count: نطاق الأبناء في children - child range
+        payload: فهرس في payloads أو -1 - index into payloads, or -1
+        children: أرقام الأبناء متتالية - concatenated child ids
+        payloads: صفوف القيم غير العقدية بلا تكرار - deduplicated value tuples
+        expr_types: {id: TypeInfo} للتعابير المفحوصة فقط - checked expressions only
+        root: رقم عقدة البرنامج - id of the program node
+    """
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.lines = array('i')
+        self.columns = array('i')
+        self.child_start = array('i')
+        self.child_count = array('i')
+        self.payload = array('i')
+        self.children = array('i')
+        self.payloads = []
+        self.payload_index = {}
+        self.expr_types = {}
+        self.root = -1
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @property
+    def nbytes(self):
+        """حجم المصفوفات بالبايت - Size of the arrays in bytes"""
+        return sum(len(a) * a.itemsize for a in (
+            self.kinds, self.lines, self.columns, self.child_start,
+            self.child_count, self.payload, self.children))
+
+    # ==================== Adding Nodes ====================
+
+    @classmethod
+    def from_ast(cls, root):
+        """تسطيح شجرة كائنات موجودة - Flatten an existing object tree"""
+        arena = cls()
+        arena.root = arena.add(root)
+        return arena
+
+    def add(self, value):
+        """إضافة عقدة وأبنائها، وإرجاع رقمها - Add a node and its subtree, return its id
+
+        الأرقام الصحيحة عقد مضافة مسبقاً وتُرجع كما هي.
+        Ints are already-added nodes and are returned unchanged.
+        """
+        if value is None:
+            return -1
+        if isinstance(value, int):
+            return value
+        if isinstance(value, list):
+            return self._append(LIST_KIND, None, None, [self.add(item) for item in value], None)
+        if isinstance(value, NodeView) and value._arena is self:
+            return value._id
+
+        kind = KIND_OF[type(value)]
+        child_ids = []
+        payload = []
+        for name, role in SCHEMA[NODE_CLASSES[kind]]:
+            field = getattr(value, name)
+            if role == NODE:
+                child_ids.append(self.add(field))
+            elif role == NODES:
+                child_ids.append(self.add(list(field)))
+            elif role == PAIRS:
+                child_ids.append(self.add([item for pair in field for item in pair]))
+            else:
+                payload.append(tuple(field) if isinstance(field, list) else field)
+
+        node_id = self._append(kind, value.line, value.column, child_ids, tuple(payload))
+        expr_type = getattr(value, 'expr_type', None)
+        if expr_type is not None and not (isinstance(value, LiteralNode) and expr_type == value.literal_type):
+            self.expr_types[node_id] = expr_type
+        return node_id
+
+    def _append(self, kind, line, column, child_ids, payload):
+        node_id = len(self.kinds)
+        self.kinds.append(kind)
+        self.lines.append(-1 if line is None else line)
+        self.columns.append(-1 if column is None else column)
+        self.child_start.append(len(self.children))
+        self.child_count.append(len(child_ids))
+        self.children.extend(child_ids)
+        self.payload.append(self._intern(kind, payload) if payload else -1)
+        return node_id
+
+    def _intern(self, kind, payload):
+        key = _payload_key(kind, payload)
+        index = self.payload_index.get(key) if key is not None else None
+        if index is None:
+            index = len(self.payloads)
+            self.payloads.append(payload)
+            if key is not None:
+                self.payload_index[key] = index
+        return index
+
+    # ==================== Access ====================
+
+    def child(self, node_id, position):
+        """رقم الابن في موضع - Child id at a position"""
+        return self.children[self.child_start[node_id] + position]
+
+    def child_ids(self, node_id):
+        """أرقام الأبناء - Child ids"""
+        start = self.child_start[node_id]
+        return self.children[start:start + self.child_count[node_id]]
+
+    def values(self, node_id):
+        """صف القيم غير العقدية - The node's payload tuple"""
+        index = self.payload[node_id]
+        return self.payloads[index] if index >= 0 else ()
+
+    def kind_class(self, node_id):
+        """صنف ast_nodes للعقدة - The node's ast_nodes class"""
+        return NODE_CLASSES[self.kinds[node_id]]
+
+    def view(self, node_id):
+        """عرض جديد للعقدة أو None (يُنشأ في كل استدعاء) - A new view of the node, or None (allocated per call)"""
+        if node_id < 0:
+            return None
+        return VIEW_CLASSES[self.kinds[node_id]](self, node_id)
+
+    def list_view(self, list_id):
+        """عروض عناصر عقدة قائمة - Views of a list node's items"""
+        return [self.view(child_id) for child_id in self.child_ids(list_id)]
+
+
+# ==================== Views ====================
+
+class NodeView:
+    """أساس أصناف العرض - Marker base of the view classes"""
+    __slots__ = ()
+
+
+def _child_property(position, role):
+    if role == NODE:
+        def get(self):
+            arena = self._arena
+            return arena.view(arena.children[arena.child_start[self._id] + position])
+    elif role == NODES:
+        def get(self):
+            arena = self._arena
+            return arena.list_view(arena.children[arena.child_start[self._id] + position])
+    else:
+        def get(self):
+            arena = self._arena
+            items = arena.list_view(arena.children[arena.child_start[self._id] + position])
+            return list(zip(items[0::2], items[1::2]))
+    return property(get)
+
+
+def _value_property(position):
+    def get(self):
+        return self._arena.payloads[self._arena.payload[self._id]][position]
+    return property(get)
+
+
+def _position_property(attribute):
+    def get(self):
+        value = getattr(self._arena, attribute)[self._id]
+        return None if value < 0 else value
+    return property(get)
+
+
+def _expr_type_property(default_field):
+    def get(self):
+        value = self._arena.expr_types.get(self._id)
+        if value is None and default_field is not None:
+            return getattr(self, default_field)
+        return value
+
+    def set(self, value):
+        self._arena.expr_types[self._id] = value
+    return property(get, set)
+
+
+def _view_init(self, arena, node_id):
+    self._arena = arena
+    self._id = node_id
+
+
+def _view_eq(self, other):
+    return isinstance(other, NodeView) and self._arena is other._arena and self._id == other._id
+
+
+def _view_hash(self):
+    return hash((id(self._arena), self._id))
+
+
+def _make_view_class(cls):
+    """صنف عرض فرعي من صنف العقدة - A view subclass of a node class
+
+    الخصائص تحجب slots الصنف الأصلي فتُقرأ القيم من الساحة؛ الكتابة ممنوعة
+    عدا expr_type الذي يُحفظ في arena.expr_types.
+    Properties shadow the base class slots and read from the arena; they are
+    read-only except expr_type, which is stored in arena.expr_types.
+    """
+    namespace = {
+        '__slots__': ('_arena', '_id'),
+        '__init__': _view_init,
+        '__eq__': _view_eq,
+        '__hash__': _view_hash,
+        'line': _position_property('lines'),
+        'column': _position_property('columns'),
+    }
+    child_position = value_position = 0
+    for name, role in SCHEMA[cls]:
+        if role == VALUE:
+            namespace[name] = _value_property(value_position)
+            value_position += 1
+        else:
+            namespace[name] = _child_property(child_position, role)
+            child_position += 1
+    if issubclass(cls, _EXPRESSION_CLASSES):
+        namespace['expr_type'] = _expr_type_property('literal_type' if cls is LiteralNode else None)
+    return type(cls.__name__, (NodeView, cls), namespace)
+
+
+VIEW_CLASSES = tuple(_make_view_class(cls) for cls in NODE_CLASSES)
+KIND_OF.update({view_class: kind for kind, view_class in enumerate(VIEW_CLASSES)})
+
+
+# ==================== Building ====================
+
+class ArenaBuilder(ASTBuilder):
+    """باني AST مباشر إلى ساحة - Direct AST builder that fills an ASTArena
+
+    كل عبارة وإجراء يُسطح فور تحليله، فتُرجع instruction رقماً بدل كائن.
+    Every statement and procedure is flattened as soon as it is parsed, so
+    instruction() returns an id instead of an object.
+    """
+
+    def __init__(self, source_code, tokens=None, arena=None):
+        super().__init__(source_code, tokens)
+        self.arena = arena if arena is not None else ASTArena()
+
+    def build(self):
+        """بناء الساحة - Build into the arena; returns the root id or None on syntax error"""
+        self.tokenize()
+        try:
+            self.arena.root = self.arena.add(self.program())
+        except ParseError as e:
+            self.errors.append(e)
+            return None
+        return self.arena.root
+
+    def instruction(self):
+        # العبارة الفارغة تبقى None؛ رقم أي عبارة > 0 لأن أبناءها يُضافون قبلها
+        # Empty statements stay None; statement ids are > 0 since children come first
+        node = super().instruction()
+        return None if node is None else self.arena.add(node)
+
+    def procedure_def(self):
+        return self.arena.add(super().procedure_def())
+
+
+def build_arena(source_code, tokens=None):
+    """
+    بناء ساحة AST مباشرة من المصدر - Build an AST arena directly from source
+
+    Returns:
+        tuple: (ASTArena أو None، قائمة الأخطاء) - (ASTArena or None, errors)
+    """
+    builder = ArenaBuilder(source_code, tokens)
+    root = builder.build()
+    return (builder.arena if root is not None else None), builder.errors
+
+
+# ==================== Visitors ====================
+
+class ArenaVisitor:
+    """زائر على أرقام العقد - Visitor over arena node ids
+
+    الدوال visit_<اسم الصنف>(node_id) كما في CodeGenerator، لكنها تستقبل أرقاماً.
+    visit() تنزل بالتعاود؛ scan() تمر على كل العقد بالترتيب اللاحق دون تعاود.
+    visit_<ClassName>(node_id) methods as in CodeGenerator, but taking ids.
+    visit() recurses; scan() walks every node in post-order without recursion.
+    """
+
+    def __init__(self, arena):
+        self.arena = arena
+        self.handlers = [getattr(self, f'visit_{cls.__name__}', None) for cls in NODE_CLASSES]
+        self.handlers.append(getattr(self, 'visit_list', None))
+
+    def visit(self, node_id):
+        """زيارة عقدة - Visit a node"""
+        if node_id < 0:
+            return None
+        handler = self.handlers[self.arena.kinds[node_id]]
+        if handler is None:
+            return self.generic_visit(node_id)
+        return handler(node_id)
+
+    def generic_visit(self, node_id):
+        """زيارة الأبناء - Visit the children"""
+        arena = self.arena
+        children = arena.children
+        start = arena.child_start[node_id]
+        for index in range(start, start + arena.child_count[node_id]):
+            self.visit(children[index])
+
+    def scan(self):
+        """تمرير خطي على كل العقد (الأبناء قبل الآباء) - Linear pass, children first"""
+        handlers = self.handlers
+        kinds = self.arena.kinds
+        for node_id in range(len(kinds)):
+            handler = handlers[kinds[node_id]]
+            if handler is not None:
+                handler(node_id)
+
+
+class UsageAnalyzer(ArenaVisitor):
+    """تحليل استخدام الأسماء - Name usage analysis over an arena
+
+    يعد القراءات والكتابات لكل متغير واستدعاءات كل إجراء، والمتغيرات المعرفة
+    التي لا يُشار إليها في أي مكان. يعتمد على الأسماء فقط (دون نطاقات)، لذا
+    "غير مستخدم" يعني أن الاسم لا يظهر إطلاقاً.
+    Counts reads and writes per variable, calls per procedure, and declared
+    variables never referenced. Name based (no scopes), so "unused" means
+    the name does not appear anywhere.
+    """
+
+    def __init__(self, arena):
+        super().__init__(arena)
+        self.reads = Counter()
+        self.writes = Counter()
+        self.calls = Counter()
+        self.declared = []
+
+    def analyze(self):
+        """تشغيل التحليل - Run the analysis"""
+        self.scan()
+        referenced = self.reads.keys() | self.writes.keys()
+        return {
+            'success': True,
+            'nodes': len(self.arena),
+            'reads': dict(+self.reads),
+            'writes': dict(self.writes),
+            'calls': dict(self.calls),
+            'unused_variables': sorted({name for name in self.declared if name not in referenced}),
+            'errors': [],
+        }
+
+    def target_name(self, node_id):
+        """اسم المتغير في الابن الأول - Variable name of the first child"""
+        arena = self.arena
+        return arena.values(arena.child(node_id, 0))[0]
+
+    def visit_VarAccessNode(self, node_id):
+        self.reads[self.arena.values(node_id)[0]] += 1
+
+    def visit_AssignmentNode(self, node_id):
+        # المتغير المُسند إليه عُدّ قراءة عند زيارته - The target was counted as a read
+        name = self.target_name(node_id)
+        self.reads[name] -= 1
+        self.writes[name] += 1
+
+    visit_InputNode = visit_AssignmentNode
+
+    def visit_ForLoopNode(self, node_id):
+        self.writes[self.arena.values(node_id)[0]] += 1
+
+    def visit_CallNode(self, node_id):
+        self.calls[self.arena.values(node_id)[0]] += 1
+
+    def visit_VarDeclNode(self, node_id):
+        self.declared.extend(self.arena.values(node_id)[0])
@@ -0,0 +1,653 @@
+"""
+Direct AST Builder for Arabic Programming Language
+باني AST المباشر - يبني عقد الشجرة المجردة من مجرى الرموز دون شجرة تحليل ANTLR
+
+محلل تنازلي تعاودي مكتوب يدوياً يتبع قواعد ArabicGrammar.g4 ويستخدم أرقام
+الرموز من ArabicGrammar.tokens (عبر ArabicGrammarLexer). لا ينشئ عقد السياق
+الوسيطة (condition, loop_statement, print_item, ...)، فيستهلك ذاكرة ووقتاً
+أقل على البرامج الكبيرة. شجرة ANTLR ما زالت متاحة لعرض "شجرة التحليل النحوي".
+
+A hand-written recursive-descent parser that follows ArabicGrammar.g4 and
+produces the same ast_nodes shapes as SemanticAnalyzer, without building the
+ANTLR parse tree. The AST is purely syntactic: no symbol table lookups and
+no expr_type annotations.
+"""
+
+from antlr4 import InputStream, Token
+from antlr4.error.ErrorListener import ErrorListener
+from ArabicGrammarLexer import ArabicGrammarLexer as T
+from ast_nodes import *
+from symbol_table import TypeInfo, SemanticError
+
+
+class ParseError(Exception):
+    """استثناء خاص بالأخطاء النحوية - Syntax error exception"""
+    def __init__(self, message, line=None, column=None):
+        self.message = message
+        self.line = line
+        self.column = column
+        super().__init__(self.format_error())
+
+    def format_error(self):
+        if self.line is not None and self.column is not None:
+            return f"خطأ نحوي في السطر {self.line}, العمود {self.column}: {self.message}"
+        elif self.line is not None:
+            return f"خطأ نحوي في السطر {self.line}: {self.message}"
+        else:
+            return f"خطأ نحوي: {self.message}"
+
+
+class _LexerErrorCollector(ErrorListener):
+    """جمع أخطاء المحلل المعجمي - Collect lexer errors instead of printing them"""
+    def __init__(self, errors):
+        self.errors = errors
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.errors.append(ParseError(msg, line, column))
+
+
+# أنواع البيانات المدمجة - Built-in data type tokens
+_DATA_TYPES = {
+    T.DT_INTEGER: 'صحيح',
+    T.DT_REAL: 'حقيقي',
+    T.DT_LOGICAL: 'منطقي',
+    T.DT_CHAR: 'حرفي',
+    T.DT_STRING: 'خيط_رمزي',
+}
+
+_RELATIONAL_OPS = {
+    T.GT: '>', T.LT: '<', T.GTE: '>=', T.LTE: '<=',
+    T.EQUALS_OP: '==', T.NOT_EQUALS_OP: '=!',
+}
+
+_ADD_OPS = {T.PLUS: '+', T.MINUS: '-', T.OR: '||'}
+
+_MUL_OPS = {T.MULT: '*', T.DIV: '/', T.INT_DIV: '\\', T.MOD: '%', T.AND: '&&'}
+
+# الرموز التي تبدأ بها التعليمات - FIRST(instruction) minus the empty alternative
+_INSTRUCTION_START = {
+    T.ID, T.READ, T.PRINT, T.IF, T.FOR, T.WHILE, T.REPEAT, T.L_CURLY_BRACE,
+}
+
+
+class ASTBuilder:
+    """باني AST مباشر - Direct recursive-descent AST builder
+
+    يتوقف عند أول خطأ نحوي (بدون استرجاع)، ويسجله في errors. الأخطاء الدلالية
+    التي تُكتشف أثناء البناء (حقل مكرر في سجل) تُسجل في semantic_errors.
+    Stops at the first syntax error (no recovery) and records it in errors.
+    Semantic errors found while building (duplicate record field) go to
+    semantic_errors.
+
+    tokens: رموز جاهزة (من IncrementalLexer) بدل تحليل المصدر؛ رموز الأخطاء
+            المخفية فيها تُسجل كأخطاء نحوية
+            ready-made tokens (from an IncrementalLexer) instead of lexing;
+            their hidden error tokens are reported as syntax errors
+    """
+
+    def __init__(self, source_code, tokens=None):
+        self.source_code = source_code
+        self.given_tokens = tokens
+        self.errors = []
+        self.semantic_errors = []
+        self.tokens = []
+        self.pos = 0
+        # نطاقات الأنواع المعرفة - Type names defined so far, per scope
+        self.type_scopes = [{}]
+
+    # ==================== Token Helpers ====================
+
+    def tokenize(self):
+        """تحويل المصدر إلى رموز - Lex the source into default-channel tokens"""
+        if self.given_tokens is not None:
+            tokens = []
+            for token in self.given_tokens:
+                if token.channel == Token.DEFAULT_CHANNEL:
+                    tokens.append(token)
+                elif token.type == Token.INVALID_TYPE:
+                    self.errors.append(ParseError(token.error_message, token.line, token.column))
+            self.tokens = tokens
+            self.pos = 0
+            return
+        lexer = T(InputStream(self.source_code))
+        lexer.removeErrorListeners()
+        lexer.addErrorListener(_LexerErrorCollector(self.errors))
+        tokens = []
+        while True:
+            token = lexer.nextToken()
+            if token.channel == Token.DEFAULT_CHANNEL:
+                tokens.append(token)
+            if token.type == Token.EOF:
+                break
+        self.tokens = tokens
+        self.pos = 0
+
+    @property
+    def current(self):
+        return self.tokens[self.pos]
+
+    def peek(self, offset=1):
+        index = min(self.pos + offset, len(self.tokens) - 1)
+        return self.tokens[index]
+
+    def at(self, token_type):
+        return self.tokens[self.pos].type == token_type
+
+    def advance(self):
+        token = self.tokens[self.pos]
+        if token.type != Token.EOF:
+            self.pos += 1
+        return token
+
+    def expect(self, token_type, description):
+        """استهلاك رمز متوقع أو رفع خطأ - Consume an expected token or fail"""
+        token = self.tokens[self.pos]
+        if token.type != token_type:
+            self.fail(description)
+        self.pos += 1
+        return token
+
+    def fail(self, expected):
+        token = self.current
+        text = '<EOF>' if token.type == Token.EOF else token.text
+        raise ParseError(f"رمز غير متوقع '{text}'، المتوقع {expected}", token.line, token.column)
+
+    # ==================== Entry Point ====================
+
+    def build(self):
+        """بناء شجرة AST - Build the AST, or return None on syntax error"""
+        self.tokenize()
+        try:
+            return self.program()
+        except ParseError as e:
+            self.errors.append(e)
+            return None
+
+    # ==================== Program & Block ====================
+
+    def program(self):
+        start = self.expect(T.PROGRAM, "'برنامج'")
+        name = self.expect(T.ID, "اسم البرنامج").text
+        self.expect(T.SEMICOLON, "'؛'")
+        block = self.block()
+        self.expect(T.DOT, "'.'")
+        return ProgramNode(name=name, block=block, line=start.line, column=start.column)
+
+    def block(self):
+        start = self.current
+        constants = self.constants_definition() if self.at(T.CONST) else []
+        types = self.types_definition() if self.at(T.TYPE) else []
+        variables = self.variables_definition() if self.at(T.VARIABLE) else []
+        procedures = []
+        while self.at(T.PROCEDURE):
+            procedures.append(self.procedure_def())
+        instructions = self.instructions_list()
+        return BlockNode(
+            constants=constants,
+            types=types,
+            variables=variables,
+            procedures=procedures,
+            instructions=instructions,
+            line=start.line,
+            column=start.column
+        )
+
+    # ==================== Constants ====================
+
+    def constants_definition(self):
+        self.advance()
+        constants = [self.constant_def()]
+        while self.at(T.ID):
+            constants.append(self.constant_def())
+        return constants
+
+    def constant_def(self):
+        name_token = self.expect(T.ID, "اسم الثابت")
+        self.expect(T.EQUALS, "'='")
+        value_node = self.constant_value()
+        self.expect(T.SEMICOLON, "'؛'")
+        value = value_node.value if isinstance(value_node, LiteralNode) else None
+        return ConstantDefNode(
+            name=name_token.text,
+            value=value,
+            value_node=value_node,
+            line=name_token.line,
+            column=name_token.column
+        )
+
+    def constant_value(self):
+        token = self.current
+        if token.type == T.ID:
+            self.advance()
+            return ConstantRefNode(name=token.text, line=token.line, column=token.column)
+        literal = self.literal()
+        if literal is None:
+            self.fail("قيمة ثابتة")
+        return literal
+
+    # ==================== Types ====================
+
+    def types_definition(self):
+        self.advance()
+        types = [self.type_def()]
+        while self.at(T.ID):
+            types.append(self.type_def())
+        return types
+
+    def type_def(self):
+        name_token = self.expect(T.ID, "اسم النوع")
+        self.expect(T.EQUALS, "'='")
+        if self.at(T.LIST):
+            type_spec = self.list_type()
+        elif self.at(T.RECORD):
+            type_spec = self.record_type()
+        else:
+            self.fail("'قائمة' أو 'سجل'")
+        self.expect(T.SEMICOLON, "'؛'")
+        self.type_scopes[-1].setdefault(name_token.text, type_spec)
+        return TypeDefNode(
+            name=name_token.text,
+            type_spec=type_spec,
+            line=name_token.line,
+            column=name_token.column
+        )
+
+    def list_type(self):
+        self.advance()
+        self.expect(T.L_SQUARE_BRACKET, "'['")
+        size = int(self.expect(T.INTEGER, "حجم القائمة").text)
+        self.expect(T.R_SQUARE_BRACKET, "']'")
+        self.expect(T.FROM, "'من'")
+        element_type_name = self.data_type()
+        return TypeInfo(base_type=element_type_name, is_list=True, list_size=size)
+
+    def record_type(self):
+        start = self.advance()
+        self.expect(T.L_CURLY_BRACE, "'{'")
+        field_defs = [self.field_def()]
+        while self.at(T.SEMICOLON):
+            self.advance()
+            field_defs.append(self.field_def())
+        self.expect(T.R_CURLY_BRACE, "'}'")
+
+        fields_dict = {}
+        for field_node in field_defs:
+            for name in field_node.names:
+                if name in fields_dict:
+                    self.semantic_errors.append(SemanticError(
+                        f"الحقل '{name}' معرّف مسبقاً في السجل", start.line, start.column))
+                else:
+                    fields_dict[name] = self.resolve_type(field_node.data_type)
+        return TypeInfo(base_type='سجل', is_record=True, fields=fields_dict)
+
+    def field_def(self):
+        start = self.current
+        names = self.id_list("اسم الحقل")
+        self.expect(T.COLON, "':'")
+        data_type = self.data_type()
+        return FieldDefNode(names=names, data_type=data_type, line=start.line, column=start.column)
+
+    def resolve_type(self, type_name):
+        """إيجاد نوع معرف سابقاً بالاسم - Resolve a previously defined type by name"""
+        for scope in reversed(self.type_scopes):
+            if type_name in scope:
+                return scope[type_name]
+        return TypeInfo(type_name)
+
+    def data_type(self):
+        token = self.current
+        if token.type in _DATA_TYPES:
+            self.advance()
+            return _DATA_TYPES[token.type]
+        if token.type == T.ID:
+            self.advance()
+            return token.text
+        self.fail("نوع بيانات")
+
+    def id_list(self, description):
+        names = [self.expect(T.ID, description).text]
+        while self.at(T.COMMA):
+            self.advance()
+            names.append(self.expect(T.ID, description).text)
+        return names
+
+    # ==================== Variables ====================
+
+    def variables_definition(self):
+        self.advance()
+        variables = [self.variables_group()]
+        self.expect(T.SEMICOLON, "'؛'")
+        while self.at(T.ID):
+            variables.append(self.variables_group())
+            self.expect(T.SEMICOLON, "'؛'")
+        return variables
+
+    def variables_group(self):
+        start = self.current
+        names = self.id_list("اسم المتغير")
+        self.expect(T.COLON, "':'")
+        data_type = self.data_type()
+        return VarDeclNode(names=names, data_type=data_type, line=start.line, column=start.column)
+
+    # ==================== Procedures ====================
+
+    def procedure_def(self):
+        start = self.advance()
+        name = self.expect(T.ID, "اسم الإجراء").text
+        self.expect(T.L_PAREN, "'('")
+        params = []
+        if not self.at(T.R_PAREN):
+            params.append(self.param_def())
+            while self.at(T.SEMICOLON):
+                self.advance()
+                params.append(self.param_def())
+        self.expect(T.R_PAREN, "')'")
+        self.expect(T.SEMICOLON, "'؛'")
+
+        self.type_scopes.append({})
+        block = self.block()
+        self.type_scopes.pop()
+
+        stop = self.expect(T.SEMICOLON, "'؛'")
+        return ProcedureDefNode(
+            name=name,
+            params=params,
+            block=block,
+            line=start.line,
+            column=start.column,
+            source_range=(start.start, stop.stop + 1)
+        )
+
+    def param_def(self):
+        start = self.current
+        pass_mode = 'BY_VALUE'
+        if self.at(T.BY_REFERENCE):
+            self.advance()
+            pass_mode = 'BY_REFERENCE'
+        elif self.at(T.BY_VALUE):
+            self.advance()
+        group = self.variables_group()
+        return ParamDefNode(
+            names=group.names,
+            data_type=group.data_type,
+            pass_mode=pass_mode,
+            line=start.line,
+            column=start.column
+        )
+
+    # ==================== Statements ====================
+
+    def instructions_list(self):
+        start = self.expect(T.L_CURLY_BRACE, "'{'")
+        statements = []
+        instruction = self.instruction()
+        if instruction:
+            statements.append(instruction)
+        while self.at(T.SEMICOLON):
+            self.advance()
+            instruction = self.instruction()
+            if instruction:
+                statements.append(instruction)
+        self.expect(T.R_CURLY_BRACE, "'}' أو '؛'")
+        return CompoundStmtNode(statements=statements, line=start.line, column=start.column)
+
+    def instruction(self):
+        token_type = self.current.type
+        if token_type not in _INSTRUCTION_START:
+            return None  # Empty statement
+        if token_type == T.ID:
+            if self.peek().type == T.L_PAREN:
+                return self.call_statement()
+            return self.assignment_statement()
+        if token_type == T.READ:
+            return self.input_statement()
+        if token_type == T.PRINT:
+            return self.output_statement()
+        if token_type == T.IF:
+            return self.conditional_statement()
+        if token_type == T.FOR:
+            return self.for_loop_statement()
+        if token_type == T.WHILE:
+            return self.while_loop_statement()
+        if token_type == T.REPEAT:
+            return self.repeat_until_statement()
+        return self.instructions_list()
+
+    def assignment_statement(self):
+        start = self.current
+        variable = self.variable_access()
+        self.expect(T.EQUALS, "'='")
+        expression = self.expression()
+        return AssignmentNode(variable=variable, expression=expression, line=start.line, column=start.column)
+
+    def input_statement(self):
+        start = self.advance()
+        self.expect(T.L_PAREN, "'('")
+        variable = self.variable_access()
+        self.expect(T.R_PAREN, "')'")
+        return InputNode(variable=variable, line=start.line, column=start.column)
+
+    def output_statement(self):
+        start = self.advance()
+        self.expect(T.L_PAREN, "'('")
+        items = [self.print_item()]
+        while self.at(T.COMMA):
+            self.advance()
+            items.append(self.print_item())
+        self.expect(T.R_PAREN, "')'")
+        return OutputNode(items=items, line=start.line, column=start.column)
+
+    def print_item(self):
+        if self.at(T.ID):
+            return self.variable_access()
+        if self.at(T.STRING_LITERAL) or self.at(T.CHAR_LITERAL):
+            return self.literal()
+        self.fail("متغير أو نص")
+
+    def call_statement(self):
+        name_token = self.advance()
+        self.advance()
+        arguments = []
+        if not self.at(T.R_PAREN):
+            arguments.append(self.expression())
+            while self.at(T.COMMA):
+                self.advance()
+                arguments.append(self.expression())
+        self.expect(T.R_PAREN, "')'")
+        return CallNode(
+            procedure_name=name_token.text,
+            arguments=arguments,
+            line=name_token.line,
+            column=name_token.column
+        )
+
+    # ==================== Control Flow ====================
+
+    def parenthesized_condition(self):
+        self.expect(T.L_PAREN, "'('")
+        condition = self.expression()
+        self.expect(T.R_PAREN, "')'")
+        return condition
+
+    def conditional_statement(self):
+        start = self.advance()
+        condition = self.parenthesized_condition()
+        self.expect(T.THEN, "'فان'")
+        then_stmt = self.instruction()
+
+        elif_parts = []
+        while self.at(T.ELSE) and self.peek().type == T.IF:
+            self.advance()
+            self.advance()
+            elif_cond = self.parenthesized_condition()
+            self.expect(T.THEN, "'فان'")
+            elif_parts.append((elif_cond, self.instruction()))
+
+        else_stmt = None
+        if self.at(T.ELSE):
+            self.advance()
+            else_stmt = self.instruction()
+
+        return IfNode(
+            condition=condition,
+            then_stmt=then_stmt,
+            elif_parts=elif_parts,
+            else_stmt=else_stmt,
+            line=start.line,
+            column=start.column
+        )
+
+    def for_loop_statement(self):
+        start = self.advance()
+        self.expect(T.L_PAREN, "'('")
+        loop_var = self.expect(T.ID, "متغير الحلقة").text
+        self.expect(T.EQUALS, "'='")
+        start_expr = self.expression()
+        self.expect(T.TO, "'الى'")
+        end_expr = self.expression()
+        step_expr = None
+        if self.at(T.STEP):
+            self.advance()
+            step_expr = self.expression()
+        self.expect(T.R_PAREN, "')'")
+        body = self.instruction()
+        return ForLoopNode(
+            loop_var=loop_var,
+            start_expr=start_expr,
+            end_expr=end_expr,
+            step_expr=step_expr,
+            body=body,
+            line=start.line,
+            column=start.column
+        )
+
+    def while_loop_statement(self):
+        start = self.advance()
+        condition = self.parenthesized_condition()
+        self.expect(T.CONTINUE, "'استمر'")
+        body = self.instruction()
+        return WhileLoopNode(condition=condition, body=body, line=start.line, column=start.column)
+
+    def repeat_until_statement(self):
+        start = self.advance()
+        body = self.instruction()
+        self.expect(T.UNTIL, "'حتى'")
+        condition = self.parenthesized_condition()
+        return RepeatUntilNode(body=body, condition=condition, line=start.line, column=start.column)
+
+    # ==================== Expressions ====================
+
+    def expression(self):
+        start = self.current
+        left = self.simple_expression()
+        operator = _RELATIONAL_OPS.get(self.current.type)
+        if operator is None:
+            return left
+        self.advance()
+        right = self.simple_expression()
+        return BinOpNode(left=left, operator=operator, right=right, line=start.line, column=start.column)
+
+    def simple_expression(self):
+        start = self.current
+        sign = None
+        if self.at(T.PLUS) or self.at(T.MINUS):
+            sign = self.advance().text
+
+        left = self.term()
+        if sign:
+            left = UnaryOpNode(operator=sign, operand=left, line=start.line, column=start.column)
+
+        operator = _ADD_OPS.get(self.current.type)
+        while operator is not None:
+            self.advance()
+            right = self.term()
+            left = BinOpNode(left=left, operator=operator, right=right, line=start.line, column=start.column)
+            operator = _ADD_OPS.get(self.current.type)
+        return left
+
+    def term(self):
+        start = self.current
+        left = self.factor()
+        operator = _MUL_OPS.get(self.current.type)
+        while operator is not None:
+            self.advance()
+            right = self.factor()
+            left = BinOpNode(left=left, operator=operator, right=right, line=start.line, column=start.column)
+            operator = _MUL_OPS.get(self.current.type)
+        return left
+
+    def factor(self):
+        token = self.current
+        if token.type == T.ID:
+            return self.variable_access()
+        if token.type == T.L_PAREN:
+            self.advance()
+            node = self.expression()
+            self.expect(T.R_PAREN, "')'")
+            return node
+        if token.type == T.NOT:
+            self.advance()
+            operand = self.factor()
+            return UnaryOpNode(operator='!', operand=operand, line=token.line, column=token.column)
+        literal = self.literal()
+        if literal is None:
+            self.fail("تعبير")
+        return literal
+
+    def variable_access(self):
+        name_token = self.expect(T.ID, "اسم متغير")
+        selector = None
+        token = self.current
+        if token.type == T.L_SQUARE_BRACKET:
+            self.advance()
+            index_expr = self.expression()
+            self.expect(T.R_SQUARE_BRACKET, "']'")
+            selector = IndexedSelectorNode(index_expr=index_expr, line=token.line, column=token.column)
+        elif token.type == T.DOT and self.peek().type == T.ID:
+            self.advance()
+            field_name = self.advance().text
+            selector = FieldSelectorNode(field_name=field_name, line=token.line, column=token.column)
+        return VarAccessNode(
+            name=name_token.text,
+            selector=selector,
+            line=name_token.line,
+            column=name_token.column
+        )
+
+    # ==================== Literals ====================
+
+    def literal(self):
+        """قيمة حرفية أو None - Numeric, text or logical literal, or None"""
+        token = self.current
+        token_type = token.type
+        if token_type == T.INTEGER:
+            value, literal_type = int(token.text), 'صحيح'
+        elif token_type == T.REAL_NUMBER:
+            value, literal_type = float(token.text), 'حقيقي'
+        elif token_type == T.STRING_LITERAL:
+            value, literal_type = token.text[1:-1], 'خيط_رمزي'
+        elif token_type == T.CHAR_LITERAL:
+            value, literal_type = token.text[1:-1], 'حرفي'
+        elif token_type == T.TRUE:
+            value, literal_type = True, 'منطقي'
+        elif token_type == T.FALSE:
+            value, literal_type = False, 'منطقي'
+        else:
+            return None
+        self.advance()
+        return LiteralNode(value=value, literal_type=literal_type, line=token.line, column=token.column)
+
+
+def build_ast(source_code):
+    """
+    بناء شجرة AST مباشرة من المصدر - Build an AST directly from source
+
+    Args:
+        source_code: الشيفرة المصدرية - Source text
+
+    Returns:
+        tuple: (ProgramNode أو None، قائمة الأخطاء) - (ProgramNode or None, errors)
+    """
+    builder = ASTBuilder(source_code)
+    ast = builder.build()
+    return ast, builder.errors
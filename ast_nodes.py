@@ -1,10 +1,17 @@
 """
 AST Node Classes for Arabic Programming Language
 تعريف عقد شجرة النحو المجرد (Abstract Syntax Tree)
+
+كل العقد تعرّف __slots__ (دون __dict__ لكل نسخة) لتقليل ذاكرة الأشجار الكبيرة،
+لذلك يجب أن يُعلن أي حقل جديد في __slots__ الخاصة بصنفه.
+All nodes declare __slots__ (no per-instance __dict__) to keep large trees
+small, so any new field must be added to its class's __slots__.
 """
 
 class ASTNode:
     """Base class for all AST nodes"""
+    __slots__ = ('line', 'column')
+
     def __init__(self, line=None, column=None):
         self.line = line
         self.column = column
@@ -15,6 +22,8 @@ class ASTNode:
 
 class ProgramNode(ASTNode):
     """برنامج - Program node"""
+    __slots__ = ('name', 'block')
+
     def __init__(self, name, block, line=None, column=None):
         super().__init__(line, column)
         self.name = name
@@ -26,6 +35,8 @@ class ProgramNode(ASTNode):
 
 class BlockNode(ASTNode):
     """كتلة برمجية - Block node"""
+    __slots__ = ('constants', 'types', 'variables', 'procedures', 'instructions')
+
     def __init__(self, constants=None, types=None, variables=None, 
                  procedures=None, instructions=None, line=None, column=None):
         super().__init__(line, column)
@@ -38,10 +49,13 @@ class BlockNode(ASTNode):
 
 class ConstantDefNode(ASTNode):
     """تعريف ثابت - Constant definition"""
-    def __init__(self, name, value, line=None, column=None):
+    __slots__ = ('name', 'value', 'value_node')
+
+    def __init__(self, name, value, value_node=None, line=None, column=None):
         super().__init__(line, column)
         self.name = name
         self.value = value
+        self.value_node = value_node  # LiteralNode or ConstantRefNode
     
     def __repr__(self):
         return f"ConstantDefNode(name='{self.name}', value={self.value})"
@@ -49,6 +63,8 @@ class ConstantDefNode(ASTNode):
 
 class TypeDefNode(ASTNode):
     """تعريف نوع - Type definition"""
+    __slots__ = ('name', 'type_spec')
+
     def __init__(self, name, type_spec, line=None, column=None):
         super().__init__(line, column)
         self.name = name
@@ -60,6 +76,8 @@ class TypeDefNode(ASTNode):
 
 class ListTypeNode(ASTNode):
     """نوع قائمة - List type"""
+    __slots__ = ('size', 'element_type')
+
     def __init__(self, size, element_type, line=None, column=None):
         super().__init__(line, column)
         self.size = size
@@ -71,6 +89,8 @@ class ListTypeNode(ASTNode):
 
 class RecordTypeNode(ASTNode):
     """نوع سجل - Record type"""
+    __slots__ = ('fields',)
+
     def __init__(self, fields, line=None, column=None):
         super().__init__(line, column)
         self.fields = fields  # List of FieldDefNode
@@ -81,6 +101,8 @@ class RecordTypeNode(ASTNode):
 
 class FieldDefNode(ASTNode):
     """تعريف حقل - Field definition"""
+    __slots__ = ('names', 'data_type')
+
     def __init__(self, names, data_type, line=None, column=None):
         super().__init__(line, column)
         self.names = names  # List of field names
@@ -92,6 +114,8 @@ class FieldDefNode(ASTNode):
 
 class VarDeclNode(ASTNode):
     """تعريف متغير - Variable declaration"""
+    __slots__ = ('names', 'data_type')
+
     def __init__(self, names, data_type, line=None, column=None):
         super().__init__(line, column)
         self.names = names  # List of variable names
@@ -103,11 +127,14 @@ class VarDeclNode(ASTNode):
 
 class ProcedureDefNode(ASTNode):
     """تعريف إجراء - Procedure definition"""
-    def __init__(self, name, params, block, line=None, column=None):
+    __slots__ = ('name', 'params', 'block', 'source_range')
+
+    def __init__(self, name, params, block, line=None, column=None, source_range=None):
         super().__init__(line, column)
         self.name = name
         self.params = params or []
         self.block = block
+        self.source_range = source_range  # (start, stop) offsets in source text
     
     def __repr__(self):
         return f"ProcedureDefNode(name='{self.name}', params={len(self.params)})"
@@ -115,6 +142,8 @@ class ProcedureDefNode(ASTNode):
 
 class ParamDefNode(ASTNode):
     """تعريف معامل - Parameter definition"""
+    __slots__ = ('names', 'data_type', 'pass_mode')
+
     def __init__(self, names, data_type, pass_mode='BY_VALUE', line=None, column=None):
         super().__init__(line, column)
         self.names = names
@@ -129,6 +158,8 @@ class ParamDefNode(ASTNode):
 
 class AssignmentNode(ASTNode):
     """عبارة إسناد - Assignment statement"""
+    __slots__ = ('variable', 'expression')
+
     def __init__(self, variable, expression, line=None, column=None):
         super().__init__(line, column)
         self.variable = variable
@@ -140,6 +171,8 @@ class AssignmentNode(ASTNode):
 
 class InputNode(ASTNode):
     """عبارة قراءة - Input statement (اقرأ)"""
+    __slots__ = ('variable',)
+
     def __init__(self, variable, line=None, column=None):
         super().__init__(line, column)
         self.variable = variable
@@ -150,6 +183,8 @@ class InputNode(ASTNode):
 
 class OutputNode(ASTNode):
     """عبارة طباعة - Output statement (اطبع)"""
+    __slots__ = ('items',)
+
     def __init__(self, items, line=None, column=None):
         super().__init__(line, column)
         self.items = items
@@ -160,6 +195,8 @@ class OutputNode(ASTNode):
 
 class CallNode(ASTNode):
     """استدعاء إجراء - Procedure call"""
+    __slots__ = ('procedure_name', 'arguments')
+
     def __init__(self, procedure_name, arguments, line=None, column=None):
         super().__init__(line, column)
         self.procedure_name = procedure_name
@@ -171,6 +208,8 @@ class CallNode(ASTNode):
 
 class IfNode(ASTNode):
     """عبارة شرطية - Conditional statement (اذا)"""
+    __slots__ = ('condition', 'then_stmt', 'elif_parts', 'else_stmt')
+
     def __init__(self, condition, then_stmt, elif_parts=None, else_stmt=None, 
                  line=None, column=None):
         super().__init__(line, column)
@@ -185,6 +224,8 @@ class IfNode(ASTNode):
 
 class ForLoopNode(ASTNode):
     """حلقة تكرار for - For loop (كرر)"""
+    __slots__ = ('loop_var', 'start_expr', 'end_expr', 'step_expr', 'body')
+
     def __init__(self, loop_var, start_expr, end_expr, step_expr, body, 
                  line=None, column=None):
         super().__init__(line, column)
@@ -200,6 +241,8 @@ class ForLoopNode(ASTNode):
 
 class WhileLoopNode(ASTNode):
     """حلقة طالما - While loop (طالما)"""
+    __slots__ = ('condition', 'body')
+
     def __init__(self, condition, body, line=None, column=None):
         super().__init__(line, column)
         self.condition = condition
@@ -211,6 +254,8 @@ class WhileLoopNode(ASTNode):
 
 class RepeatUntilNode(ASTNode):
     """حلقة اعد حتى - Repeat-until loop (اعد حتى)"""
+    __slots__ = ('body', 'condition')
+
     def __init__(self, body, condition, line=None, column=None):
         super().__init__(line, column)
         self.body = body
@@ -222,6 +267,8 @@ class RepeatUntilNode(ASTNode):
 
 class CompoundStmtNode(ASTNode):
     """عبارة مركبة - Compound statement { }"""
+    __slots__ = ('statements',)
+
     def __init__(self, statements, line=None, column=None):
         super().__init__(line, column)
         self.statements = statements
@@ -234,6 +281,8 @@ class CompoundStmtNode(ASTNode):
 
 class BinOpNode(ASTNode):
     """عملية ثنائية - Binary operation"""
+    __slots__ = ('left', 'operator', 'right', 'expr_type')
+
     def __init__(self, left, operator, right, line=None, column=None):
         super().__init__(line, column)
         self.left = left
@@ -247,6 +296,8 @@ class BinOpNode(ASTNode):
 
 class UnaryOpNode(ASTNode):
     """عملية أحادية - Unary operation"""
+    __slots__ = ('operator', 'operand', 'expr_type')
+
     def __init__(self, operator, operand, line=None, column=None):
         super().__init__(line, column)
         self.operator = operator
@@ -259,6 +310,8 @@ class UnaryOpNode(ASTNode):
 
 class VarAccessNode(ASTNode):
     """الوصول لمتغير - Variable access"""
+    __slots__ = ('name', 'selector', 'expr_type')
+
     def __init__(self, name, selector=None, line=None, column=None):
         super().__init__(line, column)
         self.name = name
@@ -271,6 +324,8 @@ class VarAccessNode(ASTNode):
 
 class IndexedSelectorNode(ASTNode):
     """وصول مفهرس - Indexed access [index]"""
+    __slots__ = ('index_expr',)
+
     def __init__(self, index_expr, line=None, column=None):
         super().__init__(line, column)
         self.index_expr = index_expr
@@ -281,6 +336,8 @@ class IndexedSelectorNode(ASTNode):
 
 class FieldSelectorNode(ASTNode):
     """وصول حقل - Field access .field"""
+    __slots__ = ('field_name',)
+
     def __init__(self, field_name, line=None, column=None):
         super().__init__(line, column)
         self.field_name = field_name
@@ -291,6 +348,8 @@ class FieldSelectorNode(ASTNode):
 
 class LiteralNode(ASTNode):
     """قيمة حرفية - Literal value"""
+    __slots__ = ('value', 'literal_type', 'expr_type')
+
     def __init__(self, value, literal_type, line=None, column=None):
         super().__init__(line, column)
         self.value = value
@@ -303,6 +362,8 @@ class LiteralNode(ASTNode):
 
 class ConstantRefNode(ASTNode):
     """مرجع ثابت - Constant reference"""
+    __slots__ = ('name', 'expr_type')
+
     def __init__(self, name, line=None, column=None):
         super().__init__(line, column)
         self.name = name
@@ -0,0 +1,750 @@
+"""
+Benchmarks for the Arabic Compiler
+قياسات الأداء - برامج مولدة كبيرة لقياس مراحل المترجم
+
+Usage:
+    python benchmarks.py ast --statements 5000
+    python benchmarks.py arena --statements 5000
+    python benchmarks.py dispatch --nodes 50000
+    python benchmarks.py licm --size 600
+    python benchmarks.py byref --depth 22
+    python benchmarks.py lists --size 200000
+    python benchmarks.py vectorize --size 1000000
+    python benchmarks.py records --size 1000000
+    python benchmarks.py io --lines 1000000
+    python benchmarks.py stream --statements 50000
+"""
+
+import contextlib
+import io
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+from ast_arena import ArenaBuilder, UsageAnalyzer
+from ast_builder import ASTBuilder
+from ast_nodes import ASTNode
+from code_generator import CodeGenerator
+from compilation_unit import CompilationUnit
+from compiler_analyzer import CompilerAnalyzer
+
+
+# ==================== Program Generation ====================
+
+_VARIABLES = ('س', 'ص', 'ع', 'ل')
+
+
+def _expression(rng, depth):
+    """تعبير حسابي عشوائي - Random arithmetic expression"""
+    if depth == 0 or rng.random() < 0.2:
+        if rng.random() < 0.5:
+            return rng.choice(_VARIABLES)
+        return str(rng.randint(1, 99))
+    operator = rng.choice(('+', '-', '*'))
+    left = _expression(rng, depth - 1)
+    right = _expression(rng, depth - 1)
+    if rng.random() < 0.3:
+        return f"({left} {operator} {right})"
+    return f"{left} {operator} {right}"
+
+
+def generate_program(statements=5000, depth=4, seed=0):
+    """برنامج كبير كثيف التعابير - A large, expression-heavy program"""
+    rng = random.Random(seed)
+    lines = [
+        "برنامج قياس؛",
+        "متغير",
+        f"  {'، '.join(_VARIABLES)} : صحيح؛",
+        "{",
+    ]
+    body = [f"  {rng.choice(_VARIABLES)} = {_expression(rng, depth)}" for _ in range(statements)]
+    lines.append('؛\n'.join(body))
+    lines.append("}.")
+    return '\n'.join(lines)
+
+
+def generate_loop_program(size=600):
+    """حلقات متداخلة فيها تعابير ثابتة - Nested loops with invariant expressions"""
+    return f"""برنامج حلقات؛
+متغير
+  ع، ي، ن، م، أ، ب : صحيح؛
+{{
+  أ = 7؛
+  ب = 3؛
+  ن = 0؛
+  م = 0؛
+  كرر (ع = 1 الى {size}) {{
+    كرر (ي = 1 الى {size}) {{
+      ن = ن + (أ * ب + ع) * (أ - ب)؛
+      م = م + ي * (أ + ب) - (أ * ب + ع)
+    }}
+  }}؛
+  طالما (م > أ * ب * 1000) استمر
+    م = م \\ 2 - (أ + ب)؛
+  اطبع(ن)؛
+  اطبع(م)
+}}."""
+
+
+def generate_recursive_program(depth=22):
+    """فيبوناتشي تعاودي بنتيجة بالمرجع - Recursive Fibonacci with a by-reference result"""
+    return f"""برنامج تعاود؛
+متغير
+  ن : صحيح؛
+اجراء فيب(بالقيمة ك : صحيح؛ بالمرجع ناتج : صحيح)؛
+  متغير أ، ب : صحيح؛
+  {{
+    اذا (ك < 2) فان ناتج = ك
+    والا {{
+      فيب(ك - 1، أ)؛
+      فيب(ك - 2، ب)؛
+      ناتج = أ + ب
+    }}
+  }}؛
+{{
+  فيب({depth}، ن)؛
+  اطبع(ن)
+}}."""
+
+
+def generate_table_program(size=200000):
+    """جداول كبيرة تُملأ وتُجمع بحلقات فهرسة - Large tables filled and summed by index loops"""
+    return f"""برنامج جداول؛
+نوع
+  اعداد = قائمة [{size}] من صحيح؛
+  كسور = قائمة [{size}] من حقيقي؛
+  اعلام = قائمة [{size}] من منطقي؛
+متغير
+  ق : اعداد؛
+  ك : كسور؛
+  ل : اعلام؛
+  ع، مجموع : صحيح؛
+  نصف : حقيقي؛
+{{
+  كرر (ع = 0 الى {size - 1}) {{
+    ق[ع] = ع * 7 + 1000؛
+    ك[ع] = ع * 0.5؛
+    ل[ع] = ع % 3 == 0
+  }}؛
+  مجموع = 0؛
+  نصف = 0.0؛
+  كرر (ع = 0 الى {size - 1}) {{
+    اذا (ل[ع]) فان مجموع = مجموع + ق[ع]؛
+    نصف = نصف + ك[ع]
+  }}؛
+  اطبع(مجموع)؛
+  اطبع(نصف)
+}}."""
+
+
+def generate_vector_program(size=1000000):
+    """حلقات عنصر بعنصر على قوائم كاملة - Element-wise loops over whole lists"""
+    return f"""برنامج متجهات؛
+نوع
+  اعداد = قائمة [{size}] من صحيح؛
+  كسور = قائمة [{size}] من حقيقي؛
+  اعلام = قائمة [{size}] من منطقي؛
+متغير
+  أ، ب، ج : اعداد؛
+  ك : كسور؛
+  ل : اعلام؛
+  ع : صحيح؛
+{{
+  كرر (ع = 0 الى {size - 1}) {{
+    ب[ع] = ع * 3؛
+    ج[ع] = 1000 - ع
+  }}؛
+  كرر (ع = 0 الى {size - 1})
+    أ[ع] = ب[ع] * 2 + ج[ع]؛
+  كرر (ع = 0 الى {size - 1}) {{
+    ك[ع] = أ[ع] * 0.5 + 1.0؛
+    ل[ع] = أ[ع] > ب[ع]
+  }}؛
+  اطبع(أ[{size - 1}])؛
+  اطبع(ك[{size // 2}])؛
+  اطبع(ل[0])
+}}."""
+
+
+def generate_record_program(size=1000000):
+    """قائمة سجلات تُنشأ ثم تُقرأ حقولها - A list of records created, then read field by field
+
+    المحدِّد واحد فقط (م[ع].س غير مسموح)، فالقراءة عبر متغير سجل.
+    Only one selector is allowed (م[ع].س is not), so fields are read
+    through a record variable.
+    """
+    return f"""برنامج سجلات؛
+نوع
+  نقطة = سجل {{ س، ص : صحيح؛ وزن : حقيقي }}؛
+  نقاط = قائمة [{size}] من نقطة؛
+متغير
+  م : نقاط؛
+  ن : نقطة؛
+  ع، مجموع : صحيح؛
+  كتلة : حقيقي؛
+{{
+  مجموع = 0؛
+  كتلة = 0.0؛
+  كرر (ع = 0 الى {size - 1}) {{
+    ن = م[ع]؛
+    مجموع = مجموع + ن.س + ن.ص؛
+    كتلة = كتلة + ن.وزن
+  }}؛
+  اطبع(مجموع)؛
+  اطبع(كتلة)
+}}."""
+
+
+IO_PROGRAM = """برنامج ارقام؛
+متغير
+  ن، ع، س، ض، مجموع : صحيح؛
+{
+  اقرا(ن)؛
+  مجموع = 0؛
+  كرر (ع = 1 الى ن) {
+    اقرا(س)؛
+    مجموع = مجموع + س؛
+    ض = س * 2؛
+    اطبع(ض)
+  }؛
+  اطبع(مجموع)
+}."""
+
+
+# التحويل الساذج لنفس البرنامج: كل متغير في صندوق (قائمة بعنصر واحد)
+# The naive lowering of the same program: every variable boxed in a one-item list
+_BOXED_RECURSIVE_PROGRAM = """
+def main():
+    ن = [0]
+    def فيب(ك, ناتج):
+        أ = [0]
+        ب = [0]
+        if ك[0] < 2:
+            ناتج[0] = ك[0]
+        else:
+            فيب([ك[0] - 1], أ)
+            فيب([ك[0] - 2], ب)
+            ناتج[0] = أ[0] + ب[0]
+    فيب([{depth}], ن)
+    print(ن[0])
+"""
+
+
+# ==================== Measurements ====================
+
+def _field_values(node):
+    """قيم حقول العقدة مع __slots__ أو __dict__ - Field values, slotted or not"""
+    for cls in type(node).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            yield getattr(node, name, None)
+    yield from getattr(node, '__dict__', {}).values()
+
+
+def iter_nodes(root):
+    """كل عقد الشجرة - Every node of the tree"""
+    stack = [root]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, ASTNode):
+            yield value
+            stack.extend(_field_values(value))
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+
+
+def count_nodes(root):
+    """عدد عقد الشجرة - Number of AST nodes"""
+    return sum(1 for _ in iter_nodes(root))
+
+
+def bench_ast(source_code, repeat=5):
+    """زمن بناء AST وذاكرتها لكل عقدة - AST build time and memory per node
+
+    الرموز تُحسب مرة واحدة مسبقاً، فالقياس يشمل ASTBuilder وحده.
+    Tokens are lexed once up front, so only ASTBuilder is measured.
+    """
+    tokens = CompilationUnit(source_code).token_stream.tokens
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ASTBuilder(source_code, tokens).build()
+        times.append(time.perf_counter() - start)
+
+    builder = ASTBuilder(source_code, tokens)
+    builder.tokenize()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ast = builder.program()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    nodes = count_nodes(ast)
+    return {
+        'nodes': nodes,
+        'bytes_per_node': allocated / nodes,
+        'total_bytes': allocated,
+        'build_time': min(times),
+    }
+
+
+def _traced(function):
+    """الذاكرة المتبقية والقصوى لاستدعاء - Retained and peak memory of a call"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = function()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained - before, peak - before
+
+
+def bench_arena(source_code, repeat=3):
+    """شجرة الكائنات مقابل الساحة - Object tree versus flat arena
+
+    يقيس الذاكرة المتبقية والقصوى أثناء البناء، وزمن البناء، وزمن توليد الكود
+    (على العروض في حالة الساحة، وكل وصول فيها يُنشئ عرضاً)، وزمن UsageAnalyzer.
+    Measures retained and peak build memory, build time, code generation
+    time (through views for the arena, one allocated per node access) and
+    the UsageAnalyzer scan.
+    """
+    tokens = CompilationUnit(source_code).token_stream.tokens
+
+    def best(function):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    def build_objects():
+        builder = ASTBuilder(source_code, tokens)
+        builder.tokenize()
+        return builder.program()
+
+    def build_arena():
+        builder = ArenaBuilder(source_code, tokens)
+        builder.build()
+        return builder.arena
+
+    ast, ast_retained, ast_peak = _traced(build_objects)
+    arena, arena_retained, arena_peak = _traced(build_arena)
+    nodes = count_nodes(ast)
+    root = arena.view(arena.root)
+    return {
+        'nodes': nodes,
+        'arena_nodes': len(arena),
+        'objects': {
+            'bytes_per_node': ast_retained / nodes,
+            'peak_bytes': ast_peak,
+            'build_time': best(build_objects),
+            'codegen_time': best(lambda: CodeGenerator().generate(ast)),
+        },
+        'arena': {
+            'bytes_per_node': arena_retained / nodes,
+            'peak_bytes': arena_peak,
+            'build_time': best(build_arena),
+            'codegen_time': best(lambda: CodeGenerator().generate(root)),
+            'scan_time': best(lambda: UsageAnalyzer(arena).analyze()),
+        },
+    }
+
+
+def bench_dispatch(source_code, repeat=5):
+    """زمن تنسيق الشجرة وتوليد الكود على AST مفحوصة - Tree formatting and codegen time
+
+    يشمل أيضاً get_node_children و get_node_info على كل عقدة.
+    Also times get_node_children and get_node_info over every node.
+    """
+    unit = CompilationUnit(source_code, front_end='direct')
+    ast = unit.ast
+    nodes = list(iter_nodes(ast))
+    analyzer = CompilerAnalyzer()
+
+    def best(function):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    def node_lookups():
+        for node in nodes:
+            analyzer.get_node_children(node)
+            analyzer.get_node_info(node)
+
+    return {
+        'nodes': len(nodes),
+        'lookups': best(node_lookups),
+        'format_ast_tree': best(lambda: analyzer.format_ast_tree(ast)),
+        'generate': best(lambda: CodeGenerator().generate(ast)),
+    }
+
+
+def _load_main(python_code):
+    """دالة main من كود مولد دون تشغيلها - The generated main() without running it"""
+    namespace = {'__name__': 'benchmark'}
+    exec(compile(python_code, '<generated>', 'exec'), namespace)
+    return namespace['main']
+
+
+def bench_licm(source_code, repeat=3):
+    """زمن تشغيل الكود المولد بنقل التعابير الثابتة وبدونه - Run time with and without LICM
+
+    الشجرة نفسها (بعد طي الثوابت) تولَّد مرتين، ويُقاس تشغيل main() فقط.
+    The same folded tree is generated twice; only main() is timed.
+    """
+    unit = CompilationUnit(source_code, front_end='direct', optimize=True)
+    if unit.errors:
+        raise ValueError(str(unit.errors[0]))
+
+    result = {}
+    for name, optimize in (('plain', False), ('hoisted', True)):
+        python_code = CodeGenerator(optimize=optimize).generate(unit.optimized_ast)
+        run_time, output = _best_run(_load_main(python_code), repeat)
+        result[name] = {
+            'run_time': run_time,
+            'temporaries': len(set(re.findall(r'_temp_\d+', python_code))),
+            'output': output,
+        }
+    result['same_output'] = result['plain']['output'] == result['hoisted']['output']
+    return result
+
+
+def _best_run(main, repeat):
+    """أفضل زمن تشغيل لـ main() ومخرجاتها - Best main() run time and its output"""
+    times = []
+    for _ in range(repeat):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            start = time.perf_counter()
+            main()
+            times.append(time.perf_counter() - start)
+    return min(times), output.getvalue()
+
+
+def bench_byref(depth=22, repeat=3):
+    """تمرير بالمرجع: نسخ دخولاً وخروجاً مقابل الصناديق - Copy-in/copy-out versus boxing"""
+    unit = CompilationUnit(generate_recursive_program(depth))
+    if unit.errors:
+        raise ValueError(str(unit.errors[0]))
+
+    result = {}
+    for name, python_code in (('copy_out', unit.python_code),
+                              ('boxed', _BOXED_RECURSIVE_PROGRAM.format(depth=depth))):
+        run_time, output = _best_run(_load_main(python_code), repeat)
+        result[name] = {'run_time': run_time, 'output': output}
+    result['same_output'] = result['copy_out']['output'] == result['boxed']['output']
+    return result
+
+
+def bench_lists(size=200000, repeat=3):
+    """قوائم بايثون مقابل array/bytearray - Python lists versus array/bytearray tables
+
+    الذاكرة القصوى أثناء main() وزمنها، بكود منوَّع في الحالتين.
+    Peak memory during main() and its run time, typed code in both cases.
+    """
+    unit = CompilationUnit(generate_table_program(size), optimize=True)
+    if unit.errors:
+        raise ValueError(str(unit.errors[0]))
+
+    result = {}
+    for name, arrays in (('lists', False), ('arrays', True)):
+        python_code = CodeGenerator(typed=True, arrays=arrays).generate(unit.optimized_ast)
+        main = _load_main(python_code)
+        run_time, output = _best_run(main, repeat)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, _, peak = _traced(main)
+        result[name] = {'run_time': run_time, 'peak_bytes': peak, 'output': output}
+    result['same_output'] = result['lists']['output'] == result['arrays']['output']
+    return result
+
+
+def bench_vectorize(size=1000000, repeat=3):
+    """حلقات NumPy مقابل الحلقات العادية - NumPy-lowered loops versus scalar loops
+
+    بدون NumPy يأخذ الكود المتجه طريق الحلقة العادية، فالزمنان متقاربان.
+    Without NumPy the vectorized code takes its scalar fallback, so the
+    times come out close.
+    """
+    unit = CompilationUnit(generate_vector_program(size), optimize=True)
+    if unit.errors:
+        raise ValueError(str(unit.errors[0]))
+
+    result = {}
+    for name, arrays, vectorize in (('scalar', True, False), ('lists', False, True), ('arrays', True, True)):
+        python_code = CodeGenerator(typed=True, arrays=arrays, vectorize=vectorize).generate(unit.optimized_ast)
+        run_time, output = _best_run(_load_main(python_code), repeat)
+        result[name] = {'run_time': run_time, 'output': output}
+    result['same_output'] = result['scalar']['output'] == result['lists']['output'] == result['arrays']['output']
+    return result
+
+
+def bench_records(size=1000000, repeat=3):
+    """سجلات بـ __slots__ مقابل أصناف بـ __dict__ - __slots__ records versus __dict__ classes
+
+    الصنف بلا __slots__ هو الكود المولد نفسه بعد حذف سطر __slots__.
+    The __dict__ variant is the same generated code with the __slots__
+    line removed.
+    """
+    unit = CompilationUnit(generate_record_program(size))
+    if unit.errors:
+        raise ValueError(str(unit.errors[0]))
+
+    result = {}
+    for name, python_code in (('slots', unit.python_code),
+                              ('dict', re.sub(r'(?m)^\s*__slots__ = .*\n', '', unit.python_code))):
+        main = _load_main(python_code)
+        run_time, output = _best_run(main, repeat)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, _, peak = _traced(main)
+        result[name] = {'run_time': run_time, 'peak_bytes': peak, 'output': output}
+    result['same_output'] = result['slots']['output'] == result['dict']['output']
+    return result
+
+
+def bench_io(lines=1000000, repeat=3):
+    """اطبع/اقرا عبر arabic_runtime مقابل print/input - Buffered runtime I/O versus print/input
+
+    البرنامج يقرأ عدداً من كل سطر ويطبع ضعفه، ويُشغَّل في عملية منفصلة بملفي
+    إدخال وإخراج حقيقيين كما في التشغيل على دفعات (الزمن يشمل بدء بايثون).
+    The program reads one number per line and prints its double. It runs
+    in a child process with real input and output files, as in a batch run
+    (the time includes interpreter startup).
+    """
+    import os
+    import subprocess
+    import tempfile
+
+    unit = CompilationUnit(IO_PROGRAM, optimize=True)
+    if unit.errors:
+        raise ValueError(str(unit.errors[0]))
+
+    result = {}
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, 'input.txt')
+        with open(input_path, 'w', encoding='utf-8') as f:
+            f.write(f"{lines}\n")
+            f.writelines(f"{i * 7 % 1000003}\n" for i in range(lines))
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+
+        for name, fast_io in (('print', False), ('runtime', True)):
+            program_path = os.path.join(directory, f'{name}.py')
+            output_path = os.path.join(directory, f'{name}.out')
+            with open(program_path, 'w', encoding='utf-8') as f:
+                f.write(CodeGenerator(typed=True, fast_io=fast_io).generate(unit.optimized_ast))
+            times = []
+            for _ in range(repeat):
+                with open(input_path, 'rb') as stdin, open(output_path, 'wb') as stdout:
+                    start = time.perf_counter()
+                    subprocess.run([sys.executable, program_path], stdin=stdin, stdout=stdout, env=env, check=True)
+                    times.append(time.perf_counter() - start)
+            with open(output_path, encoding='utf-8') as f:
+                result[name] = {'run_time': min(times), 'output': f.read()}
+    result['same_output'] = result['print']['output'] == result['runtime']['output']
+    return result
+
+
+def bench_stream(source_code, repeat=3):
+    """توليد الكود نصاً كاملاً مقابل البث إلى ملف - Code generation to a string versus streamed to a file
+
+    الذاكرة القصوى أثناء generate() فقط (الشجرة مبنية مسبقاً)، والملف os.devnull.
+    Peak memory during generate() alone (the tree is built beforehand);
+    the file is os.devnull.
+    """
+    import os
+
+    unit = CompilationUnit(source_code, front_end='direct')
+    ast = unit.optimized_ast
+
+    def to_string():
+        return len(CodeGenerator().generate(ast))
+
+    def to_file():
+        with open(os.devnull, 'w', encoding='utf-8') as sink:
+            CodeGenerator().generate(ast, sink=sink)
+
+    result = {}
+    for name, function in (('string', to_string), ('streamed', to_file)):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        _, _, peak = _traced(function)
+        result[name] = {'time': min(times), 'peak_bytes': peak}
+    result['code_chars'] = to_string()
+    return result
+
+
+# ==================== Command Line ====================
+
+def _report_ast(args):
+    source_code = generate_program(args.statements, args.depth)
+    result = bench_ast(source_code, args.repeat)
+    print(f"AST: {result['nodes']} عقدة - nodes")
+    print(f"  {result['bytes_per_node']:.1f} bytes/node "
+          f"({result['total_bytes'] / 1024 / 1024:.1f} MiB total)")
+    print(f"  build: {result['build_time'] * 1000:.1f} ms "
+          f"({result['build_time'] / result['nodes'] * 1e6:.2f} µs/node)")
+
+
+def _report_arena(args):
+    source_code = generate_program(args.statements, args.depth)
+    result = bench_arena(source_code, args.repeat)
+    print(f"AST: {result['nodes']} عقدة - nodes ({result['arena_nodes']} in the arena, with lists)")
+    for name in ('objects', 'arena'):
+        row = result[name]
+        print(f"  {name:8} {row['bytes_per_node']:6.1f} bytes/node retained, "
+              f"peak {row['peak_bytes'] / 1024 / 1024:5.1f} MiB, "
+              f"build {row['build_time'] * 1000:6.1f} ms, codegen {row['codegen_time'] * 1000:6.1f} ms")
+    print(f"  UsageAnalyzer scan: {result['arena']['scan_time'] * 1000:.1f} ms")
+
+
+def _report_dispatch(args):
+    # عدد العبارات التقريبي للوصول إلى عدد العقد المطلوب - ~18 nodes per statement at depth 4
+    source_code = generate_program(max(1, args.nodes // 18), args.depth)
+    result = bench_dispatch(source_code, args.repeat)
+    nodes = result['nodes']
+    print(f"AST: {nodes} عقدة - nodes")
+    for name in ('lookups', 'format_ast_tree', 'generate'):
+        print(f"  {name:16} {result[name] * 1000:7.1f} ms ({result[name] / nodes * 1e6:.2f} µs/node)")
+
+
+def _report_licm(args):
+    result = bench_licm(generate_loop_program(args.size), args.repeat)
+    for name in ('plain', 'hoisted'):
+        row = result[name]
+        print(f"  {name:8} {row['run_time'] * 1000:8.1f} ms ({row['temporaries']} temporaries)")
+    print(f"  speedup: {result['plain']['run_time'] / result['hoisted']['run_time']:.2f}x, "
+          f"same output: {result['same_output']}")
+
+
+def _report_byref(args):
+    result = bench_byref(args.depth, args.repeat)
+    for name in ('copy_out', 'boxed'):
+        print(f"  {name:8} {result[name]['run_time'] * 1000:8.1f} ms")
+    print(f"  speedup: {result['boxed']['run_time'] / result['copy_out']['run_time']:.2f}x, "
+          f"same output: {result['same_output']}")
+
+
+def _report_lists(args):
+    result = bench_lists(args.size, args.repeat)
+    print(f"3 جداول × {args.size} عنصر - 3 tables of {args.size} elements")
+    for name in ('lists', 'arrays'):
+        row = result[name]
+        print(f"  {name:8} peak {row['peak_bytes'] / 1024 / 1024:6.1f} MiB, run {row['run_time'] * 1000:7.1f} ms")
+    print(f"  memory: {result['lists']['peak_bytes'] / result['arrays']['peak_bytes']:.1f}x smaller, "
+          f"same output: {result['same_output']}")
+
+
+def _report_vectorize(args):
+    import importlib.util
+
+    result = bench_vectorize(args.size, args.repeat)
+    numpy = "NumPy" if importlib.util.find_spec('numpy') else "بدون NumPy: طريق الحلقة العادية - no NumPy, scalar fallback"
+    print(f"5 قوائم × {args.size} عنصر - 5 lists of {args.size} elements ({numpy})")
+    for name in ('scalar', 'lists', 'arrays'):
+        print(f"  {name:8} {result[name]['run_time'] * 1000:8.1f} ms")
+    print(f"  speedup: {result['scalar']['run_time'] / result['arrays']['run_time']:.1f}x (arrays), "
+          f"same output: {result['same_output']}")
+
+
+def _report_records(args):
+    result = bench_records(args.size, args.repeat)
+    print(f"{args.size} سجل - records")
+    for name in ('slots', 'dict'):
+        row = result[name]
+        print(f"  {name:8} peak {row['peak_bytes'] / 1024 / 1024:6.1f} MiB, run {row['run_time'] * 1000:7.1f} ms")
+    print(f"  memory: {result['dict']['peak_bytes'] / result['slots']['peak_bytes']:.1f}x smaller, "
+          f"same output: {result['same_output']}")
+
+
+def _report_io(args):
+    result = bench_io(args.lines, args.repeat)
+    print(f"{args.lines} سطر إدخال وإخراج - lines in and out")
+    for name in ('print', 'runtime'):
+        print(f"  {name:8} {result[name]['run_time'] * 1000:8.1f} ms")
+    print(f"  speedup: {result['print']['run_time'] / result['runtime']['run_time']:.1f}x, "
+          f"same output: {result['same_output']}")
+
+
+def _report_stream(args):
+    result = bench_stream(generate_program(args.statements, args.depth), args.repeat)
+    print(f"{result['code_chars'] / 1024 / 1024:.1f} MiB كود مولد - of generated code")
+    for name in ('string', 'streamed'):
+        row = result[name]
+        print(f"  {name:8} peak {row['peak_bytes'] / 1024 / 1024:7.2f} MiB, {row['time'] * 1000:7.1f} ms")
+
+
+def main(argv=None):
+    """تشغيل القياسات - Run benchmarks"""
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="قياسات أداء المترجم - Compiler benchmarks")
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    ast_parser = commands.add_parser('ast', help="ذاكرة وزمن بناء AST - AST memory and build time")
+    ast_parser.add_argument('--statements', type=int, default=5000)
+    ast_parser.add_argument('--depth', type=int, default=4)
+    ast_parser.add_argument('--repeat', type=int, default=5)
+    ast_parser.set_defaults(report=_report_ast)
+
+    arena_parser = commands.add_parser('arena', help="الساحة مقابل الكائنات - Arena versus object tree")
+    arena_parser.add_argument('--statements', type=int, default=5000)
+    arena_parser.add_argument('--depth', type=int, default=4)
+    arena_parser.add_argument('--repeat', type=int, default=3)
+    arena_parser.set_defaults(report=_report_arena)
+
+    dispatch_parser = commands.add_parser('dispatch', help="تنسيق الشجرة وتوليد الكود - Tree formatting and codegen")
+    dispatch_parser.add_argument('--nodes', type=int, default=50000)
+    dispatch_parser.add_argument('--depth', type=int, default=4)
+    dispatch_parser.add_argument('--repeat', type=int, default=5)
+    dispatch_parser.set_defaults(report=_report_dispatch)
+
+    licm_parser = commands.add_parser('licm', help="نقل التعابير الثابتة خارج الحلقات - Loop-invariant code motion")
+    licm_parser.add_argument('--size', type=int, default=600, help="دورات كل حلقة - iterations per loop")
+    licm_parser.add_argument('--repeat', type=int, default=3)
+    licm_parser.set_defaults(report=_report_licm)
+
+    byref_parser = commands.add_parser('byref', help="معاملات بالمرجع في برنامج تعاودي - By-reference calls, recursive")
+    byref_parser.add_argument('--depth', type=int, default=22, help="فيب(depth)")
+    byref_parser.add_argument('--repeat', type=int, default=3)
+    byref_parser.set_defaults(report=_report_byref)
+
+    lists_parser = commands.add_parser('lists', help="جداول array/bytearray - Array-backed tables")
+    lists_parser.add_argument('--size', type=int, default=200000, help="عناصر كل جدول - elements per table")
+    lists_parser.add_argument('--repeat', type=int, default=3)
+    lists_parser.set_defaults(report=_report_lists)
+
+    vectorize_parser = commands.add_parser('vectorize', help="حلقات القوائم عبر NumPy - List loops through NumPy")
+    vectorize_parser.add_argument('--size', type=int, default=1000000, help="عناصر كل قائمة - elements per list")
+    vectorize_parser.add_argument('--repeat', type=int, default=3)
+    vectorize_parser.set_defaults(report=_report_vectorize)
+
+    records_parser = commands.add_parser('records', help="سجلات بـ __slots__ - __slots__ records")
+    records_parser.add_argument('--size', type=int, default=1000000, help="عدد السجلات - number of records")
+    records_parser.add_argument('--repeat', type=int, default=3)
+    records_parser.set_defaults(report=_report_records)
+
+    io_parser = commands.add_parser('io', help="اطبع/اقرا المخزَّنة - Buffered print/read")
+    io_parser.add_argument('--lines', type=int, default=1000000, help="أسطر الإدخال - input lines")
+    io_parser.add_argument('--repeat', type=int, default=3)
+    io_parser.set_defaults(report=_report_io)
+
+    stream_parser = commands.add_parser('stream', help="بث الكود المولد إلى ملف - Streaming code emission")
+    stream_parser.add_argument('--statements', type=int, default=50000)
+    stream_parser.add_argument('--depth', type=int, default=4)
+    stream_parser.add_argument('--repeat', type=int, default=3)
+    stream_parser.set_defaults(report=_report_stream)
+
+    args = arg_parser.parse_args(argv)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    args.report(args)
+
+
+if __name__ == "__main__":
+    main()
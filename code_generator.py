@@ -5,28 +5,188 @@ Code Generator for Arabic Programming Language
 """
 
 from ast_nodes import *
-from symbol_table import TypeInfo
+from symbol_table import ParamSymbol, SemanticError, Symbol, SymbolTable, TypeInfo
 import re
+import sys
+
+
+# عمليات قد ترفع استثناءً فلا تُنقل خارج الحلقة إلا بقاسم حرفي غير صفري
+# Operators that may raise; hoisted only with a nonzero literal divisor ('^' never)
+_RAISING_OPERATORS = ('/', '\\', '%', '^')
+
+# أسبقية العمليات في بايثون، للأقواس في النمط المنوَّع
+# Python precedence of the emitted operators, for parentheses in typed mode
+_PRECEDENCE = {
+    'or': 1,
+    'and': 2,
+    'not ': 3,
+    '==': 4, '!=': 4, '>=': 4, '<=': 4, '>': 4, '<': 4,
+    '&': 5,
+    '>>': 6,
+    '+': 7, '-': 7,
+    '*': 8, '/': 8, '//': 8, '%': 8,
+    '**': 10,
+}
+_COMPARISON = 4
+_UNARY_SIGN = 9
+_ATOM = 11
+
+# أقصر مدى يستحق تحويله إلى NumPy - shortest loop range worth a NumPy round trip
+VECTORIZE_MIN_LENGTH = 32
+
+# دوال مساعدة تُضاف للكود المولد عند التحويل إلى NumPy
+# Helpers added to the generated code when loops are vectorized
+_VECTOR_RUNTIME = """
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+
+def _as_vector(values, start, stop):
+    \"\"\"مقطع قائمة كمصفوفة NumPy (عرض مباشر لـ array/bytearray)\"\"\"
+    if isinstance(values, bytearray):
+        return _np.frombuffer(values, dtype=_np.bool_)[start:stop]
+    if isinstance(values, list):
+        return _np.array(values[start:stop])
+    return _np.frombuffer(values, dtype=values.typecode)[start:stop]
+
+
+def _store_vector(values, start, stop, vector):
+    \"\"\"كتابة مصفوفة في مقطع قائمة\"\"\"
+    if isinstance(values, list):
+        values[start:stop] = _np.broadcast_to(vector, (stop - start,)).tolist()
+    else:
+        _as_vector(values, start, stop)[...] = vector
+""".strip('\n').split('\n')
+
+# عناصر القوائم التي يحولها NumPy - list element types NumPy handles
+_VECTOR_TYPES = ('صحيح', 'حقيقي', 'منطقي')
+
+# أقصى عدد أسطر تنتظر الكتابة عند التوليد إلى مخرج - Most lines held back when generating to a sink
+STREAM_BUFFER_LINES = 1024
 
 
 class CodeGenerator:
-    """مولد الكود - Code Generator"""
+    """مولد الكود - Code Generator
+    
+    الإجراءات تُولَّد دوالاً متداخلة داخل main (أو داخل الإجراء الأب) كما في
+    نطاقات اللغة، فمتغيرات الإجراء محلية سريعة، ومتغيرات النطاقات الخارجية
+    متغيرات مغلقة (nonlocal عند الإسناد)، والثوابت والأنواع العامة عامة.
+    Procedures are emitted as functions nested in main() (or in their parent
+    procedure), mirroring the language's scopes: procedure variables are
+    fast locals, outer variables are closure cells (declared nonlocal when
+    assigned), and program constants and types are module globals.
+    
+    معاملات بالمرجع تُنسخ دخولاً وخروجاً: الإجراء يُرجع قيمها النهائية،
+    وموضع الاستدعاء يسندها إلى المتغيرات الممررة.
+    By-reference parameters are copy-in/copy-out: the procedure returns
+    their final values and the call site assigns them to the arguments.
+    
+    optimize: نقل التعابير الثابتة داخل الحلقات إلى متغيرات مؤقتة قبلها
+              hoist loop-invariant expressions into temporaries before the loop
+    typed: توليد حسب expr_type من الفحص الدلالي: '\\' و '%' بين صحيح وقوة
+           حرفية للعدد 2 تصبح >> و & (إلا إن أمكن أن يحمل المعامل الأيسر كسراً
+           من '/')، ونهاية حلقة كرر الحرفية تُحسب مسبقاً، وأقواس حسب أسبقية
+           بايثون فقط؛ '/' تبقى قسمة حقيقية
+           emit using the semantic expr_type: '\\' and '%' between a صحيح
+           and a literal power of two become >> and & (unless the left
+           operand may hold a fraction from '/'), a literal for-loop end is
+           folded into the range stop, and parentheses appear only where
+           Python precedence needs them; '/' stays true division
+    vectorize: حلقات كرر التي جسمها إسنادات لعناصر [متغير الحلقة] فقط تصبح
+               تعابير NumPy، مع الحلقة العادية احتياطاً إن لم يتوفر NumPy أو
+               خرج المدى عن القوائم؛ الصحيح حسابه 64 بت
+               for loops whose body only assigns elements at [loop variable]
+               become NumPy expressions, with the scalar loop kept as the
+               fallback when NumPy is missing or the range is out of bounds;
+               integer arithmetic is 64-bit
+    arrays: قوائم صحيح/حقيقي تصبح array('q'/'d') وقوائم منطقي bytearray؛
+            الصحيح محدود بـ 64 بت، وعناصر المنطقي تُقرأ 0/1. إن خزّن البرنامج
+            ناتج '/' في عنصر قائمة صحيح تبقى قوائم الصحيح قوائم بايثون
+            صحيح/حقيقي lists become array('q'/'d') and منطقي lists a
+            bytearray; integers are limited to 64 bits and boolean elements
+            read back as 0/1. If the program stores a '/' result in a صحيح
+            list element, صحيح lists stay Python lists
+    fast_io: اطبع و اقرا عبر arabic_runtime.Streams (إخراج مخزَّن وقراءة
+             كلمات) بدلاً من print و input، للتشغيل على ملفات كبيرة
+             print and read go through arabic_runtime.Streams (buffered
+             output, token input) instead of print and input, for batch
+             runs over large files
+    """
     
-    def __init__(self):
+    def __init__(self, optimize=False, typed=False, arrays=False, vectorize=False, fast_io=False):
+        self.optimize = optimize
+        self.typed = typed
+        self.arrays = arrays
+        self.vectorize = vectorize
+        self.fast_io = fast_io
         self.indent_level = 0
         self.indent_str = "    "  # 4 spaces
         self.generated_code = []
         self.temp_var_counter = 0
         self.in_procedure = False
         self.procedure_code = {}  # Store procedure code separately
+        self.visitors = {}  # صنف العقدة -> دالة الزيارة - node class -> bound visitor
+        self.hoisted = {}  # كود التعبير الثابت -> متغير مؤقت - invariant expression code -> temporary
+        self.symbols = SymbolTable()  # نطاقات الأسماء أثناء التوليد - name scopes during generation
+        self.type_names = {}  # id(TypeInfo) -> اسم النوع - type name, for record constructors
+        self.uses_array = False
+        self.uses_vectors = False
+        self.fractional_names = set()  # أسماء صحيح قد تحمل كسراً - صحيح names that may hold a fraction
+        self.fractional_elements = False  # عناصر قوائم الصحيح قد تحمل كسراً - صحيح list elements may hold one
+        self.sink = None  # دالة كتابة المخرج عند البث - the sink's write function when streaming
+        self.flushed_lines = 0
+        self.flush_at = sys.maxsize
         
-    def generate(self, ast_node):
-        """توليد الكود من شجرة AST - Generate code from AST"""
+    def generate(self, ast_node, sink=None):
+        """توليد الكود من شجرة AST - Generate code from AST
+        
+        Args:
+            ast_node: جذر الشجرة - the tree root
+            sink: مخرج نصي (ملف، io.TextIOBase، أي كائن له write، أو مولد
+                  مُهيأ يستقبل بـ send)؛ الكود يُكتب إليه كل STREAM_BUFFER_LINES
+                  سطراً بدلاً من جمعه، فالنص نفسه بذاكرة إضافية ثابتة
+                  a text sink (file, io.TextIOBase, anything with write, or a
+                  primed generator fed with send); code is written to it every
+                  STREAM_BUFFER_LINES lines instead of being collected, giving
+                  the same text in constant extra memory
+        
+        Returns:
+            str: الكود المولد، أو None عند الكتابة إلى sink
+                 the generated code, or None when writing to a sink
+        
+        عند البث لا يمكن الرجوع إلى أسطر كُتبت، فاستيراد array ودوال NumPy
+        المساعدة يُضافان حسب خياري arrays/vectorize لا حسب الاستخدام.
+        Lines already written cannot be patched, so when streaming the array
+        import and the NumPy helpers follow the arrays/vectorize options
+        rather than actual use.
+        """
         if not ast_node:
-            return ""
+            return "" if sink is None else None
         
         self.generated_code = []
-        self.visit(ast_node)
+        self.hoisted = {}
+        self.symbols = SymbolTable()
+        self.type_names = {}
+        self.uses_array = False
+        self.uses_vectors = False
+        self.flushed_lines = 0
+        if sink is None:
+            self.sink = None
+            self.flush_at = sys.maxsize
+        else:
+            self.sink = getattr(sink, 'write', None) or sink.send
+            self.flush_at = STREAM_BUFFER_LINES
+        
+        try:
+            self.visit(ast_node)
+            if self.sink is not None:
+                self.flush_lines()
+                return None
+        finally:
+            self.sink = None
+            self.flush_at = sys.maxsize
         
         # Combine all code
         code = "\n".join(self.generated_code)
@@ -36,10 +196,40 @@ class CodeGenerator:
         """إصدار سطر كود - Emit a line of code"""
         indent = self.indent_str * self.indent_level
         self.generated_code.append(indent + code_line)
+        if len(self.generated_code) >= self.flush_at:
+            self.flush_lines()
     
     def emit_blank(self):
         """إصدار سطر فارغ - Emit blank line"""
         self.generated_code.append("")
+        if len(self.generated_code) >= self.flush_at:
+            self.flush_lines()
+    
+    def flush_lines(self):
+        """كتابة الأسطر المنتظرة إلى المخرج - Write the pending lines to the sink
+        
+        الفواصل كما في "\\n".join للكود كله - separators as in "\\n".join over the whole code
+        """
+        if not self.generated_code:
+            return
+        text = "\n".join(self.generated_code)
+        self.sink("\n" + text if self.flushed_lines else text)
+        self.flushed_lines += len(self.generated_code)
+        self.generated_code = []
+    
+    @property
+    def line_count(self):
+        """عدد الأسطر المولدة حتى الآن - Lines emitted so far"""
+        return self.flushed_lines + len(self.generated_code)
+    
+    def runtime_imports(self):
+        """أسطر استيراد array ودوال NumPy المساعدة - The array import and NumPy helper lines"""
+        lines = []
+        if self.uses_array:
+            lines.append("from array import array")
+        if self.uses_vectors:
+            lines.extend(["", *_VECTOR_RUNTIME])
+        return lines
     
     def increase_indent(self):
         """زيادة المسافة البادئة - Increase indentation"""
@@ -67,8 +257,11 @@ class CodeGenerator:
         if node is None:
             return ""
         
-        method_name = f'visit_{node.__class__.__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
+        try:
+            visitor = self.visitors[node.__class__]
+        except KeyError:
+            visitor = getattr(self, f'visit_{node.__class__.__name__}', self.generic_visit)
+            self.visitors[node.__class__] = visitor
         return visitor(node)
     
     def generic_visit(self, node):
@@ -92,21 +285,49 @@ class CodeGenerator:
         # Add imports
         self.emit("import sys")
         self.emit("import math")
+        if self.fast_io:
+            self.emit("from arabic_runtime import Streams")
+        imports_end = len(self.generated_code)
+        if self.arrays or self.typed:
+            self.fractional_names, self.fractional_elements = self.find_fractions(node.block)
+        if self.sink is not None:
+            self.uses_array = self.arrays
+            self.uses_vectors = self.vectorize
+            for line in self.runtime_imports():
+                self.emit(line)
         self.emit_blank()
+        if self.fast_io:
+            self.emit("_io = Streams()")
+            self.emit("_write, _token = _io.write, _io.token")
+            self.emit_blank()
         
         # Generate block code
         self.visit(node.block)
+        if self.sink is None:
+            self.generated_code[imports_end:imports_end] = self.runtime_imports()
         
         # Add main execution
         self.emit_blank()
         self.emit("if __name__ == '__main__':")
         self.increase_indent()
-        self.emit("main()")
+        if self.fast_io:
+            self.emit("try:")
+            self.increase_indent()
+            self.emit("main()")
+            self.decrease_indent()
+            self.emit("finally:")
+            self.increase_indent()
+            self.emit("_io.flush()")
+            self.decrease_indent()
+        else:
+            self.emit("main()")
         self.emit("print('exit')")
         self.decrease_indent()
     
     def visit_BlockNode(self, node):
         """توليد كود الكتلة - Generate block code"""
+        self.declare_block(node)
+        
         # Constants
         if node.constants:
             self.emit("# ===== الثوابت - Constants =====")
@@ -128,13 +349,6 @@ class CodeGenerator:
                 self.visit(var)
             self.emit_blank()
         
-        # Procedures
-        if node.procedures:
-            self.emit("# ===== الإجراءات - Procedures =====")
-            for proc in node.procedures:
-                self.visit(proc)
-            self.emit_blank()
-        
         # Main instructions
         if node.instructions:
             if not self.in_procedure:
@@ -146,6 +360,12 @@ class CodeGenerator:
                 if node.variables:
                     for var in node.variables:
                         self.visit_VarDeclNode_init(var)
+            
+            # Procedures, nested so they reach the program variables as closure cells
+            if node.procedures:
+                self.emit("# ===== الإجراءات - Procedures =====")
+                for proc in node.procedures:
+                    self.visit(proc)
                 
             self.visit(node.instructions)
             
@@ -157,7 +377,10 @@ class CodeGenerator:
     def visit_ConstantDefNode(self, node):
         """توليد كود تعريف الثابت - Generate constant definition"""
         name = self.sanitize_name(node.name)
-        value = self.format_value(node.value)
+        if isinstance(node.value_node, ConstantRefNode):
+            value = self.sanitize_name(node.value_node.name)
+        else:
+            value = self.format_value(node.value)
         self.emit(f"{name} = {value}  # ثابت - Constant")
     
     def format_value(self, value):
@@ -183,13 +406,17 @@ class CodeGenerator:
                 self.emit(f"class {name}:")
                 self.increase_indent()
                 self.emit(f'"""سجل - Record type"""')
+                # حقول ثابتة: بلا __dict__ لكل نسخة - fixed fields: no per-instance __dict__
+                fields = [self.sanitize_name(field_name) for field_name in node.type_spec.fields]
+                self.emit(f"__slots__ = {tuple(fields)!r}")
+                self.emit_blank()
                 self.emit("def __init__(self):")
                 self.increase_indent()
                 
                 # Initialize fields
-                for field_name, field_type in node.type_spec.fields.items():
+                for field, field_type in zip(fields, node.type_spec.fields.values()):
                     default_value = self.get_default_value(field_type)
-                    self.emit(f"self.{self.sanitize_name(field_name)} = {default_value}")
+                    self.emit(f"self.{field} = {default_value}")
                 
                 self.decrease_indent()
                 self.decrease_indent()
@@ -200,31 +427,152 @@ class CodeGenerator:
                 self.emit(f"# {name}: قائمة من {node.type_spec.list_size} عنصر من نوع {node.type_spec.base_type}")
                 self.emit(f"# {name}: List of {node.type_spec.list_size} elements of type {node.type_spec.base_type}")
     
+    def resolve_type(self, type_info):
+        """حل اسم النوع المعرف إلى TypeInfo - Resolve a named type to its TypeInfo
+        
+        type_info: TypeInfo أو اسم نوع - a TypeInfo or a type name
+        """
+        if not isinstance(type_info, TypeInfo):
+            return self.symbols.lookup_type(str(type_info)) or TypeInfo(str(type_info))
+        if not (type_info.is_list or type_info.is_record):
+            # اسم نوع معرف يُحل عند الحاجة - a named type resolved on demand
+            resolved = self.symbols.lookup_type(type_info.base_type)
+            if resolved is not None and (resolved.is_list or resolved.is_record):
+                return resolved
+        return type_info
+    
     def get_default_value(self, type_info):
-        """الحصول على القيمة الافتراضية للنوع - Get default value for type"""
-        if isinstance(type_info, TypeInfo):
-            base = type_info.base_type
-        else:
-            base = str(type_info)
+        """الحصول على القيمة الافتراضية للنوع - Get default value for type
         
-        if base in ['صحيح', 'حقيقي']:
+        type_info: TypeInfo أو اسم نوع - a TypeInfo or a type name
+        """
+        type_info = self.resolve_type(type_info)
+        base = type_info.base_type
+        
+        if type_info.is_list:
+            return self.get_list_default(type_info)
+        elif type_info.is_record:
+            name = self.type_names.get(id(type_info))
+            return f"{self.sanitize_name(name)}()" if name else "None"
+        elif base == 'صحيح':
             return "0"
+        elif base == 'حقيقي':
+            return "0.0"
         elif base == 'منطقي':
             return "False"
         elif base == 'حرفي':
             return "''"
         elif base == 'خيط_رمزي':
             return '""'
-        elif isinstance(type_info, TypeInfo) and type_info.is_list:
-            size = type_info.list_size
-            elem_default = self.get_default_value(type_info.base_type)
-            return f"[{elem_default}] * {size}"
-        elif isinstance(type_info, TypeInfo) and type_info.is_record:
-            # Return None, will be initialized later
-            return "None"
         else:
             return "None"
     
+    def get_list_default(self, type_info):
+        """القيمة الابتدائية لقائمة - Initial value of a list"""
+        size = type_info.list_size
+        element = self.symbols.lookup_type(type_info.base_type) or TypeInfo(type_info.base_type)
+        
+        if self.arrays and not (element.is_list or element.is_record):
+            if element.base_type == 'صحيح' and not self.fractional_elements:
+                self.uses_array = True
+                return f"array('q', [0]) * {size}"
+            if element.base_type == 'حقيقي':
+                self.uses_array = True
+                return f"array('d', [0.0]) * {size}"
+            if element.base_type == 'منطقي':
+                return f"bytearray({size})"
+        
+        element_default = self.get_default_value(element)
+        if element.is_list or element.is_record:
+            # عنصر مستقل لكل موضع - a separate object per slot
+            return f"[{element_default} for _ in range({size})]"
+        return f"[{element_default}] * {size}"
+    
+    # ==================== Array Lowering ====================
+    
+    def find_fractions(self, block):
+        """أين قد يحمل صحيح كسراً؟ - Where may a صحيح hold a fraction?
+        
+        الفحص الدلالي يقبل ناتج '/' حيث يُنتظر صحيح، فالكسر يصل إلى متغير أو
+        قائمة مباشرة أو عبر متغيرات ومعاملات. التحليل لا يتبع ترتيب التنفيذ ولا
+        النطاقات (الاسم يكفي)، ويُعاد حتى لا يتغير شيء. قوائم الصحيح كلها
+        نوع واحد عند الفحص (TypeInfo تقارن نوع العنصر فقط) وقد تشير قائمتان
+        إلى نفس الكائن بعد إسناد أو تمرير، فالنتيجة واحدة لكل قوائم الصحيح.
+        The checker accepts a '/' result where صحيح is expected, so a
+        fraction reaches a variable or a list directly or through variables
+        and parameters. The analysis ignores execution order and scopes
+        (names are enough) and repeats until nothing changes. All صحيح lists
+        are one type to the checker (TypeInfo compares only the element
+        type) and two of them may share an object after an assignment or a
+        call, so the answer covers every صحيح list.
+        
+        Returns:
+            tuple: (أسماء قد تحمل كسراً، هل قد يحمل عنصر قائمة صحيح كسراً)
+                   (names that may hold a fraction, whether a صحيح list element may)
+        """
+        procedures = {}
+        statements = list(self.data_statements(block, procedures))
+        names = set()  # أسماء قد تحمل كسراً - names that may hold a fraction
+        tables = False
+        while True:
+            before = (len(names), tables)
+            for stmt in statements:
+                if isinstance(stmt, AssignmentNode):
+                    targets = [stmt.variable] if self.may_be_fraction(stmt.expression, names, tables) else []
+                else:
+                    targets = []
+                    for proc in procedures.get(stmt.procedure_name, ()):
+                        params = [(name, param.pass_mode) for param in proc.params for name in param.names]
+                        for (name, pass_mode), arg in zip(params, stmt.arguments):
+                            if self.may_be_fraction(arg, names, tables):
+                                names.add(name)
+                            if pass_mode == 'BY_REFERENCE' and name in names and isinstance(arg, VarAccessNode):
+                                targets.append(arg)
+                for target in targets:
+                    if isinstance(target.selector, IndexedSelectorNode):
+                        tables = tables or self.base_type_of(target) == 'صحيح'
+                    else:
+                        names.add(target.name)
+            if (len(names), tables) == before:
+                return names, tables
+    
+    def data_statements(self, block, procedures):
+        """الإسنادات والاستدعاءات في كتلة وإجراءاتها - Assignments and calls in a block and its procedures
+        
+        procedures: يُملأ بالإجراءات حسب الاسم - filled with the procedures by name
+        """
+        for proc in block.procedures:
+            procedures.setdefault(proc.name, []).append(proc)
+            if proc.block:
+                yield from self.data_statements(proc.block, procedures)
+        instructions = block.instructions
+        pending = list(instructions) if isinstance(instructions, list) else [instructions]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, (AssignmentNode, CallNode)):
+                yield node
+            elif isinstance(node, CompoundStmtNode):
+                pending.extend(node.statements)
+            elif isinstance(node, IfNode):
+                pending.extend([node.then_stmt, node.else_stmt])
+                pending.extend(stmt for _, stmt in node.elif_parts)
+            elif isinstance(node, (ForLoopNode, WhileLoopNode, RepeatUntilNode)):
+                pending.append(node.body)
+    
+    def may_be_fraction(self, node, names, tables):
+        """هل قد تكون قيمة التعبير كسراً؟ - May the expression's value be a fraction?"""
+        if isinstance(node, BinOpNode):
+            return (node.operator == '/' or self.may_be_fraction(node.left, names, tables)
+                    or self.may_be_fraction(node.right, names, tables))
+        if isinstance(node, UnaryOpNode):
+            return self.may_be_fraction(node.operand, names, tables)
+        if isinstance(node, VarAccessNode):
+            if isinstance(node.selector, IndexedSelectorNode):
+                return tables and self.base_type_of(node) == 'صحيح'
+            return node.name in names
+        # طي الثوابت يحوّل 7 / 2 إلى 3.5 - constant folding turns 7 / 2 into 3.5
+        return isinstance(node, LiteralNode) and type(node.value) is float
+    
     # ==================== Variables ====================
     
     def visit_VarDeclNode(self, node):
@@ -237,21 +585,8 @@ class CodeGenerator:
         """تهيئة المتغير - Initialize variable"""
         for name in node.names:
             sanitized = self.sanitize_name(name)
-            # Try to get type info from symbol table or use basic default
-            default_val = "None"
-            
-            # Map Arabic type names to defaults
-            if node.data_type == 'صحيح':
-                default_val = "0"
-            elif node.data_type == 'حقيقي':
-                default_val = "0.0"
-            elif node.data_type == 'منطقي':
-                default_val = "False"
-            elif node.data_type == 'حرفي':
-                default_val = "''"
-            elif node.data_type == 'خيط_رمزي':
-                default_val = '""'
-            
+            # كل متغير قائمة أو سجل كائن مستقل - every list or record variable gets its own object
+            default_val = self.get_default_value(node.data_type)
             self.emit(f"{sanitized} = {default_val}")
     
     # ==================== Procedures ====================
@@ -276,30 +611,173 @@ class CodeGenerator:
         old_in_proc = self.in_procedure
         self.in_procedure = True
         
+        self.symbols.enter_scope()
+        for param in node.params:
+            data_type = self.resolve_type(param.data_type)
+            for name in param.names:
+                self.declare(name, 'PARAMETER', data_type=data_type)
+        
         # Generate procedure body
         if node.block:
+            self.declare_block(node.block)
+            self.emit_bindings(node.block.instructions)
+            
+            # Local constants
+            for const in node.block.constants:
+                self.visit(const)
+            
+            # Local types
+            for type_def in node.block.types:
+                self.visit(type_def)
+            
             # Handle variable declarations in procedure
             if node.block.variables:
                 for var in node.block.variables:
                     self.visit_VarDeclNode_init(var)
             
+            # Nested procedures
+            for proc in node.block.procedures:
+                self.visit(proc)
+            
             # Generate instructions
             if node.block.instructions:
                 self.visit(node.block.instructions)
         else:
             self.emit("pass")
         
+        # القيم النهائية للمعاملات بالمرجع - final values of by-reference parameters
+        references = [
+            self.sanitize_name(name)
+            for param in node.params if param.pass_mode == 'BY_REFERENCE'
+            for name in param.names
+        ]
+        if references:
+            self.emit(f"return {', '.join(references)}")
+        
+        self.symbols.exit_scope()
         self.in_procedure = old_in_proc
         self.decrease_indent()
         self.emit_blank()
     
+    # ==================== Scope Resolution ====================
+    
+    def declare(self, name, symbol_type, params=None, data_type=None):
+        """تسجيل اسم في النطاق الحالي - Register a name in the current scope"""
+        try:
+            self.symbols.insert(Symbol(name=name, symbol_type=symbol_type, data_type=data_type, params=params))
+        except SemanticError:
+            pass  # معرّف مسبقاً، أبلغ عنه الفحص الدلالي - a duplicate the checker reported
+    
+    def declare_block(self, block):
+        """تسجيل أسماء كتلة - Register the names a block defines"""
+        for const in block.constants:
+            self.declare(const.name, 'CONSTANT')
+        for type_def in block.types:
+            self.declare(type_def.name, 'TYPE', data_type=type_def.type_spec)
+            self.type_names[id(type_def.type_spec)] = type_def.name
+        for var in block.variables:
+            data_type = self.resolve_type(var.data_type)
+            for name in var.names:
+                self.declare(name, 'VARIABLE', data_type=data_type)
+        for proc in block.procedures:
+            params = [
+                ParamSymbol(name, param.data_type, param.pass_mode)
+                for param in proc.params
+                for name in param.names
+            ]
+            self.declare(proc.name, 'PROCEDURE', params)
+    
+    def binding_of(self, name):
+        """مكان الاسم في بايثون - Where a name lives in the generated Python
+        
+        Returns:
+            str: 'local' أو 'nonlocal' (متغير مغلق من دالة خارجية) أو 'global'
+                 (ثوابت البرنامج وأنواعه)، أو None لاسم غير معرّف
+                 'local', 'nonlocal' (a cell of an enclosing function), 'global'
+                 (program constants and types), or None for an unknown name
+        """
+        symbol = self.symbols.lookup(name)
+        if symbol is None:
+            return None
+        if symbol.scope_level == 0 and symbol.symbol_type in ('CONSTANT', 'TYPE'):
+            return 'global'
+        if symbol.scope_level == self.symbols.current_scope_level:
+            return 'local'
+        return 'nonlocal'
+    
+    def emit_bindings(self, instructions):
+        """إعلان global/nonlocal للأسماء الخارجية التي يُسند إليها الإجراء
+        Declare the outer names a procedure assigns as global/nonlocal
+        """
+        declarations = {'global': [], 'nonlocal': []}
+        for name in dict.fromkeys(self.bound_names(instructions)):
+            binding = self.binding_of(name)
+            if binding in declarations:
+                declarations[binding].append(self.sanitize_name(name))
+        for keyword, names in declarations.items():
+            if names:
+                self.emit(f"{keyword} {', '.join(names)}")
+    
+    def bound_names(self, node):
+        """الأسماء التي تربطها العبارات (إسناد، قراءة، متغير حلقة)
+        Names bound by statements (assignment, input, loop variable)
+        """
+        if node is None:
+            return
+        if isinstance(node, CompoundStmtNode):
+            for stmt in node.statements:
+                yield from self.bound_names(stmt)
+        elif isinstance(node, (AssignmentNode, InputNode)):
+            if node.variable.selector is None:
+                yield node.variable.name
+        elif isinstance(node, CallNode):
+            for arg in self.reference_arguments(node):
+                if arg.selector is None:
+                    yield arg.name
+        elif isinstance(node, IfNode):
+            yield from self.bound_names(node.then_stmt)
+            for _, stmt in node.elif_parts:
+                yield from self.bound_names(stmt)
+            yield from self.bound_names(node.else_stmt)
+        elif isinstance(node, ForLoopNode):
+            yield node.loop_var
+            yield from self.bound_names(node.body)
+        elif isinstance(node, (WhileLoopNode, RepeatUntilNode)):
+            yield from self.bound_names(node.body)
+    
+    def reference_positions(self, procedure_name):
+        """مواضع المعاملات بالمرجع - Positions of a procedure's by-reference parameters"""
+        symbol = self.symbols.lookup(procedure_name)
+        if symbol is None or symbol.symbol_type != 'PROCEDURE':
+            return []
+        return [i for i, param in enumerate(symbol.params) if param.pass_mode == 'BY_REFERENCE']
+    
+    def is_writable(self, node):
+        """هل الوسيط متغير يمكن الإسناد إليه؟ - Is the argument an assignable variable?"""
+        if not isinstance(node, VarAccessNode):
+            return False
+        symbol = self.symbols.lookup(node.name)
+        return symbol is not None and symbol.symbol_type in ('VARIABLE', 'PARAMETER')
+    
+    def reference_arguments(self, node):
+        """الوسائط القابلة للإسناد في مواضع بالمرجع - Writable arguments in by-reference positions"""
+        arguments = node.arguments
+        return [
+            arguments[i] for i in self.reference_positions(node.procedure_name)
+            if i < len(arguments) and self.is_writable(arguments[i])
+        ]
+    
     # ==================== Statements ====================
     
     def visit_CompoundStmtNode(self, node):
         """توليد كود العبارة المركبة - Generate compound statement"""
+        start = self.line_count
         for stmt in node.statements:
             if stmt:
                 self.visit(stmt)
+        if self.line_count == start:
+            # كتلة فارغة - an empty body still needs a statement
+            self.emit("pass")
     
     def visit_AssignmentNode(self, node):
         """توليد كود الإسناد - Generate assignment"""
@@ -312,16 +790,23 @@ class CodeGenerator:
         var_code = self.visit(node.variable)
         
         # Determine type for conversion
-        type_str = "input"
+        # input() مع قارئ arabic_runtime يفقد ما خزّنه - input() would lose what the reader buffered
+        type_str = "_io.read_line()" if self.fast_io else "input()"
         if hasattr(node.variable, 'expr_type') and node.variable.expr_type:
             base_type = node.variable.expr_type.base_type if isinstance(node.variable.expr_type, TypeInfo) else str(node.variable.expr_type)
             
-            if base_type == 'صحيح':
+            if self.fast_io:
+                type_str = {
+                    'صحيح': "int(_token())",
+                    'حقيقي': "float(_token())",
+                    'منطقي': "_io.read_bool()",
+                }.get(base_type, "_io.read_line()")
+            elif base_type == 'صحيح':
                 type_str = "int(input())"
             elif base_type == 'حقيقي':
                 type_str = "float(input())"
             elif base_type == 'منطقي':
-                type_str = "input().lower() in ['صح', 'true', '1', 'yes']"
+                type_str = "input().lower() in ('صح', 'true', '1', 'yes')"
             else:
                 type_str = "input()"
         
@@ -332,22 +817,97 @@ class CodeGenerator:
         items = []
         for item in node.items:
             item_code = self.visit(item)
+            if self.arrays:
+                if self.may_hold_bit(item):
+                    # عناصر bytearray تُقرأ 0/1 - bytearray elements read back as 0/1
+                    item_code = f"bool({item_code})"
+                else:
+                    item_code = self.printable_list(item, item_code)
             items.append(item_code)
         
         items_str = ", ".join(items)
-        self.emit(f"print({items_str})")
+        if self.fast_io:
+            # سطر كامل في استدعاء write واحد - one write call per line
+            line_format = " ".join(["%s"] * len(items)) + "\\n"
+            values = f"({items_str},)" if len(items) == 1 else f"({items_str})"
+            self.emit(f'_write("{line_format}" % {values})')
+        else:
+            self.emit(f"print({items_str})")
+    
+    def printable_list(self, node, code):
+        """قائمة array/bytearray تُطبع كقائمة بايثون - An array/bytearray list printed as a Python list
+        
+        بدونها تظهر array('q', [...]) أو bytearray(b'...') بدل [...] كما في الوضع العادي.
+        Without it the output shows array('q', [...]) or bytearray(b'...')
+        instead of the [...] the default mode prints.
+        """
+        expr_type = getattr(node, 'expr_type', None)
+        if expr_type is None:
+            return code
+        list_type = self.resolve_type(expr_type)
+        if not list_type.is_list:
+            return code
+        return self.list_display(list_type, code, 0)
+    
+    def list_display(self, list_type, code, depth):
+        """كود قائمة بايثون من قائمة قد تكون array/bytearray - Python list code for a possibly array-backed list"""
+        element = self.resolve_type(list_type.base_type)
+        item = f"_v{depth}"
+        if element.is_list:
+            # قائمة قوائم: كل قائمة داخلية تُحوَّل - a list of lists: convert each inner list
+            inner = self.list_display(element, item, depth + 1)
+            return code if inner == item else f"[{inner} for {item} in {code}]"
+        if element.base_type in ('صحيح', 'حقيقي'):
+            return f"list({code})"
+        if element.base_type == 'منطقي':
+            return f"[bool({item}) for {item} in {code}]"
+        return code
+    
+    def may_hold_bit(self, node):
+        """قيمة منطقية قد تكون 0/1 من bytearray - A boolean that may be a 0/1 from a bytearray"""
+        if self.base_type_of(node) != 'منطقي':
+            return False
+        if isinstance(node, BinOpNode):
+            return node.operator in ('&&', '||')
+        return isinstance(node, VarAccessNode)
     
     def visit_CallNode(self, node):
         """توليد كود استدعاء الإجراء - Generate procedure call"""
         proc_name = self.sanitize_name(node.procedure_name)
+        references = self.reference_positions(node.procedure_name)
         
         args = []
-        for arg in node.arguments:
-            arg_code = self.visit(arg)
+        targets = []
+        for i, arg in enumerate(node.arguments):
+            if i in references:
+                if self.is_writable(arg):
+                    arg_code = self.reference_argument(arg)
+                    targets.append(arg_code)
+                else:
+                    arg_code = self.visit(arg)
+                    targets.append("_")
+            else:
+                arg_code = self.visit(arg)
             args.append(arg_code)
         
         args_str = ", ".join(args)
-        self.emit(f"{proc_name}({args_str})")
+        if any(target != "_" for target in targets):
+            self.emit(f"{', '.join(targets)} = {proc_name}({args_str})")
+        else:
+            self.emit(f"{proc_name}({args_str})")
+    
+    def reference_argument(self, node):
+        """وسيط بالمرجع؛ الفهرس يُحسب قبل الاستدعاء مرة واحدة
+        A by-reference argument; its index is computed once, before the call
+        """
+        selector = node.selector
+        if isinstance(selector, IndexedSelectorNode) and not isinstance(selector.index_expr, LiteralNode):
+            # الإجراء قد يغير متغير الفهرس، والإسناد بعده يجب أن يصل للعنصر نفسه
+            # the call may change the index variable; the write-back must hit the same element
+            temp = self.get_temp_var()
+            self.emit(f"{temp} = {self.visit(selector.index_expr)}")
+            return f"{self.sanitize_name(node.name)}[{temp}]"
+        return self.visit(node)
     
     # ==================== Control Flow ====================
     
@@ -387,15 +947,26 @@ class CodeGenerator:
     
     def visit_ForLoopNode(self, node):
         """توليد كود حلقة for - Generate for loop"""
+        statements = self.vector_statements(node)
+        if statements:
+            self.emit_vector_loop(node, statements)
+            return
+        
+        # حدود الحلقة تُحسب مرة واحدة أصلاً - the bounds are evaluated once anyway
+        hoisted = self.hoist_invariants(node, [])
         loop_var = self.sanitize_name(node.loop_var)
         start_code = self.visit(node.start_expr)
         end_code = self.visit(node.end_expr)
+        if self.typed and isinstance(node.end_expr, LiteralNode) and type(node.end_expr.value) is int:
+            stop_code = str(node.end_expr.value + 1)
+        else:
+            stop_code = f"{end_code} + 1"
         
         if node.step_expr:
             step_code = self.visit(node.step_expr)
-            self.emit(f"for {loop_var} in range({start_code}, {end_code} + 1, {step_code}):")
+            self.emit(f"for {loop_var} in range({start_code}, {stop_code}, {step_code}):")
         else:
-            self.emit(f"for {loop_var} in range({start_code}, {end_code} + 1):")
+            self.emit(f"for {loop_var} in range({start_code}, {stop_code}):")
         
         self.increase_indent()
         
@@ -405,9 +976,11 @@ class CodeGenerator:
             self.emit("pass")
         
         self.decrease_indent()
+        self.release_invariants(hoisted)
     
     def visit_WhileLoopNode(self, node):
         """توليد كود حلقة while - Generate while loop"""
+        hoisted = self.hoist_invariants(node, [node.condition])
         condition_code = self.visit(node.condition)
         self.emit(f"while {condition_code}:")
         self.increase_indent()
@@ -418,9 +991,11 @@ class CodeGenerator:
             self.emit("pass")
         
         self.decrease_indent()
+        self.release_invariants(hoisted)
     
     def visit_RepeatUntilNode(self, node):
         """توليد كود حلقة repeat-until - Generate repeat-until loop"""
+        hoisted = self.hoist_invariants(node, [node.condition])
         # Repeat-until is do-while equivalent
         # Generate as while True with break condition
         self.emit("while True:")
@@ -437,6 +1012,300 @@ class CodeGenerator:
         self.decrease_indent()
         
         self.decrease_indent()
+        self.release_invariants(hoisted)
+    
+    # ==================== Vectorized Loops ====================
+    
+    def vector_statements(self, node):
+        """إسنادات الحلقة إن أمكن تحويلها إلى NumPy - The loop's assignments, if NumPy can run them
+        
+        كل قراءة وكتابة لعنصر تكون عند [متغير الحلقة] تماماً، فالدورة i لا تلمس
+        إلا العنصر i، وتنفيذ كل إسناد على المدى كله بالترتيب يعطي النتيجة نفسها.
+        Every element read and write is at exactly [loop variable], so
+        iteration i only touches element i and running each assignment over
+        the whole range in order gives the same result.
+        
+        Returns:
+            list: AssignmentNode، أو None - the assignments, or None
+        """
+        if not self.vectorize or node.step_expr is not None:
+            return None
+        body = node.body
+        statements = body.statements if isinstance(body, CompoundStmtNode) else [body]
+        statements = [stmt for stmt in statements if stmt is not None]
+        for stmt in statements:
+            if not isinstance(stmt, AssignmentNode):
+                return None
+            if not self.is_element_at(stmt.variable, node.loop_var):
+                return None
+            if not self.is_vector_expression(stmt.expression, node.loop_var):
+                return None
+            # '/' قسمة حقيقية؛ NumPy يقتطعها بصمت في قائمة صحيح
+            # '/' is true division; NumPy would silently truncate it into a صحيح list
+            if self.element_type_of(stmt.variable.name) == 'صحيح' and self.divides(stmt.expression):
+                return None
+        return statements or None
+    
+    def element_type_of(self, name):
+        """نوع عناصر متغير القائمة أو None - Element type of a list variable, or None"""
+        symbol = self.symbols.lookup(name)
+        if symbol is None or symbol.symbol_type not in ('VARIABLE', 'PARAMETER'):
+            return None
+        list_type = symbol.data_type
+        if not isinstance(list_type, TypeInfo) or not list_type.is_list:
+            return None
+        element = self.resolve_type(list_type.base_type)
+        if element.is_list or element.is_record:
+            return None
+        return element.base_type
+    
+    def is_element_at(self, node, loop_var):
+        """هل العقدة قائمة[متغير الحلقة]؟ - Is the node list[loop variable]?"""
+        if not isinstance(node, VarAccessNode) or not isinstance(node.selector, IndexedSelectorNode):
+            return False
+        index_expr = node.selector.index_expr
+        return (isinstance(index_expr, VarAccessNode) and index_expr.selector is None
+                and index_expr.name == loop_var and self.element_type_of(node.name) in _VECTOR_TYPES)
+    
+    def is_vector_expression(self, node, loop_var):
+        """هل يحسب NumPy التعبير عنصراً بعنصر؟ - Can NumPy evaluate the expression element-wise?"""
+        if isinstance(node, (LiteralNode, ConstantRefNode)):
+            return self.base_type_of(node) in _VECTOR_TYPES
+        if isinstance(node, VarAccessNode):
+            if node.selector is None:
+                return self.base_type_of(node) in _VECTOR_TYPES
+            return self.is_element_at(node, loop_var)
+        if isinstance(node, UnaryOpNode):
+            if node.operator == '!' and self.base_type_of(node.operand) != 'منطقي':
+                return False
+            return self.is_vector_expression(node.operand, loop_var)
+        if isinstance(node, BinOpNode):
+            # and/or في بايثون تُرجع أحد المعاملين، فالمنطقي فقط يطابق NumPy
+            # Python's and/or return an operand, so only booleans match NumPy
+            if node.operator in ('&&', '||') and not (
+                    self.base_type_of(node.left) == 'منطقي' == self.base_type_of(node.right)):
+                return False
+            return (self.cannot_raise(node)
+                    and self.is_vector_expression(node.left, loop_var)
+                    and self.is_vector_expression(node.right, loop_var))
+        return False
+    
+    def emit_vector_loop(self, node, statements):
+        """حلقة NumPy مع الحلقة العادية احتياطاً - A NumPy loop with the scalar loop as fallback"""
+        self.uses_vectors = True
+        loop_var = self.sanitize_name(node.loop_var)
+        start = self.get_temp_var()
+        stop = self.get_temp_var()
+        self.emit(f"{start} = {self.visit(node.start_expr)}")
+        self.emit(f"{stop} = {self.visit(node.end_expr)} + 1")
+        
+        lists = []
+        for stmt in statements:
+            lists.append(stmt.variable.name)
+            lists.extend(self.element_reads(stmt.expression))
+        bounds = " and ".join(f"{stop} <= len({self.sanitize_name(name)})" for name in dict.fromkeys(lists))
+        self.emit(f"if _np is not None and 0 <= {start} and {stop} - {start} >= {VECTORIZE_MIN_LENGTH} and {bounds}:")
+        self.increase_indent()
+        for stmt in statements:
+            vector = self.vector_code(stmt.expression, node.loop_var, start, stop)
+            self.emit(f"_store_vector({self.sanitize_name(stmt.variable.name)}, {start}, {stop}, {vector})")
+        self.emit(f"{loop_var} = {stop} - 1")
+        self.decrease_indent()
+        
+        self.emit("else:")
+        self.increase_indent()
+        hoisted = self.hoist_invariants(node, [])
+        self.emit(f"for {loop_var} in range({start}, {stop}):")
+        self.increase_indent()
+        self.visit(node.body)
+        self.decrease_indent()
+        self.release_invariants(hoisted)
+        self.decrease_indent()
+    
+    def element_reads(self, node):
+        """أسماء القوائم المقروءة في تعبير - Names of the lists an expression reads"""
+        if isinstance(node, VarAccessNode) and node.selector is not None:
+            yield node.name
+        elif isinstance(node, UnaryOpNode):
+            yield from self.element_reads(node.operand)
+        elif isinstance(node, BinOpNode):
+            yield from self.element_reads(node.left)
+            yield from self.element_reads(node.right)
+    
+    def divides(self, node):
+        """هل في التعبير قسمة حقيقية؟ - Does the expression contain a true division?"""
+        if isinstance(node, UnaryOpNode):
+            return self.divides(node.operand)
+        if isinstance(node, BinOpNode):
+            return node.operator == '/' or self.divides(node.left) or self.divides(node.right)
+        return False
+    
+    def vector_code(self, node, loop_var, start, stop):
+        """كود NumPy للتعبير على المدى [start, stop) - NumPy code over [start, stop)"""
+        if isinstance(node, VarAccessNode):
+            if node.selector is not None:
+                return f"_as_vector({self.sanitize_name(node.name)}, {start}, {stop})"
+            if node.name == loop_var:
+                return f"_np.arange({start}, {stop})"
+            return self.visit(node)
+        
+        if isinstance(node, UnaryOpNode):
+            operand = self.vector_code(node.operand, loop_var, start, stop)
+            if node.operator == '!':
+                return f"_np.logical_not({operand})"
+            return f"({self.convert_operator(node.operator)}{operand})"
+        
+        if isinstance(node, BinOpNode):
+            left = self.vector_code(node.left, loop_var, start, stop)
+            right = self.vector_code(node.right, loop_var, start, stop)
+            if node.operator == '&&':
+                return f"_np.logical_and({left}, {right})"
+            if node.operator == '||':
+                return f"_np.logical_or({left}, {right})"
+            op = self.convert_operator(node.operator)
+            return f"({left} {op} {right})"
+        
+        return self.visit(node)
+    
+    # ==================== Loop-Invariant Code Motion ====================
+    
+    def hoist_invariants(self, loop_node, conditions):
+        """نقل التعابير الثابتة قبل الحلقة - Hoist loop-invariant expressions
+        
+        التعبير الثنائي ثابت إذا كانت كل متغيراته غير مُسندة داخل الحلقة، بلا
+        فهرسة أو حقول، ولا يرفع استثناءً؛ فحسابه قبل الحلقة آمن حتى إن لم تُنفَّذ.
+        الحلقة التي تستدعي إجراءً تُترك كما هي.
+        A binary expression is invariant when none of its variables is
+        assigned in the loop, it has no selectors and it cannot raise, so
+        computing it before a loop that never runs is harmless. Loops that
+        call a procedure are left alone.
+        
+        Args:
+            loop_node: عقدة الحلقة - the loop node
+            conditions: شروط الحلقة التي تُقيَّم كل دورة - per-iteration loop conditions
+        
+        Returns:
+            list: أكواد التعابير المنقولة، لـ release_invariants - hoisted codes
+        """
+        if not self.optimize:
+            return []
+        
+        assigned = set()
+        roots = list(conditions)
+        if isinstance(loop_node, ForLoopNode):
+            assigned.add(loop_node.loop_var)
+        if not self.scan_loop(loop_node.body, assigned, roots):
+            return []
+        
+        candidates = []
+        for root in roots:
+            if self.find_invariants(root, assigned, candidates):
+                self.collect_invariant(root, candidates)
+        
+        # الأجزاء الأقصر أولاً ليظهر متغيرها المؤقت داخل الأطول
+        # shorter parts first, so longer ones are spelled with their temporaries
+        candidates.sort(key=lambda expr: len(self.visit(expr)))
+        
+        hoisted = []
+        for expr in candidates:
+            code = self.visit(expr)
+            if code in self.hoisted.values():
+                continue  # منقول مسبقاً - already hoisted (repeated or by an outer loop)
+            temp = self.get_temp_var()
+            self.emit(f"{temp} = {code}")
+            self.hoisted[code] = temp
+            hoisted.append(code)
+        return hoisted
+    
+    def release_invariants(self, hoisted):
+        """إلغاء متغيرات الحلقة المؤقتة بعد انتهائها - Forget a loop's temporaries"""
+        for code in hoisted:
+            del self.hoisted[code]
+    
+    def scan_loop(self, node, assigned, roots):
+        """جمع المتغيرات المُسندة والتعابير في جسم الحلقة - Collect assigned names and expressions
+        
+        Returns:
+            bool: False إن وُجد استدعاء إجراء - False if the body calls a procedure
+        """
+        if node is None:
+            return True
+        
+        if isinstance(node, CallNode):
+            return False
+        
+        statements = []
+        if isinstance(node, CompoundStmtNode):
+            statements = node.statements
+        elif isinstance(node, (AssignmentNode, InputNode)):
+            assigned.add(node.variable.name)
+            if isinstance(node.variable.selector, IndexedSelectorNode):
+                roots.append(node.variable.selector.index_expr)
+            if isinstance(node, AssignmentNode):
+                roots.append(node.expression)
+        elif isinstance(node, OutputNode):
+            roots.extend(node.items)
+        elif isinstance(node, IfNode):
+            roots.append(node.condition)
+            roots.extend(condition for condition, _ in node.elif_parts)
+            statements = [node.then_stmt, *(stmt for _, stmt in node.elif_parts), node.else_stmt]
+        elif isinstance(node, ForLoopNode):
+            assigned.add(node.loop_var)
+            roots.extend(expr for expr in (node.start_expr, node.end_expr, node.step_expr) if expr)
+            statements = [node.body]
+        elif isinstance(node, (WhileLoopNode, RepeatUntilNode)):
+            roots.append(node.condition)
+            statements = [node.body]
+        
+        for stmt in statements:
+            if not self.scan_loop(stmt, assigned, roots):
+                return False
+        return True
+    
+    def find_invariants(self, node, assigned, candidates):
+        """هل التعبير ثابت؟ ويجمع أكبر أجزائه الثابتة إن لم يكن
+        Whether an expression is invariant; if not, collects its largest invariant parts
+        """
+        if isinstance(node, (LiteralNode, ConstantRefNode)):
+            return True
+        
+        if isinstance(node, VarAccessNode):
+            if node.selector is None:
+                return node.name not in assigned
+            if isinstance(node.selector, IndexedSelectorNode):
+                index_expr = node.selector.index_expr
+                if self.find_invariants(index_expr, assigned, candidates):
+                    self.collect_invariant(index_expr, candidates)
+            return False
+        
+        if isinstance(node, UnaryOpNode):
+            return self.find_invariants(node.operand, assigned, candidates)
+        
+        if isinstance(node, BinOpNode):
+            left = self.find_invariants(node.left, assigned, candidates)
+            right = self.find_invariants(node.right, assigned, candidates)
+            if left and right and self.cannot_raise(node):
+                return True
+            if left:
+                self.collect_invariant(node.left, candidates)
+            if right:
+                self.collect_invariant(node.right, candidates)
+            return False
+        
+        return False
+    
+    def collect_invariant(self, node, candidates):
+        """إضافة تعبير ثابت إن كان فيه عملية ثنائية - Record an invariant part holding a BinOpNode"""
+        while isinstance(node, UnaryOpNode):
+            node = node.operand
+        if isinstance(node, BinOpNode):
+            candidates.append(node)
+    
+    def cannot_raise(self, node):
+        """هل العملية آمنة الحساب مسبقاً؟ - Is the operation safe to evaluate early?"""
+        if node.operator not in _RAISING_OPERATORS:
+            return True
+        return node.operator != '^' and isinstance(node.right, LiteralNode) and node.right.value not in (0, None)
     
     # ==================== Expressions ====================
     
@@ -446,15 +1315,96 @@ class CodeGenerator:
         right_code = self.visit(node.right)
         op = self.convert_operator(node.operator)
         
-        return f"({left_code} {op} {right_code})"
+        if self.typed:
+            lowered = self.integer_lowering(node)
+            if lowered:
+                op, right_code = lowered
+            precedence = _PRECEDENCE[op]
+            # المقارنات في بايثون تتسلسل، و ** تجميعية يميناً
+            # Python chains comparisons, and ** is right-associative
+            left_code = self.parenthesize(node.left, left_code, precedence,
+                                          strict=op == '**' or precedence == _COMPARISON)
+            right_code = self.parenthesize(node.right, right_code, precedence, strict=op != '**')
+            code = f"{left_code} {op} {right_code}"
+        else:
+            code = f"({left_code} {op} {right_code})"
+        if self.hoisted:
+            return self.hoisted.get(code, code)
+        return code
     
     def visit_UnaryOpNode(self, node):
         """توليد كود العملية الأحادية - Generate unary operation"""
         operand_code = self.visit(node.operand)
         op = self.convert_operator(node.operator)
         
+        if self.typed:
+            precedence = _PRECEDENCE['not '] if node.operator == '!' else _UNARY_SIGN
+            operand_code = self.parenthesize(node.operand, operand_code, precedence, strict=False)
+            return f"{op}{operand_code}"
         return f"({op}{operand_code})"
     
+    def base_type_of(self, node):
+        """النوع الأساسي من expr_type أو None - Base type from expr_type, or None"""
+        expr_type = getattr(node, 'expr_type', None)
+        if isinstance(expr_type, TypeInfo):
+            if expr_type.is_list or expr_type.is_record:
+                return None
+            return expr_type.base_type
+        return expr_type
+    
+    def integer_lowering(self, node):
+        """'\\' و '%' على قوة حرفية للعدد 2 بين صحيح كإزاحة وقناع بتات
+        '\\' and '%' by a literal power of two on a صحيح, as a shift and a bit mask
+        
+        لأعداد بايثون الصحيحة (والسالبة أيضاً) x // 2**k == x >> k و
+        x % 2**k == x & (2**k - 1)؛ مع الكسور لا تصح، فالمعامل الأيسر يجب ألا
+        يحمل ناتج '/'.
+        For Python ints, negative ones included, x // 2**k == x >> k and
+        x % 2**k == x & (2**k - 1); neither holds for floats, so the left
+        operand must not be able to hold a '/' result.
+        
+        Returns:
+            tuple: (العامل، كود المعامل الأيمن)، أو None
+                   (operator, right operand code), or None
+        """
+        if node.operator not in ('\\', '%'):
+            return None
+        divisor = node.right
+        if not isinstance(divisor, LiteralNode) or type(divisor.value) is not int:
+            return None
+        if divisor.value < 2 or divisor.value & (divisor.value - 1):
+            return None
+        if self.base_type_of(node.left) != 'صحيح':
+            return None
+        if self.may_be_fraction(node.left, self.fractional_names, self.fractional_elements):
+            return None
+        if node.operator == '%':
+            return '&', str(divisor.value - 1)
+        return '>>', str(divisor.value.bit_length() - 1)
+    
+    def precedence_of(self, node, code):
+        """أسبقية كود تعبير مولّد - Python precedence of an emitted expression"""
+        if self.hoisted and code in self.hoisted.values():
+            return _ATOM
+        if isinstance(node, BinOpNode):
+            lowered = self.integer_lowering(node) if self.typed else None
+            return _PRECEDENCE[lowered[0] if lowered else self.convert_operator(node.operator)]
+        if isinstance(node, UnaryOpNode):
+            return _PRECEDENCE['not '] if node.operator == '!' else _UNARY_SIGN
+        if isinstance(node, LiteralNode) and code.startswith('-'):
+            return _UNARY_SIGN
+        return _ATOM
+    
+    def parenthesize(self, node, code, precedence, strict):
+        """أقواس حول المعامل إن احتاجتها الأسبقية - Parenthesize an operand if precedence needs it
+        
+        strict: أقواس عند تساوي الأسبقية أيضاً - also on equal precedence
+        """
+        child = self.precedence_of(node, code)
+        if child < precedence or (strict and child == precedence):
+            return f"({code})"
+        return code
+    
     def convert_operator(self, op):
         """تحويل العامل - Convert operator"""
         op_map = {
@@ -502,6 +1452,10 @@ class CodeGenerator:
     def visit_LiteralNode(self, node):
         """توليد كود القيمة الحرفية - Generate literal"""
         if node.literal_type in ['صحيح', 'حقيقي']:
+            if node.value < 0 and not self.typed:
+                # قيمة سالبة مطوية: -4 ** 2 في بايثون هي -(4 ** 2)
+                # a folded negative value: in Python -4 ** 2 is -(4 ** 2)
+                return f"({node.value})"
             return str(node.value)
         elif node.literal_type == 'منطقي':
             return "True" if node.value else "False"
@@ -0,0 +1,264 @@
+"""
+Compilation Unit for Arabic Programming Language
+وحدة الترجمة - تحلل الشيفرة المصدرية مرة واحدة وتشارك النتائج بين جميع المراحل
+"""
+
+from antlr4 import InputStream, CommonTokenStream, Token
+from antlr4.ListTokenSource import ListTokenSource
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorListener import ConsoleErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from ArabicGrammarLexer import ArabicGrammarLexer
+from ArabicGrammarParser import ArabicGrammarParser
+from semantic_analyzer import SemanticAnalyzer
+from semantic_checker import SemanticChecker, merge_errors
+from ast_builder import ASTBuilder
+from code_generator import CodeGenerator
+from optimizer import fold_constants
+
+
+class CompilationUnit:
+    """وحدة ترجمة - Single-pass compilation unit
+
+    كل مرحلة تُحسب عند أول طلب لها فقط ثم تُحفظ، فالمصدر يُحلَّل معجمياً مرة
+    واحدة ويُحلَّل نحوياً مرة واحدة من نفس CommonTokenStream.
+    Every stage is computed lazily on first access and then kept, so the
+    source is lexed once and parsed once from the same token stream.
+
+    parse_mode:
+        'LL'  - تنبؤ LL كامل (الافتراضي) - full LL prediction (default)
+        'SLL' - محاولة SLL سريعة أولاً ثم LL عند الفشل
+                fast SLL attempt first, full LL only if it fails
+    بعد التحليل يحمل parse_path المسار الفعلي: 'SLL' أو 'LL'.
+    After parsing, parse_path records the path taken: 'SLL' or 'LL'.
+
+    front_end:
+        'parse_tree' - بناء AST من شجرة ANTLR (الافتراضي) - from the ANTLR parse tree
+        'direct'     - بناء AST مباشرة من الرموز عبر ASTBuilder، وتُضم
+                       الأخطاء النحوية إلى errors
+                       straight from tokens via ASTBuilder; syntax errors
+                       are reported in errors
+    شجرة ANTLR تبقى متاحة عبر tree في الحالتين - tree is available either way.
+
+    check_cache: ProcedureCheckCache اختياري يُشارك بين الوحدات حتى لا يُعاد
+                 فحص الإجراءات التي لم تتغير
+                 optional cache shared between units so unchanged
+                 procedures are not re-checked
+
+    tokens: رموز جاهزة للمصدر نفسه (مثلاً من IncrementalLexer) تُغني عن
+            التحليل المعجمي في الواجهتين
+            ready-made tokens for the same source (e.g. from an
+            IncrementalLexer) used instead of lexing by both front ends
+
+    optimize: تشغيل تمريرات optimizer (طي الثوابت) قبل توليد الكود، ونقل
+              التعابير الثابتة خارج الحلقات أثناءه (معطل افتراضياً)
+              run the optimizer passes (constant folding) before code
+              generation, and hoist loop-invariant expressions during it
+              (off by default)
+
+    typed: توليد الكود حسب الأنواع من الفحص الدلالي (معطل افتراضياً)
+           emit typed code from the semantic types (off by default)
+
+    arrays: قوائم صحيح/حقيقي كـ array وقوائم منطقي كـ bytearray؛ ذاكرة أقل
+            بنحو 4.7 مرة، لكن الفهرسة عنصراً عنصراً أبطأ قليلاً
+            store صحيح/حقيقي lists as array and منطقي lists as bytearray;
+            about 4.7x less memory, but element-by-element indexing is
+            somewhat slower
+
+    vectorize: حلقات كرر على عناصر القوائم كتعابير NumPy إن توفر وقت التشغيل
+               run element-wise for loops over lists as NumPy expressions
+               when NumPy is available at run time (64-bit integer arithmetic)
+
+    fast_io: اطبع و اقرأ عبر الإدخال والإخراج المخزَّن في arabic_runtime
+             print and read through arabic_runtime's buffered I/O, for
+             batch runs (input comes from sys.stdin, not an input() hook)
+    """
+
+    def __init__(self, source_code, parse_mode='LL', front_end='parse_tree', check_cache=None,
+                 tokens=None, optimize=False, typed=False, arrays=False, vectorize=False, fast_io=False):
+        if parse_mode not in ('LL', 'SLL'):
+            raise ValueError(f"نمط تحليل غير معروف: {parse_mode}")
+        if front_end not in ('parse_tree', 'direct'):
+            raise ValueError(f"واجهة أمامية غير معروفة: {front_end}")
+        self.source_code = source_code
+        self.parse_mode = parse_mode
+        self.front_end = front_end
+        self.check_cache = check_cache
+        self._given_tokens = tokens
+        self.optimize = optimize
+        self.typed = typed
+        self.arrays = arrays
+        self.vectorize = vectorize
+        self.fast_io = fast_io
+        self.parse_path = None
+        self._lexer = None
+        self._token_stream = None
+        self._parser = None
+        self._tree = None
+        self._analyzer = None
+        self._ast = None
+        self._optimized_ast = None
+        self._python_code = None
+
+    # ==================== Lexing ====================
+
+    @property
+    def lexer(self):
+        """المحلل المعجمي - Lexer"""
+        if self._lexer is None:
+            self._lexer = ArabicGrammarLexer(InputStream(self.source_code))
+        return self._lexer
+
+    @property
+    def token_stream(self):
+        """مجرى الرموز المملوء - Filled token stream"""
+        if self._token_stream is None:
+            if self._given_tokens is not None:
+                source = ListTokenSource(self._given_tokens)
+            else:
+                source = self.lexer
+            token_stream = CommonTokenStream(source)
+            token_stream.fill()
+            self._token_stream = token_stream
+        return self._token_stream
+
+    @property
+    def tokens(self):
+        """قائمة رموز القناة الافتراضية (تشمل EOF) - Default-channel tokens (including EOF)"""
+        tokens = self.token_stream.tokens
+        if self._given_tokens is not None:
+            tokens = [token for token in tokens if token.channel == Token.DEFAULT_CHANNEL]
+        return tokens
+
+    # ==================== Parsing ====================
+
+    @property
+    def parser(self):
+        """المحلل النحوي - Parser"""
+        if self._parser is None:
+            self._parser = ArabicGrammarParser(self.token_stream)
+        return self._parser
+
+    @property
+    def tree(self):
+        """شجرة التحليل النحوي - Parse tree"""
+        if self._tree is None:
+            if self.parse_mode == 'SLL':
+                self._tree = self._parse_sll_first()
+            else:
+                self._tree = self.parser.program()
+                self.parse_path = 'LL'
+        return self._tree
+
+    def _parse_sll_first(self):
+        """تحليل على مرحلتين: SLL ثم LL - Two-stage SLL/LL parse"""
+        parser = self.parser
+
+        # المرحلة الأولى: SLL مع التوقف عند أول خطأ ودون طباعة الأخطاء
+        parser._interp.predictionMode = PredictionMode.SLL
+        parser._errHandler = BailErrorStrategy()
+        parser.removeErrorListeners()
+        try:
+            tree = parser.program()
+            self.parse_path = 'SLL'
+            return tree
+        except ParseCancellationException:
+            pass
+
+        # المرحلة الثانية: إعادة التحليل بتنبؤ LL كامل وتقارير الأخطاء العادية
+        parser.reset()
+        parser.addErrorListener(ConsoleErrorListener.INSTANCE)
+        parser._errHandler = DefaultErrorStrategy()
+        parser._interp.predictionMode = PredictionMode.LL
+        tree = parser.program()
+        self.parse_path = 'LL'
+        return tree
+
+    @property
+    def syntax_error_count(self):
+        """عدد الأخطاء النحوية - Number of syntax errors"""
+        self.tree
+        return self.parser.getNumberOfSyntaxErrors()
+
+    # ==================== Semantic Analysis ====================
+
+    @property
+    def analyzer(self):
+        """المحلل الدلالي بعد الزيارة - Semantic analyzer after visiting
+
+        في الواجهة المباشرة هو SemanticChecker (له errors و symbol_table).
+        With the direct front end this is the SemanticChecker.
+        """
+        if self._analyzer is None:
+            if self.front_end == 'direct':
+                self._analyzer = self._build_direct()
+            else:
+                analyzer = SemanticAnalyzer(self.source_code, self.check_cache)
+                self._ast = analyzer.visit(self.tree)
+                self._analyzer = analyzer
+        return self._analyzer
+
+    def _build_direct(self):
+        """بناء AST دون شجرة تحليل ثم فحصها - Build the AST without a parse tree, then check it"""
+        builder = ASTBuilder(self.source_code, self._given_tokens)
+        self._ast = builder.build()
+        checker = SemanticChecker(self.source_code, self.check_cache)
+        checker.check(self._ast)
+        checker.errors = builder.errors + merge_errors(builder.semantic_errors, checker.errors)
+        return checker
+
+    @property
+    def ast(self):
+        """شجرة AST - Abstract syntax tree"""
+        self.analyzer
+        return self._ast
+
+    @property
+    def symbol_table(self):
+        """جدول الرموز - Symbol table"""
+        return self.analyzer.symbol_table
+
+    @property
+    def errors(self):
+        """الأخطاء الدلالية - Semantic errors"""
+        return self.analyzer.errors
+
+    # ==================== Optimization ====================
+
+    @property
+    def optimized_ast(self):
+        """الشجرة المحسنة (نسخة؛ ast تبقى كما هي) - Optimized tree (a copy; ast is unchanged)"""
+        if self._optimized_ast is None:
+            if self.optimize:
+                self._optimized_ast = fold_constants(self.ast, self.symbol_table)
+            else:
+                self._optimized_ast = self.ast
+        return self._optimized_ast
+
+    # ==================== Code Generation ====================
+
+    @property
+    def python_code(self):
+        """كود بايثون المولد - Generated Python code"""
+        if self._python_code is None:
+            self._python_code = self.code_generator().generate(self.optimized_ast)
+        return self._python_code
+
+    def write_python(self, sink):
+        """كتابة الكود المولد إلى مخرج نصي دون الاحتفاظ به - Stream the generated code to a text sink
+
+        sink كما في CodeGenerator.generate (ملف، أنبوب، مولد مُهيأ).
+        sink as in CodeGenerator.generate (a file, a pipe, a primed generator).
+        """
+        if self._python_code is None:
+            self.code_generator().generate(self.optimized_ast, sink=sink)
+        elif hasattr(sink, 'write'):
+            sink.write(self._python_code)
+        else:
+            sink.send(self._python_code)
+
+    def code_generator(self):
+        """مولد كود بخيارات هذه الوحدة - A code generator with this unit's options"""
+        return CodeGenerator(optimize=self.optimize, typed=self.typed, arrays=self.arrays,
+                             vectorize=self.vectorize, fast_io=self.fast_io)
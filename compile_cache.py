@@ -0,0 +1,303 @@
+"""
+Compilation Cache for Arabic Programming Language
+ذاكرة تخزين مؤقت لنتائج الترجمة - مفتاحها بصمة الشيفرة المصدرية ونسخة المترجم
+"""
+
+import hashlib
+import importlib.util
+import marshal
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import ArabicGrammarLexer
+import ArabicGrammarParser
+
+
+# يجب رفع هذا الرقم عند أي تغيير يؤثر على مخرجات المترجم
+# Bump whenever a change alters compiler output
+COMPILER_VERSION = "1.8"
+
+
+def _grammar_digest():
+    """بصمة القواعد المولدة - Digest of the generated lexer/parser ATNs"""
+    digest = hashlib.sha256()
+    digest.update(str(ArabicGrammarLexer.serializedATN()).encode('ascii'))
+    digest.update(str(ArabicGrammarParser.serializedATN()).encode('ascii'))
+    return digest.hexdigest()
+
+
+GRAMMAR_VERSION = _grammar_digest()
+
+
+class CompilationCache:
+    """ذاكرة مؤقتة للترجمة - Two-tier (memory LRU + optional disk) compilation cache
+
+    كل مدخل هو قاموس {المرحلة: النتيجة} لنفس الشيفرة المصدرية، حيث المرحلة
+    هي 'lexical' أو 'syntax' أو 'semantic' أو 'code_gen'.
+    Each entry maps stage names to the result dicts of CompilerAnalyzer.
+
+    آمنة للاستخدام من عدة خيوط؛ الحساب في get_or_compute يتم خارج القفل.
+    Safe to share between threads; get_or_compute computes outside the lock.
+    """
+
+    def __init__(self, max_entries=32, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()  # key -> {stage: result}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+
+    def make_key(self, source_code, variant=''):
+        """حساب مفتاح المصدر - Compute the cache key for a source text
+
+        variant يميز خيارات الترجمة المؤثرة على النتائج (مثل نمط التحليل).
+        variant distinguishes compiler options that affect results.
+        """
+        digest = hashlib.sha256()
+        digest.update(COMPILER_VERSION.encode('utf-8'))
+        digest.update(GRAMMAR_VERSION.encode('ascii'))
+        digest.update(variant.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(source_code.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, source_code, stage, variant=''):
+        """البحث عن نتيجة مرحلة - Look up a stage result, or None"""
+        key = self.make_key(source_code, variant)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self._load_from_disk(key)
+                if entry is not None:
+                    self._remember(key, entry)
+            else:
+                self.entries.move_to_end(key)
+
+            if entry is not None and stage in entry:
+                self.hits += 1
+                return entry[stage]
+            self.misses += 1
+            return None
+
+    def put(self, source_code, stage, result, variant=''):
+        """تخزين نتيجة مرحلة - Store a stage result"""
+        key = self.make_key(source_code, variant)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self._load_from_disk(key) or {}
+            entry[stage] = result
+            self._remember(key, entry)
+            self._save_to_disk(key, entry)
+
+    def get_or_compute(self, source_code, stage, compute, variant=''):
+        """إرجاع النتيجة المخزنة أو حسابها - Return cached result or compute it"""
+        result = self.get(source_code, stage, variant)
+        if result is None:
+            result = compute()
+            self.put(source_code, stage, result, variant)
+        return result
+
+    def clear(self):
+        """مسح الذاكرة المؤقتة في الذاكرة - Clear the in-memory tier"""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _remember(self, key, entry):
+        """إضافة مدخل مع إخراج الأقدم - Insert entry, evicting least recently used"""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    # ==================== Disk Tier ====================
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def _load_from_disk(self, key):
+        """قراءة مدخل من القرص - Read an entry from the disk tier"""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"تحذير: تعذرت قراءة ذاكرة الترجمة المؤقتة - {str(e)}")
+            return None
+
+    def _save_to_disk(self, key, entry):
+        """كتابة مدخل إلى القرص بشكل ذري - Atomically write an entry to disk"""
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"تحذير: تعذرت كتابة ذاكرة الترجمة المؤقتة - {str(e)}")
+
+
+# ==================== Bytecode Cache ====================
+
+# رأس ملف .pyc المبني على البصمة (PEP 552): بصمة المصدر دون التحقق منها عند الاستيراد
+# Hash-based .pyc header flags (PEP 552): source hash present, unchecked
+_PYC_FLAGS = (0b01).to_bytes(4, 'little')
+
+
+class BytecodeCache:
+    """ذاكرة الشيفرة الثنائية - Code object cache (memory LRU + .pyc files)
+
+    المفتاح بصمة كود بايثون المولد واسم الملف، والمدخل كائن types.CodeType
+    جاهز لـ exec. على القرص يُحفظ كملف .pyc بصيغة بايثون القياسية.
+    Keyed by a hash of the generated Python source and filename; entries
+    are ready-to-exec code objects, stored on disk as standard .pyc files.
+
+    آمنة للاستخدام من عدة خيوط وعمليات؛ الترجمة تتم خارج القفل، وكل كاتب
+    يكتب ملفاً مؤقتاً خاصاً به يحل محل .pyc دفعة واحدة.
+    Safe to share between threads and processes; compile() runs outside
+    the lock, and every writer fills its own temporary file that replaces
+    the .pyc in one step.
+    """
+
+    def __init__(self, max_entries=32, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()  # key -> code object
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+
+    def make_key(self, python_code, filename):
+        """حساب مفتاح الكود - Compute the cache key for generated code"""
+        digest = hashlib.sha256()
+        digest.update(importlib.util.MAGIC_NUMBER)
+        digest.update(filename.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(python_code.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get_code(self, python_code, filename='<arabic>'):
+        """إرجاع كائن الشيفرة المخزن أو ترجمته - Return the cached code object or compile it"""
+        key = self.make_key(python_code, filename)
+        with self.lock:
+            code = self.entries.get(key)
+            if code is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return code
+
+        source_bytes = python_code.encode('utf-8')
+        code = self._load_from_disk(key, source_bytes)
+        if code is None:
+            code = compile(python_code, filename, 'exec', dont_inherit=True)
+            self._save_to_disk(key, source_bytes, code)
+            with self.lock:
+                self.misses += 1
+                self._remember(key, code)
+        else:
+            with self.lock:
+                self.hits += 1
+                self._remember(key, code)
+        return code
+
+    def clear(self):
+        """مسح الذاكرة المؤقتة في الذاكرة - Clear the in-memory tier"""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _remember(self, key, code):
+        """إضافة مدخل مع إخراج الأقدم - Insert entry, evicting least recently used"""
+        self.entries[key] = code
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pyc")
+
+    def _load_from_disk(self, key, source_bytes):
+        """قراءة ملف .pyc والتحقق من رأسه - Read a .pyc and validate its header"""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"تحذير: تعذرت قراءة ذاكرة الشيفرة الثنائية - {str(e)}")
+            return None
+        if (data[:4] != importlib.util.MAGIC_NUMBER or data[4:8] != _PYC_FLAGS
+                or data[8:16] != importlib.util.source_hash(source_bytes)):
+            return None
+        try:
+            return marshal.loads(data[16:])
+        except Exception as e:
+            print(f"تحذير: ملف شيفرة ثنائية تالف - {str(e)}")
+            return None
+
+    def _save_to_disk(self, key, source_bytes, code):
+        """كتابة ملف .pyc بشكل ذري - Atomically write a .pyc file"""
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        # ملف مؤقت لكل عملية وخيط - one temporary file per process and thread
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(importlib.util.MAGIC_NUMBER)
+                f.write(_PYC_FLAGS)
+                f.write(importlib.util.source_hash(source_bytes))
+                f.write(marshal.dumps(code))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"تحذير: تعذرت كتابة ذاكرة الشيفرة الثنائية - {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def _default_bytecode_dir():
+    """مجلد ملفات .pyc الافتراضي - Default directory for cached .pyc files"""
+    root = os.environ.get('ARABIC_COMPILER_CACHE_DIR')
+    if not root:
+        root = os.path.join(os.path.expanduser('~'), '.cache', 'arabic_compiler')
+    return os.path.join(root, 'bytecode')
+
+
+# الذاكرة المؤقتة الافتراضية المستخدمة من الدوال المساعدة
+# Default cache used by the get_*_analysis helpers
+default_cache = CompilationCache(cache_dir=os.environ.get('ARABIC_COMPILER_CACHE_DIR'))
+
+# ذاكرة الشيفرة الثنائية الافتراضية - Default bytecode cache
+default_bytecode_cache = BytecodeCache(cache_dir=_default_bytecode_dir())
+
+
+def compile_to_code_object(python_code, filename='<arabic>', cache=None):
+    """ترجمة كود بايثون المولد إلى كائن شيفرة - Compile generated Python to a code object
+
+    Args:
+        python_code: كود بايثون من CodeGenerator.generate
+        filename: الاسم الظاهر في رسائل الأخطاء - name shown in tracebacks
+        cache: BytecodeCache اختياري (الافتراضي default_bytecode_cache)
+
+    Returns:
+        types.CodeType: كائن جاهز لـ exec - ready to pass to exec
+    """
+    if cache is None:
+        cache = default_bytecode_cache
+    return cache.get_code(python_code, filename)
@@ -0,0 +1,172 @@
+"""
+Compile Service for the Arabic Compiler IDE
+خدمة الترجمة في الخلفية - الترجمة والتحليلات على خيط منفصل، والنتائج عبر الإشارات
+
+الواجهة ترسل لقطات من نص المحرر، ويعالجها عامل على QThread بمحلل معجمي
+تزايدي خاص به، ثم تعود النتائج بإشارة finished. كل طلب يحمل رقم جيل، فالطلب
+الذي جاء بعده طلب أحدث من نفس النوع يُهمل قبل البدء أو تُهمل نتيجته.
+
+The GUI sends snapshots of the editor text; a worker on a QThread
+processes them with its own incremental lexer and results come back
+through the finished signal. Every request carries a generation number:
+a request superseded by a newer one of the same kind is skipped before
+it starts, or its result is dropped.
+
+Stages:
+    'diagnostics' - أخطاء نحوية ودلالية بمواقعها (للتسطير الحي)
+                    syntax and semantic errors with positions (live squiggles)
+    'lexical' / 'syntax' / 'semantic' / 'code_gen' / 'run'
+                  - نتائج CompilerAnalyzer ('run' مثل 'code_gen')
+                    CompilerAnalyzer results ('run' is 'code_gen' for running)
+"""
+
+import time
+
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+
+from compilation_unit import CompilationUnit
+from compile_cache import default_cache
+from compiler_analyzer import CompilerAnalyzer
+from incremental_lexer import IncrementalLexer
+
+
+# مهلة التأخير بعد آخر تعديل قبل الفحص - Debounce delay after the last edit
+DEBOUNCE_MS = 300
+
+# دالة CompilerAnalyzer لكل مرحلة - CompilerAnalyzer method per stage
+_STAGE_METHODS = {
+    'lexical': 'analyze_lexical',
+    'syntax': 'analyze_syntax',
+    'semantic': 'analyze_semantic',
+    'code_gen': 'generate_code',
+    'run': 'generate_code',
+}
+
+
+class _Superseded(Exception):
+    """طلب أحدث وصل أثناء المعالجة - A newer request arrived mid-way"""
+    pass
+
+
+class CompileWorker(QObject):
+    """عامل الترجمة على خيط الخلفية - Compile worker living on the background thread
+
+    كل الكائنات هنا (المحلل التزايدي، CompilerAnalyzer) يستخدمها هذا الخيط فقط؛
+    المشترك الوحيد هو default_cache وهو محمي بقفل.
+    Everything here is used by this thread only; the one shared object is
+    default_cache, which is lock protected.
+    """
+
+    finished = pyqtSignal(str, int, object)
+
+    def __init__(self, latest, parse_mode='SLL'):
+        super().__init__()
+        self.latest = latest  # المرحلة -> أحدث جيل (تكتبه الواجهة) - stage -> newest generation
+        self.lexer = IncrementalLexer()
+        self.compiler = CompilerAnalyzer(cache=default_cache, parse_mode=parse_mode)
+
+    @pyqtSlot(str, int, str)
+    def process(self, stage, generation, source_code):
+        """معالجة طلب واحد - Handle one request"""
+        if self.latest.get(stage) != generation:
+            return
+        try:
+            self.lexer.update(source_code)
+            tokens = self.lexer.tokens
+            if stage == 'diagnostics':
+                result = self.diagnose(stage, generation, source_code, tokens)
+            else:
+                self.compiler.get_unit(source_code, tokens=tokens)
+                result = getattr(self.compiler, _STAGE_METHODS[stage])(source_code)
+        except _Superseded:
+            return
+        except Exception as e:
+            result = {'success': False, 'error': str(e), 'errors': [str(e)], 'diagnostics': []}
+        self.finished.emit(stage, generation, result)
+
+    def diagnose(self, stage, generation, source_code, tokens):
+        """فحص الأخطاء بمواقعها - Collect errors with their positions"""
+        start = time.perf_counter()
+        unit = CompilationUnit(source_code, parse_mode=self.compiler.parse_mode, front_end='direct',
+                               check_cache=self.compiler.check_cache, tokens=tokens)
+        errors = unit.errors
+        if self.latest.get(stage) != generation:
+            raise _Superseded()
+        diagnostics = [
+            {
+                'line': error.line or 1,
+                'column': error.column or 0,
+                'message': str(error),
+            }
+            for error in errors
+        ]
+        return {
+            'success': not diagnostics,
+            'errors': [d['message'] for d in diagnostics],
+            'diagnostics': diagnostics,
+            'duration': time.perf_counter() - start,
+        }
+
+
+class CompileService(QObject):
+    """خدمة الترجمة في الخلفية - Background compile service
+
+    Args:
+        source_provider: دالة تُرجع نص المحرر الحالي - returns the current editor text
+        parse_mode: نمط التحليل لـ CompilerAnalyzer - parse mode for the analyzer
+        debounce_ms: مهلة schedule بالمللي ثانية - schedule() debounce in ms
+
+    إشارة finished(المرحلة، النتيجة) تصل على خيط الواجهة للطلبات غير المنتهية فقط.
+    finished(stage, result) arrives on the GUI thread, for live requests only.
+    """
+
+    finished = pyqtSignal(str, object)
+    _request = pyqtSignal(str, int, str)
+
+    def __init__(self, source_provider, parse_mode='SLL', debounce_ms=DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.source_provider = source_provider
+        self.generation = 0
+        self.latest = {}
+
+        self.thread = QThread(self)
+        self.worker = CompileWorker(self.latest, parse_mode)
+        self.worker.moveToThread(self.thread)
+        self._request.connect(self.worker.process)
+        self.worker.finished.connect(self._deliver)
+        self.thread.start()
+
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(debounce_ms)
+        self.debounce.timeout.connect(self._submit_diagnostics)
+
+    def schedule(self):
+        """طلب فحص بعد توقف الكتابة - Request diagnostics once typing pauses"""
+        self.debounce.start()
+
+    def submit(self, stage, source_code):
+        """إرسال لقطة نص لمرحلة - Send a text snapshot for a stage
+
+        Returns:
+            int: رقم جيل الطلب - the request's generation
+        """
+        self.generation += 1
+        self.latest[stage] = self.generation
+        self._request.emit(stage, self.generation, source_code)
+        return self.generation
+
+    def shutdown(self):
+        """إيقاف الخيط - Stop the worker thread"""
+        self.debounce.stop()
+        self.latest.clear()
+        self.thread.quit()
+        self.thread.wait()
+
+    def _submit_diagnostics(self):
+        self.submit('diagnostics', self.source_provider())
+
+    def _deliver(self, stage, generation, result):
+        """تمرير النتيجة إن لم يصل طلب أحدث - Forward a result unless superseded"""
+        if self.latest.get(stage) == generation:
+            self.finished.emit(stage, result)
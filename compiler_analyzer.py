@@ -3,18 +3,69 @@
 يحسب مخرجات كل مرحلة من مراحل المترجم بشكل فعلي
 """
 
-from antlr4 import InputStream, CommonTokenStream
-from ArabicGrammarLexer import ArabicGrammarLexer
-from ArabicGrammarParser import ArabicGrammarParser
-from semantic_analyzer import SemanticAnalyzer
-from code_generator import CodeGenerator
+from compilation_unit import CompilationUnit
+from compile_cache import default_cache
+from semantic_checker import ProcedureCheckCache, default_check_cache
 import ast_nodes
 
 
+# ==================== Node Tables ====================
+
+_NODE_ICONS = {
+    'ProgramNode': '🎯',
+    'BlockNode': '📦',
+    'ConstantDefNode': '🔒',
+    'VarDeclNode': '📊',
+    'ProcedureDefNode': '⚙️',
+    'AssignmentNode': '➡️',
+    'InputNode': '⌨️',
+    'OutputNode': '🖨️',
+    'IfNode': '❓',
+    'ForLoopNode': '🔄',
+    'WhileLoopNode': '🔁',
+    'CallNode': '📞',
+    'BinOpNode': '➕',
+    'UnaryOpNode': '➖',
+    'VarAccessNode': '📌',
+    'LiteralNode': '💎',
+    'CompoundStmtNode': '📝',
+}
+
+# الحقول المعروضة كأطفال بالترتيب - Fields shown as children, in order
+_CHILD_FIELDS = (
+    'block', 'constants', 'variables', 'procedures', 'instructions', 'statements',
+    'variable', 'expression', 'condition', 'then_stmt', 'else_stmt', 'body',
+    'left', 'right', 'operand', 'items', 'arguments',
+)
+
+# الحقول المعروضة في سطر العقدة بالترتيب - Fields shown on the node's line, in order
+_INFO_FIELDS = ('name', 'value', 'operator', 'data_type', 'literal_type')
+
+# صنف العقدة -> (حقول الأطفال، حقول المعلومات) - class -> (child fields, info fields)
+_node_field_table = {}
+
+
+def _node_fields(node):
+    """حقول الصنف الموجودة، تُحسب مرة لكل صنف - Present fields, computed once per class"""
+    fields = _node_field_table.get(node.__class__)
+    if fields is None:
+        fields = (
+            tuple(name for name in _CHILD_FIELDS if hasattr(node, name)),
+            tuple(name for name in _INFO_FIELDS if hasattr(node, name)),
+        )
+        _node_field_table[node.__class__] = fields
+    return fields
+
+
 class CompilerAnalyzer:
     """محلل مراحل الترجمة"""
     
-    def __init__(self):
+    def __init__(self, cache=None, parse_mode='LL', front_end='parse_tree', check_cache=None):
+        self.cache = cache  # ذاكرة مؤقتة اختيارية - Optional CompilationCache
+        self.parse_mode = parse_mode  # 'LL' أو 'SLL' (SLL أولاً ثم LL)
+        self.front_end = front_end  # 'parse_tree' أو 'direct' (ASTBuilder)
+        # نتائج فحص الإجراءات تبقى بين الوحدات - per-procedure check results outlive units
+        self.check_cache = check_cache if check_cache is not None else ProcedureCheckCache()
         self.lexer = None
         self.tokens = None
         self.parser = None
@@ -24,15 +75,36 @@ class CompilerAnalyzer:
         self.generator = None
         self.python_code = None
         self.errors = []
+        self.unit = None
+    
+    def get_unit(self, source_code, tokens=None):
+        """الحصول على وحدة الترجمة المشتركة للمصدر - Get the shared compilation unit
+
+        tokens: رموز جاهزة للمصدر (من IncrementalLexer) تُستخدم عند إنشاء وحدة جديدة
+                ready-made tokens for the source, used when a new unit is created
+        """
+        if self.unit is None or self.unit.source_code != source_code:
+            self.unit = CompilationUnit(source_code, parse_mode=self.parse_mode,
+                                        front_end=self.front_end, check_cache=self.check_cache,
+                                        tokens=tokens)
+        return self.unit
+    
+    def cached_stage(self, source_code, stage, compute):
+        """تشغيل مرحلة عبر الذاكرة المؤقتة إن وجدت - Run a stage through the cache"""
+        if self.cache is None:
+            return compute(source_code)
+        return self.cache.get_or_compute(source_code, stage, lambda: compute(source_code),
+                                         variant=f"{self.parse_mode}:{self.front_end}")
     
     def analyze_lexical(self, source_code):
         """التحليل المعجمي - Lexical Analysis"""
+        return self.cached_stage(source_code, 'lexical', self._analyze_lexical)
+    
+    def _analyze_lexical(self, source_code):
         try:
-            input_stream = InputStream(source_code)
-            self.lexer = ArabicGrammarLexer(input_stream)
-            token_stream = CommonTokenStream(self.lexer)
-            token_stream.fill()
-            self.tokens = token_stream.tokens
+            unit = self.get_unit(source_code)
+            self.lexer = unit.lexer
+            self.tokens = unit.tokens
             
             # استخراج الرموز
             result = {
@@ -62,17 +134,18 @@ class CompilerAnalyzer:
     
     def analyze_syntax(self, source_code):
         """التحليل النحوي - Syntax Analysis"""
+        return self.cached_stage(source_code, 'syntax', self._analyze_syntax)
+    
+    def _analyze_syntax(self, source_code):
         try:
-            input_stream = InputStream(source_code)
-            lexer = ArabicGrammarLexer(input_stream)
-            token_stream = CommonTokenStream(lexer)
-            self.parser = ArabicGrammarParser(token_stream)
+            unit = self.get_unit(source_code)
+            self.parser = unit.parser
             
             # بناء الشجرة
-            self.tree = self.parser.program()
+            self.tree = unit.tree
             
             # فحص الأخطاء النحوية
-            syntax_errors = self.parser.getNumberOfSyntaxErrors()
+            syntax_errors = unit.syntax_error_count
             
             # تحويل الشجرة إلى شكل قابل للقراءة
             tree_structure = self.format_parse_tree(self.tree, self.parser)
@@ -82,6 +155,7 @@ class CompilerAnalyzer:
                 'tree_raw': self.tree.toStringTree(recog=self.parser) if self.tree else None,
                 'tree_formatted': tree_structure,
                 'error_count': syntax_errors,
+                'parse_path': unit.parse_path,
                 'errors': []
             }
             
@@ -92,7 +166,8 @@ class CompilerAnalyzer:
                 'success': False,
                 'error': str(e),
                 'tree_raw': None,
-                'tree_formatted': []
+                'tree_formatted': [],
+                'parse_path': None
             }
     
     def format_parse_tree(self, tree, parser, indent=0):
@@ -125,17 +200,16 @@ class CompilerAnalyzer:
     
     def analyze_semantic(self, source_code):
         """التحليل الدلالي - Semantic Analysis مع تفاصيل شاملة"""
+        result = self.cached_stage(source_code, 'semantic', self._analyze_semantic)
+        self.ast = result.get('ast')
+        return result
+    
+    def _analyze_semantic(self, source_code):
         try:
-            # أولاً التحليل النحوي
-            input_stream = InputStream(source_code)
-            lexer = ArabicGrammarLexer(input_stream)
-            token_stream = CommonTokenStream(lexer)
-            parser = ArabicGrammarParser(token_stream)
-            tree = parser.program()
-            
-            # التحليل الدلالي
-            self.analyzer = SemanticAnalyzer()
-            self.ast = self.analyzer.visit(tree)
+            # التحليل الدلالي (يعيد استخدام شجرة التحليل النحوي للوحدة)
+            unit = self.get_unit(source_code)
+            self.analyzer = unit.analyzer
+            self.ast = unit.ast
             
             # استخراج جدول الرموز الكامل
             symbol_table_data = self.get_symbol_table_data()
@@ -219,108 +293,38 @@ class CompilerAnalyzer:
     
     def get_node_icon(self, node_type):
         """الحصول على أيقونة مناسبة حسب نوع العقدة"""
-        icon_map = {
-            'ProgramNode': '🎯',
-            'BlockNode': '📦',
-            'ConstantDefNode': '🔒',
-            'VarDeclNode': '📊',
-            'ProcedureDefNode': '⚙️',
-            'AssignmentNode': '➡️',
-            'InputNode': '⌨️',
-            'OutputNode': '🖨️',
-            'IfNode': '❓',
-            'ForLoopNode': '🔄',
-            'WhileLoopNode': '🔁',
-            'CallNode': '📞',
-            'BinOpNode': '➕',
-            'UnaryOpNode': '➖',
-            'VarAccessNode': '📌',
-            'LiteralNode': '💎',
-            'CompoundStmtNode': '📝',
-        }
-        return icon_map.get(node_type, '🔸')
+        return _NODE_ICONS.get(node_type, '🔸')
     
     def get_node_info(self, node):
         """استخراج معلومات إضافية عن العقدة"""
         info_parts = []
         
-        # معلومات حسب نوع العقدة
-        if hasattr(node, 'name'):
-            info_parts.append(f"'{node.name}'")
-        
-        if hasattr(node, 'value') and node.value is not None:
-            if isinstance(node.value, str):
-                info_parts.append(f"القيمة: '{node.value}'")
-            else:
-                info_parts.append(f"القيمة: {node.value}")
-        
-        if hasattr(node, 'operator'):
-            info_parts.append(f"العامل: {node.operator}")
-        
-        if hasattr(node, 'data_type') and node.data_type:
-            info_parts.append(f"النوع: {node.data_type}")
-        
-        if hasattr(node, 'literal_type') and node.literal_type:
-            info_parts.append(f"النوع: {node.literal_type}")
+        for name in _node_fields(node)[1]:
+            value = getattr(node, name)
+            if name == 'name':
+                info_parts.append(f"'{value}'")
+            elif name == 'value':
+                if value is None:
+                    continue
+                if isinstance(value, str):
+                    info_parts.append(f"القيمة: '{value}'")
+                else:
+                    info_parts.append(f"القيمة: {value}")
+            elif name == 'operator':
+                info_parts.append(f"العامل: {value}")
+            elif value:
+                # data_type أو literal_type
+                info_parts.append(f"النوع: {value}")
         
         return " | ".join(info_parts) if info_parts else ""
     
     def get_node_children(self, node):
         """الحصول على أطفال العقدة"""
         children = []
-        
-        # قائمة الحقول المهمة حسب نوع العقدة
-        if hasattr(node, 'block') and node.block:
-            children.append(('block', node.block))
-        
-        if hasattr(node, 'constants') and node.constants:
-            children.append(('constants', node.constants))
-        
-        if hasattr(node, 'variables') and node.variables:
-            children.append(('variables', node.variables))
-        
-        if hasattr(node, 'procedures') and node.procedures:
-            children.append(('procedures', node.procedures))
-        
-        if hasattr(node, 'instructions') and node.instructions:
-            children.append(('instructions', node.instructions))
-        
-        if hasattr(node, 'statements') and node.statements:
-            children.append(('statements', node.statements))
-        
-        if hasattr(node, 'variable') and node.variable:
-            children.append(('variable', node.variable))
-        
-        if hasattr(node, 'expression') and node.expression:
-            children.append(('expression', node.expression))
-        
-        if hasattr(node, 'condition') and node.condition:
-            children.append(('condition', node.condition))
-        
-        if hasattr(node, 'then_stmt') and node.then_stmt:
-            children.append(('then_stmt', node.then_stmt))
-        
-        if hasattr(node, 'else_stmt') and node.else_stmt:
-            children.append(('else_stmt', node.else_stmt))
-        
-        if hasattr(node, 'body') and node.body:
-            children.append(('body', node.body))
-        
-        if hasattr(node, 'left') and node.left:
-            children.append(('left', node.left))
-        
-        if hasattr(node, 'right') and node.right:
-            children.append(('right', node.right))
-        
-        if hasattr(node, 'operand') and node.operand:
-            children.append(('operand', node.operand))
-        
-        if hasattr(node, 'items') and node.items:
-            children.append(('items', node.items))
-        
-        if hasattr(node, 'arguments') and node.arguments:
-            children.append(('arguments', node.arguments))
-        
+        for name in _node_fields(node)[0]:
+            value = getattr(node, name)
+            if value:
+                children.append((name, value))
         return children
     
     def format_semantic_errors(self, errors):
@@ -506,20 +510,26 @@ class CompilerAnalyzer:
     
     def generate_code(self, source_code):
         """توليد الكود - Code Generation"""
+        result = self.cached_stage(source_code, 'code_gen', self._generate_code)
+        self.python_code = result.get('code')
+        return result
+    
+    def _generate_code(self, source_code):
         try:
-            # التحليل الدلالي أولاً
-            semantic_result = self.analyze_semantic(source_code)
+            # التحليل الدلالي أولاً (من نفس وحدة الترجمة)
+            unit = self.get_unit(source_code)
+            self.analyzer = unit.analyzer
+            self.ast = unit.ast
             
-            if not semantic_result['success']:
+            if unit.errors:
                 return {
                     'success': False,
                     'code': None,
-                    'errors': semantic_result['errors']
+                    'errors': [str(err) for err in unit.errors]
                 }
             
             # توليد الكود
-            self.generator = CodeGenerator()
-            self.python_code = self.generator.generate(self.ast)
+            self.python_code = unit.python_code
             
             return {
                 'success': True,
@@ -535,7 +545,8 @@ class CompilerAnalyzer:
             }
     
     def full_analysis(self, source_code):
-        """تحليل كامل لجميع المراحل"""
+        """تحليل كامل لجميع المراحل - يحلل المصدر مرة واحدة عبر وحدة ترجمة مشتركة"""
+        self.get_unit(source_code)
         results = {
             'lexical': self.analyze_lexical(source_code),
             'syntax': self.analyze_syntax(source_code),
@@ -548,30 +559,30 @@ class CompilerAnalyzer:
 # دوال مساعدة للاستدعاء المباشر
 def get_lexical_analysis(source_code):
     """الحصول على التحليل المعجمي"""
-    analyzer = CompilerAnalyzer()
+    analyzer = CompilerAnalyzer(cache=default_cache, check_cache=default_check_cache)
     return analyzer.analyze_lexical(source_code)
 
 
-def get_syntax_analysis(source_code):
+def get_syntax_analysis(source_code, parse_mode='LL'):
     """الحصول على التحليل النحوي"""
-    analyzer = CompilerAnalyzer()
+    analyzer = CompilerAnalyzer(cache=default_cache, parse_mode=parse_mode, check_cache=default_check_cache)
     return analyzer.analyze_syntax(source_code)
 
 
-def get_semantic_analysis(source_code):
+def get_semantic_analysis(source_code, parse_mode='LL'):
     """الحصول على التحليل الدلالي"""
-    analyzer = CompilerAnalyzer()
+    analyzer = CompilerAnalyzer(cache=default_cache, parse_mode=parse_mode, check_cache=default_check_cache)
     return analyzer.analyze_semantic(source_code)
 
 
-def get_symbol_table(source_code):
+def get_symbol_table(source_code, parse_mode='LL'):
     """الحصول على جدول الرموز"""
-    analyzer = CompilerAnalyzer()
+    analyzer = CompilerAnalyzer(cache=default_cache, parse_mode=parse_mode, check_cache=default_check_cache)
     semantic_result = analyzer.analyze_semantic(source_code)
     return semantic_result.get('symbol_table', [])
 
 
-def generate_intermediate_code(source_code):
+def generate_intermediate_code(source_code, parse_mode='LL'):
     """توليد الكود الوسيط"""
-    analyzer = CompilerAnalyzer()
+    analyzer = CompilerAnalyzer(cache=default_cache, parse_mode=parse_mode, check_cache=default_check_cache)
     return analyzer.generate_code(source_code)
@@ -0,0 +1,277 @@
+"""
+DFA Cache for Arabic Programming Language
+ذاكرة DFA الدائمة - حفظ حالات التنبؤ للمحلل المعجمي والنحوي وتحميلها عند البدء
+
+مكتبة ANTLR تتشارك حالات DFA بين جميع نسخ المحلل داخل العملية الواحدة
+(ArabicGrammarParser.decisionsToDFA)، لكنها تبدأ فارغة في كل عملية جديدة.
+هذه الوحدة تسخّن هذه الحالات من مجموعة برامج نموذجية وتحفظها في ملف يُحمّل
+عند بدء التشغيل.
+
+ANTLR shares DFA states between all recognizer instances of a process, but
+every new process starts cold. This module warms those states from a corpus
+of sample programs, serializes them, and loads them back at startup.
+
+Usage (build time):
+    python dfa_cache.py examples/ -o ArabicGrammar.dfa
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+
+from antlr4 import InputStream, CommonTokenStream
+from antlr4.PredictionContext import (
+    PredictionContext, SingletonPredictionContext, ArrayPredictionContext,
+    calculateHashCode, calculateListsHashCode
+)
+from antlr4.atn.ATNState import ATNState
+from antlr4.atn.ATNSimulator import ATNSimulator
+from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+from antlr4.atn.LexerAction import LexerAction
+from antlr4.atn.LexerActionExecutor import LexerActionExecutor
+from antlr4.atn.SemanticContext import SemanticContext
+from antlr4.error.ErrorListener import ErrorListener
+from ArabicGrammarLexer import ArabicGrammarLexer
+from ArabicGrammarParser import ArabicGrammarParser
+from compile_cache import GRAMMAR_VERSION
+
+
+# رقم صيغة الملف - يُرفع عند تغيير طريقة الحفظ
+CACHE_FORMAT = 1
+
+# المسار الافتراضي لملف الذاكرة - Default cache file location
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ArabicGrammar.dfa')
+
+SOURCE_EXTENSIONS = ('.txt', '.code')
+
+
+def _cache_version():
+    """نسخة الذاكرة - Everything a saved DFA depends on"""
+    try:
+        from importlib.metadata import version
+        runtime_version = version('antlr4-python3-runtime')
+    except Exception:
+        runtime_version = 'unknown'
+    digest = hashlib.sha256()
+    digest.update(f"{CACHE_FORMAT}|{GRAMMAR_VERSION}|{runtime_version}|{sys.version_info[:2]}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class _SilentErrorListener(ErrorListener):
+    """مستمع لا يطبع الأخطاء أثناء التسخين - Swallows errors while warming"""
+    pass
+
+
+# ==================== Warming ====================
+
+def warm_up(sources):
+    """تسخين حالات DFA بتحليل مجموعة برامج - Warm DFA states by parsing sources
+
+    Args:
+        sources: قائمة نصوص برامج - iterable of program source texts
+
+    Returns:
+        int: عدد البرامج المحللة - number of programs parsed
+    """
+    count = 0
+    for source_code in sources:
+        lexer = ArabicGrammarLexer(InputStream(source_code))
+        lexer.removeErrorListeners()
+        lexer.addErrorListener(_SilentErrorListener())
+        parser = ArabicGrammarParser(CommonTokenStream(lexer))
+        parser.removeErrorListeners()
+        parser.addErrorListener(_SilentErrorListener())
+        parser.program()
+        count += 1
+    return count
+
+
+def iter_corpus(paths):
+    """قراءة برامج المجموعة من ملفات ومجلدات - Read corpus files and directories"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.endswith(SOURCE_EXTENSIONS):
+                        with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                            yield f.read()
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                yield f.read()
+
+
+def dfa_state_count():
+    """عدد حالات DFA الحالية (معجمي، نحوي) - Current (lexer, parser) DFA state counts"""
+    lexer_states = sum(len(dfa.states) for dfa in ArabicGrammarLexer.decisionsToDFA)
+    parser_states = sum(len(dfa.states) for dfa in ArabicGrammarParser.decisionsToDFA)
+    return lexer_states, parser_states
+
+
+# ==================== Serialization ====================
+#
+# حالات DFA تشير إلى حالات ATN وإلى كائنات مفردة في مكتبة ANTLR تُقارن بالهوية،
+# لذلك تُحفظ هذه الكائنات كمراجع (persistent id) وتُربط بالكائنات الحالية عند
+# التحميل. كما أن بعض قيم hash المخزنة مبنية على hash النصوص الذي يختلف بين
+# العمليات، فيُعاد حسابها بعد التحميل.
+#
+# DFA states point at ATN states and at runtime singletons compared by
+# identity, so those are pickled as persistent references and re-bound on
+# load. Some cached hash codes derive from per-process string hashing, so
+# they are recomputed after loading.
+
+class _DFAPickler(pickle.Pickler):
+
+    def persistent_id(self, obj):
+        if isinstance(obj, ATNState):
+            if obj.atn is ArabicGrammarParser.atn:
+                return ('parser_state', obj.stateNumber)
+            if obj.atn is ArabicGrammarLexer.atn:
+                return ('lexer_state', obj.stateNumber)
+        elif obj is PredictionContext.EMPTY:
+            return ('empty_context',)
+        elif obj is SemanticContext.NONE:
+            return ('semantic_none',)
+        elif obj is ATNSimulator.ERROR:
+            return ('parser_error_state',)
+        elif obj is LexerATNSimulator.ERROR:
+            return ('lexer_error_state',)
+        elif isinstance(obj, LexerAction):
+            for index, action in enumerate(ArabicGrammarLexer.atn.lexerActions):
+                if action is obj:
+                    return ('lexer_action', index)
+        return None
+
+
+class _DFAUnpickler(pickle.Unpickler):
+
+    def persistent_load(self, pid):
+        kind = pid[0]
+        if kind == 'parser_state':
+            return ArabicGrammarParser.atn.states[pid[1]]
+        if kind == 'lexer_state':
+            return ArabicGrammarLexer.atn.states[pid[1]]
+        if kind == 'empty_context':
+            return PredictionContext.EMPTY
+        if kind == 'semantic_none':
+            return SemanticContext.NONE
+        if kind == 'parser_error_state':
+            return ATNSimulator.ERROR
+        if kind == 'lexer_error_state':
+            return LexerATNSimulator.ERROR
+        if kind == 'lexer_action':
+            return ArabicGrammarLexer.atn.lexerActions[pid[1]]
+        raise pickle.UnpicklingError(f"مرجع غير معروف: {pid}")
+
+
+def _snapshot(dfas):
+    """تحويل قائمة DFA إلى بيانات قابلة للحفظ - Snapshot DFAs as picklable data
+
+    تُحفظ الحالات كقائمة لا كقاموس، لأن مفاتيح القاموس تحتاج قيم hash
+    صحيحة لا تتوفر إلا بعد إصلاحها عند التحميل.
+    States are stored as lists, not dicts, because dict keys need hash codes
+    that are only valid after the post-load fixup.
+    """
+    return [(list(dfa.states.values()), dfa.s0) for dfa in dfas]
+
+
+def save_dfa_cache(path=DEFAULT_CACHE_PATH):
+    """حفظ حالات DFA الحالية في ملف - Save current DFA states to a file"""
+    payload = {
+        'version': _cache_version(),
+        'lexer': _snapshot(ArabicGrammarLexer.decisionsToDFA),
+        'parser': _snapshot(ArabicGrammarParser.decisionsToDFA),
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 20000))
+    try:
+        with open(tmp_path, 'wb') as f:
+            _DFAPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(payload)
+        os.replace(tmp_path, path)
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def _rehash_context(context, seen):
+    """إعادة حساب hash لسياق تنبؤ وآبائه - Recompute context hash codes bottom-up"""
+    if context is None or context is PredictionContext.EMPTY or id(context) in seen:
+        return
+    seen.add(id(context))
+    if isinstance(context, ArrayPredictionContext):
+        for parent in context.parents:
+            _rehash_context(parent, seen)
+        context.cachedHashCode = calculateListsHashCode(context.parents, context.returnStates)
+    elif isinstance(context, SingletonPredictionContext):
+        _rehash_context(context.parentCtx, seen)
+        context.cachedHashCode = calculateHashCode(context.parentCtx, context.returnState)
+
+
+def _restore(dfas, snapshot):
+    """إعادة حالات DFA المحملة إلى مكانها - Install loaded states into live DFAs"""
+    seen = set()
+    for dfa, (states, s0) in zip(dfas, snapshot):
+        for state in states:
+            state.configs.cachedHashCode = -1
+            for config in state.configs.configs:
+                _rehash_context(config.context, seen)
+                executor = getattr(config, 'lexerActionExecutor', None)
+                if isinstance(executor, LexerActionExecutor):
+                    executor.hashCode = hash("".join([str(la) for la in executor.lexerActions]))
+            if isinstance(state.lexerActionExecutor, LexerActionExecutor):
+                executor = state.lexerActionExecutor
+                executor.hashCode = hash("".join([str(la) for la in executor.lexerActions]))
+        dfa._states = {state: state for state in states}
+        dfa.s0 = s0
+
+
+def load_dfa_cache(path=DEFAULT_CACHE_PATH):
+    """تحميل حالات DFA من ملف - Load DFA states from a file
+
+    Returns:
+        bool: True إذا تم التحميل، False إذا كان الملف مفقوداً أو قديماً
+              True if loaded, False if the file is missing or stale
+    """
+    try:
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, 20000))
+        try:
+            with open(path, 'rb') as f:
+                payload = _DFAUnpickler(f).load()
+        finally:
+            sys.setrecursionlimit(limit)
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        print(f"تحذير: تعذر تحميل ذاكرة DFA - {str(e)}")
+        return False
+
+    if payload.get('version') != _cache_version():
+        return False
+    if len(payload['lexer']) != len(ArabicGrammarLexer.decisionsToDFA) or \
+       len(payload['parser']) != len(ArabicGrammarParser.decisionsToDFA):
+        return False
+
+    _restore(ArabicGrammarLexer.decisionsToDFA, payload['lexer'])
+    _restore(ArabicGrammarParser.decisionsToDFA, payload['parser'])
+    return True
+
+
+def main(argv=None):
+    """بناء ملف ذاكرة DFA من مجموعة برامج - Build a DFA cache file from a corpus"""
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="تسخين وحفظ ذاكرة DFA - Warm and save the DFA cache")
+    arg_parser.add_argument('corpus', nargs='+', help="ملفات أو مجلدات البرامج النموذجية")
+    arg_parser.add_argument('-o', '--output', default=DEFAULT_CACHE_PATH, help="ملف الإخراج")
+    args = arg_parser.parse_args(argv)
+
+    count = warm_up(iter_corpus(args.corpus))
+    save_dfa_cache(args.output)
+    lexer_states, parser_states = dfa_state_count()
+    print(f"✓ تم تسخين {count} برنامج: {lexer_states} حالة معجمية، {parser_states} حالة نحوية")
+    print(f"✓ Saved DFA cache to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
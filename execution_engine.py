@@ -0,0 +1,366 @@
+"""
+Execution Engine for Arabic Programming Language
+محرك التنفيذ - تشغيل البرامج المولدة في عمليات منفصلة جاهزة مسبقاً
+
+كل برنامج يُنفذ في عملية عاملة من مجموعة عمليات مُنشأة مسبقاً (math و sys
+مستوردتان فيها)، فلا تتجمد الواجهة أثناء حلقة طويلة ويمكن إيقاف التنفيذ فعلاً.
+المخرجات تُرسل عبر أنبوب على دفعات، وطلبات الإدخال تنتظر رد الواجهة.
+
+Every program runs in a pre-started worker process (with math and sys
+already imported), so a long loop no longer freezes the GUI and can
+actually be stopped. Output is streamed back over a pipe in batches and
+input requests wait for the caller's reply.
+
+Usage:
+    engine = ExecutionEngine(wall_timeout=10)
+    engine.start()
+    job = engine.submit(code_object)
+    while job.running:
+        for kind, payload in job.poll(0.01):
+            ...  # ('output', text) / ('input', prompt) / ('finished', result)
+"""
+
+import builtins
+import io
+import marshal
+import math
+import multiprocessing
+import signal
+import time
+
+try:
+    import resource
+except ImportError:
+    # غير متوفرة على ويندوز: لا حدود للمعالج أو الذاكرة
+    # Not available on Windows: no CPU or memory limits
+    resource = None
+
+
+# عدد العمليات الجاهزة افتراضياً - Default number of warm workers
+DEFAULT_POOL_SIZE = 2
+
+# تُرسل المخرجات عند هذا الحجم أو بعد هذه المدة - Output batch size and age
+OUTPUT_CHUNK = 8192
+OUTPUT_INTERVAL = 0.05
+
+# الوحدات المستوردة مسبقاً في العمليات العاملة - Modules preloaded in workers
+PRELOAD_MODULES = ['math', 'sys', __name__]
+
+_SIGXCPU = getattr(signal, 'SIGXCPU', None)
+
+
+# ==================== Worker Side ====================
+
+class _PipeWriter(io.TextIOBase):
+    """كاتب مخرجات على دفعات عبر الأنبوب - Batched stdout over the pipe"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.parts = []
+        self.size = 0
+        self.last_flush = time.monotonic()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= OUTPUT_CHUNK or time.monotonic() - self.last_flush >= OUTPUT_INTERVAL:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.parts:
+            self.connection.send(('output', ''.join(self.parts)))
+            self.parts = []
+            self.size = 0
+        self.last_flush = time.monotonic()
+
+
+def _apply_limits(cpu_timeout, memory_limit):
+    """ضبط حدود المعالج والذاكرة للتشغيل الحالي - Set rlimits for one run
+
+    حد المعالج تراكمي للعملية، لذا يُضاف إلى الزمن المستهلك حتى الآن.
+    RLIMIT_CPU counts the whole process lifetime, so it is set relative
+    to the CPU time used so far.
+
+    Returns:
+        list: الحدود السابقة لاستعادتها - previous limits to restore
+    """
+    saved = []
+    if resource is None:
+        return saved
+    if cpu_timeout:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        limit = math.ceil(usage.ru_utime + usage.ru_stime + cpu_timeout)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        saved.append((resource.RLIMIT_CPU, soft, hard))
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    if memory_limit:
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        limit = memory_limit if hard == resource.RLIM_INFINITY else min(memory_limit, hard)
+        saved.append((resource.RLIMIT_AS, soft, hard))
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    return saved
+
+
+def _restore_limits(saved):
+    """استعادة الحدود بعد التشغيل - Restore rlimits after a run"""
+    for kind, soft, hard in saved:
+        resource.setrlimit(kind, (soft, hard))
+
+
+def _run_program(connection, code_bytes, cpu_timeout, memory_limit):
+    """تنفيذ برنامج واحد داخل العملية العاملة - Run one program inside a worker"""
+    import sys
+
+    writer = _PipeWriter(connection)
+
+    def console_input(prompt=""):
+        writer.flush()
+        connection.send(('input', str(prompt)))
+        kind, value = connection.recv()
+        return value
+
+    namespace = {
+        '__name__': '__main__',
+        '__builtins__': builtins,
+        'input': console_input,
+        'math': math,
+        'sys': sys,
+    }
+
+    saved_stdout, saved_stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = writer
+    saved_limits = _apply_limits(cpu_timeout, memory_limit)
+    status, errors = 'completed', []
+    try:
+        exec(marshal.loads(code_bytes), namespace)
+    except SystemExit:
+        pass
+    except MemoryError:
+        status, errors = 'memory', ["تجاوز البرنامج حد الذاكرة"]
+    except Exception as e:
+        status, errors = 'error', [str(e)]
+    finally:
+        _restore_limits(saved_limits)
+        sys.stdout, sys.stderr = saved_stdout, saved_stderr
+    writer.flush()
+    return status, errors
+
+
+def _worker_main(connection):
+    """حلقة العملية العاملة - Worker process loop"""
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            return
+        if message[0] != 'run':
+            return
+        _, code_bytes, cpu_timeout, memory_limit = message
+        status, errors = _run_program(connection, code_bytes, cpu_timeout, memory_limit)
+        connection.send(('finished', {'status': status, 'errors': errors}))
+
+
+# ==================== Parent Side ====================
+
+class _Worker:
+    """عملية عاملة ونهاية الأنبوب لديها - Worker process and its pipe end"""
+    __slots__ = ('process', 'connection')
+
+    def __init__(self, process, connection):
+        self.process = process
+        self.connection = connection
+
+    def kill(self):
+        """إنهاء العملية فوراً - Kill the process"""
+        try:
+            self.process.kill()
+            self.process.join(1)
+        except Exception as e:
+            print(f"تحذير: تعذر إنهاء عملية التنفيذ - {str(e)}")
+        self.connection.close()
+
+    def stop(self):
+        """إيقاف عملية خاملة - Ask an idle worker to exit"""
+        try:
+            self.connection.send(('stop',))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.connection.close()
+
+
+class ExecutionJob:
+    """تشغيل واحد لبرنامج - One program run
+
+    تُقرأ الأحداث عبر poll، وهي: ('output', نص)، ('input', رسالة الطلب)،
+    ('finished', النتيجة). بعد 'input' يجب الرد عبر send_input.
+    Events are read with poll: ('output', text), ('input', prompt) and
+    ('finished', result). An 'input' event must be answered with send_input.
+
+    النتيجة قاموس فيه success و status و errors و duration، حيث status
+    أحد: 'completed' أو 'error' أو 'cancelled' أو 'timeout' أو
+    'cpu_timeout' أو 'memory' أو 'crashed'.
+    The result dict has success, status, errors and duration.
+    """
+
+    def __init__(self, engine, worker, wall_timeout=None):
+        self.engine = engine
+        self.worker = worker
+        self.started = time.monotonic()
+        self.deadline = self.started + wall_timeout if wall_timeout else None
+        self.result = None
+
+    @property
+    def running(self):
+        return self.result is None
+
+    def poll(self, timeout=0, max_events=None):
+        """قراءة الأحداث المتاحة - Read the available events
+
+        Args:
+            timeout: مدة انتظار أول حدث بالثواني - seconds to wait for the first event
+            max_events: أقصى عدد أحداث في الاستدعاء حتى لا يحتكر برنامج كثير
+                        المخرجات حلقة الواجهة
+                        cap per call, so a chatty program cannot starve a GUI loop
+
+        Returns:
+            list: قائمة (النوع، المحتوى) - list of (kind, payload)
+        """
+        events = []
+        if self.result is not None:
+            return events
+        connection = self.worker.connection
+        try:
+            while (max_events is None or len(events) < max_events) and connection.poll(timeout):
+                timeout = 0
+                kind, payload = connection.recv()
+                if kind == 'finished':
+                    self._finish(payload['status'], payload['errors'],
+                                 healthy=payload['status'] != 'memory')
+                    events.append(('finished', self.result))
+                    return events
+                events.append((kind, payload))
+        except (EOFError, OSError):
+            self.worker.process.join(1)
+            if _SIGXCPU is not None and self.worker.process.exitcode == -_SIGXCPU:
+                self._finish('cpu_timeout', ["تجاوز البرنامج حد زمن المعالج"], healthy=False)
+            else:
+                self._finish('crashed', ["توقفت عملية التنفيذ بشكل غير متوقع"], healthy=False)
+            events.append(('finished', self.result))
+            return events
+
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self._finish('timeout', ["تجاوز البرنامج الحد الزمني للتنفيذ"], healthy=False)
+            events.append(('finished', self.result))
+        return events
+
+    def send_input(self, value):
+        """الرد على طلب إدخال - Answer an input request"""
+        if self.result is None:
+            self.worker.connection.send(('input', value))
+
+    def cancel(self):
+        """إيقاف التشغيل - Cancel the run"""
+        if self.result is None:
+            self._finish('cancelled', [], healthy=False)
+        return self.result
+
+    def _finish(self, status, errors, healthy=True):
+        """تسجيل النتيجة وإعادة العملية للمجموعة - Record the result, release the worker"""
+        self.result = {
+            'success': status == 'completed',
+            'status': status,
+            'errors': errors,
+            'duration': time.monotonic() - self.started,
+        }
+        self.engine._release(self.worker, healthy)
+
+
+class ExecutionEngine:
+    """محرك التنفيذ - Pool of warm worker processes for generated programs
+
+    Args:
+        pool_size: عدد العمليات الجاهزة - number of warm workers
+        wall_timeout: الحد الزمني الفعلي بالثواني - wall-clock limit in seconds
+        cpu_timeout: حد زمن المعالج بالثواني - CPU time limit in seconds
+        memory_limit: حد مساحة العناوين للعملية بالبايت - address space limit in bytes
+        start_method: طريقة multiprocessing (الافتراضي forkserver إن توفر)
+                      multiprocessing start method (forkserver when available)
+
+    حدود المعالج والذاكرة تتطلب وحدة resource (أنظمة يونكس).
+    CPU and memory limits need the resource module (Unix only).
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, wall_timeout=None, cpu_timeout=None,
+                 memory_limit=None, start_method=None):
+        if start_method is None:
+            methods = multiprocessing.get_all_start_methods()
+            start_method = 'forkserver' if 'forkserver' in methods else 'spawn'
+        self.context = multiprocessing.get_context(start_method)
+        if start_method == 'forkserver':
+            self.context.set_forkserver_preload(PRELOAD_MODULES)
+        self.pool_size = pool_size
+        self.wall_timeout = wall_timeout
+        self.cpu_timeout = cpu_timeout
+        self.memory_limit = memory_limit
+        self.idle = []
+
+    def start(self):
+        """تجهيز العمليات مسبقاً - Pre-start the worker pool"""
+        while len(self.idle) < self.pool_size:
+            self.idle.append(self._spawn_worker())
+
+    def submit(self, code_object, wall_timeout=None, cpu_timeout=None, memory_limit=None):
+        """تشغيل كائن شيفرة في عملية جاهزة - Run a code object in a warm worker
+
+        الحدود غير المحددة تأخذ قيم المحرك - unset limits use the engine defaults.
+
+        Returns:
+            ExecutionJob
+        """
+        worker = self.idle.pop() if self.idle else self._spawn_worker()
+        worker.connection.send((
+            'run',
+            marshal.dumps(code_object),
+            cpu_timeout or self.cpu_timeout,
+            memory_limit or self.memory_limit,
+        ))
+        job = ExecutionJob(self, worker, wall_timeout or self.wall_timeout)
+        # عملية احتياطية للتشغيل التالي - keep a spare for the next run
+        if not self.idle:
+            self.idle.append(self._spawn_worker())
+        return job
+
+    def shutdown(self):
+        """إيقاف العمليات الخاملة - Stop the idle workers"""
+        for worker in self.idle:
+            worker.stop()
+        self.idle = []
+
+    def _spawn_worker(self):
+        """إنشاء عملية عاملة - Start a worker process"""
+        parent_end, child_end = self.context.Pipe()
+        process = self.context.Process(target=_worker_main, args=(child_end,), daemon=True)
+        process.start()
+        child_end.close()
+        return _Worker(process, parent_end)
+
+    def _release(self, worker, healthy):
+        """إعادة عملية إلى المجموعة أو إنهاؤها - Return a worker to the pool or kill it"""
+        if healthy and len(self.idle) < self.pool_size:
+            self.idle.append(worker)
+        elif healthy:
+            worker.stop()
+        else:
+            worker.kill()
+            if not self.idle:
+                self.idle.append(self._spawn_worker())
@@ -4,12 +4,62 @@ from datetime import datetime
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
-from compiler_analyzer import get_lexical_analysis, get_syntax_analysis, get_semantic_analysis
-from antlr4 import InputStream, CommonTokenStream
-from ArabicGrammarLexer import ArabicGrammarLexer
-from ArabicGrammarParser import ArabicGrammarParser
-from semantic_analyzer import SemanticAnalyzer
-from code_generator import CodeGenerator
+from compile_cache import compile_to_code_object
+from execution_engine import ExecutionEngine
+from dfa_cache import load_dfa_cache
+from compile_service import CompileService
+
+class BufferedConsole(QObject):
+    """مخرجات الكونسول على دفعات - Batched console output
+
+    تُجمع الكتابات وتُضاف للنافذة مرة واحدة عند انتهاء المؤقت أو بلوغ الحجم
+    الأقصى، مع تمرير واحد لكل دفعة. عدد الأسطر محدود حتى لا تكبر الذاكرة.
+    Writes are collected and inserted once per timer tick or size threshold,
+    with one scroll update per flush; the line count is capped.
+    """
+
+    def __init__(self, widget, interval=30, max_chars=64 * 1024, max_lines=10000):
+        super().__init__(widget)
+        self.widget = widget
+        self.max_chars = max_chars
+        self.parts = []
+        self.size = 0
+        widget.document().setMaximumBlockCount(max_lines)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+
+    def write(self, text):
+        """إضافة نص للدفعة الحالية"""
+        if not text:
+            return
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.max_chars:
+            self.flush()
+        elif not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """إضافة النص المجمع للنافذة"""
+        self.timer.stop()
+        if not self.parts:
+            return
+        text = "".join(self.parts)
+        self.parts = []
+        self.size = 0
+        self.widget.moveCursor(QTextCursor.End)
+        self.widget.insertPlainText(text)
+        scrollbar = self.widget.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+
+    def discard(self):
+        """إهمال النص غير المضاف (عند مسح الكونسول)"""
+        self.timer.stop()
+        self.parts = []
+        self.size = 0
+
 
 class ArabicCompilerIDE(QMainWindow):
     def __init__(self):
@@ -25,7 +75,15 @@ class ArabicCompilerIDE(QMainWindow):
         self.current_file_index = -1  # فهرس الملف الحالي
         self.running_process = None  # العملية قيد التشغيل
         self.is_running = False  # حالة التنفيذ
+        # البرامج تُنفذ في عمليات منفصلة جاهزة مسبقاً - programs run in warm worker processes
+        self.execution_engine = ExecutionEngine(cpu_timeout=60, memory_limit=1024 * 1024 * 1024)
+        self.execution_engine.start()
+        self.execution_timer = QTimer(self)
+        self.execution_timer.setInterval(10)
+        self.execution_timer.timeout.connect(self.poll_execution)
         self.init_ui()
+        # الترجمة والتحليلات في خيط منفصل - compiles and analyses run on a worker thread
+        self.compile_service = CompileService(self.text_editor.toPlainText, parent=self)
         self.setup_connections()
 
     def init_ui(self):
@@ -328,6 +386,7 @@ class ArabicCompilerIDE(QMainWindow):
         self.console_output.setReadOnly(False)  # ← غيّر من True إلى False
         self.console_output.setPlaceholderText("المخرجات والمدخلات ستظهر هنا...")
         self.console_output.installEventFilter(self)  # ← أضف هذا السطر
+        self.console_buffer = BufferedConsole(self.console_output)
 
         # خط وحدة التحكم
         console_font = QFont("Consolas", 10)
@@ -390,6 +449,9 @@ class ArabicCompilerIDE(QMainWindow):
         # ربط تغيير النص
         self.text_editor.textChanged.connect(self.on_text_changed)
         
+        # نتائج الترجمة في الخلفية
+        self.compile_service.finished.connect(self.on_compile_finished)
+        
     # وظائف القوائم
     def new_file(self):
         """إنشاء ملف جديد"""
@@ -617,9 +679,13 @@ class ArabicCompilerIDE(QMainWindow):
     def run_code(self):
         """تشغيل الكود مباشرة من الواجهة"""
         try:
-            self.is_running = True
+            # إيقاف أي تنفيذ سابق
+            if self.running_process:
+                self.running_process.cancel()
+                self.finish_execution()
 
             # مسح الكونسول
+            self.console_buffer.discard()
             self.console_output.clear()
             
             # الحصول على الكود المصدري 
@@ -629,79 +695,80 @@ class ArabicCompilerIDE(QMainWindow):
                 return
             
            
-            # التحليل اللغوي
-            input_stream = InputStream(source_code)
-            lexer = ArabicGrammarLexer(input_stream)
-            token_stream = CommonTokenStream(lexer)
-            parser = ArabicGrammarParser(token_stream)
-            
-            # بناء شجرة AST
-            tree = parser.program()
+            # توليد الكود في خيط الخلفية عبر الذاكرة المؤقتة (لا ترجمة إذا لم يتغير النص)
+            self.compile_service.submit('run', source_code)
             
-            # التحليل الدلالي
-            analyzer = SemanticAnalyzer()
-            ast = analyzer.visit(tree)
-            
-            if analyzer.errors:
-                error_msg = "\n".join([f"❌ {err}" for err in analyzer.errors])
+        except Exception as e:
+            self.console_output.setPlainText(f"❌ خطأ في التنفيذ:\n{str(e)}")
+
+    def run_compiled_code(self, result):
+        """تنفيذ نتيجة الترجمة عند وصولها من خيط الخلفية"""
+        try:
+            if not result['success']:
+                errors = result.get('errors') or [result.get('error', 'خطأ غير معروف')]
+                error_msg = "\n".join([f"❌ {err}" for err in errors])
                 self.console_output.setPlainText(error_msg)
                 return
             
-            # توليد الكود
-            generator = CodeGenerator()
-            python_code = generator.generate(ast)
+            # كائن الشيفرة من ذاكرة الشيفرة الثنائية (لا ترجمة بايثون إذا لم يتغير الكود)
+            code_object = compile_to_code_object(result['code'])
             
             # تنفيذ الكود المولد
-            self.execute_generated_code(python_code)
+            self.execute_generated_code(code_object)
             
         except Exception as e:
             self.console_output.setPlainText(f"❌ خطأ في التنفيذ:\n{str(e)}")
     
-    def execute_generated_code(self, python_code):
-        """تنفيذ الكود البايثون المولد داخل الواجهة"""
-        import io
-        import sys
-        from contextlib import redirect_stdout, redirect_stderr
-        
-        # إنشاء بيئة تنفيذ معزولة
-        namespace = {
-            '__name__': '__main__',
-            '__builtins__': __builtins__,
-            'print': self.console_print,  # استبدال print
-            'input': self.console_input,  # استبدال input
-            'math': __import__('math'),
-            'sys': __import__('sys')
-        }
-        
-        try:
-            # تنفيذ الكود
-            exec(python_code, namespace)
-            
-            # تشغيل main إذا كانت موجودة
-            if 'main' in namespace:
-                namespace['main']()
-                
-        except Exception as e:
-            self.console_output.insertPlainText(f"\n❌ خطأ في التنفيذ: {str(e)}\n")
+    def execute_generated_code(self, code_object):
+        """تنفيذ كائن الشيفرة المولد في عملية منفصلة دون تجميد الواجهة"""
+        self.running_process = self.execution_engine.submit(code_object)
+        self.is_running = True
+        self.execution_timer.start()
+
+    def poll_execution(self):
+        """قراءة مخرجات التنفيذ وطلبات الإدخال من العملية"""
+        job = self.running_process
+        if job is None:
+            self.execution_timer.stop()
+            return
+        for kind, payload in job.poll(max_events=64):
+            if kind == 'output':
+                self.console_print(payload, end='')
+            elif kind == 'input':
+                self.request_console_input(job, payload)
+            elif kind == 'finished':
+                self.finish_execution()
+                if payload['status'] in ('error', 'memory', 'timeout', 'cpu_timeout', 'crashed'):
+                    for error in payload['errors']:
+                        self.console_output.insertPlainText(f"\n❌ خطأ في التنفيذ: {error}\n")
+
+    def request_console_input(self, job, prompt):
+        """انتظار إدخال المستخدم في الكونسول ثم إرساله للعملية"""
+        self.console_buffer.write(prompt)
+        self.console_buffer.flush()
+        self.waiting_for_input = True
+        self.input_buffer = ""
+
+        def callback(value):
+            self.console_output.insertPlainText("\n")
+            job.send_input(value)
+
+        self.input_callback = callback
+        self.console_output.setFocus()
+
+    def finish_execution(self):
+        """إنهاء حالة التنفيذ"""
+        self.console_buffer.flush()
+        self.execution_timer.stop()
+        self.running_process = None
+        self.is_running = False
+        self.waiting_for_input = False
+        self.input_callback = None
     
     def console_print(self, *args, **kwargs):
-        """دالة طباعة مخصصة للكونسول"""
-        # تحويل كل المدخلات إلى نص
-        text = " ".join(str(arg) for arg in args)
-        
-        # إضافة النص للكونسول
-        self.console_output.insertPlainText(text)
-        
-        # إضافة سطر جديد إذا لم يكن end محددًا
-        if kwargs.get('end', '\n') == '\n':
-            self.console_output.insertPlainText('\n')
-        
-        # التمرير للأسفل
-        scrollbar = self.console_output.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
-        
-        # تحديث الواجهة
-        QApplication.processEvents()
+        """دالة طباعة مخصصة للكونسول (تُضاف على دفعات)"""
+        text = kwargs.get('sep', " ").join(str(arg) for arg in args)
+        self.console_buffer.write(text + kwargs.get('end', '\n'))
 
    
     def stop_execution(self):
@@ -711,11 +778,8 @@ class ArabicCompilerIDE(QMainWindow):
             
             # إيقاف العملية إذا كانت موجودة
             if self.running_process:
-                try:
-                    self.running_process.terminate()
-                    self.running_process = None
-                except:
-                    pass
+                self.running_process.cancel()
+            self.finish_execution()
             
             self.log_to_console("🛑 تم إيقاف التنفيذ", "error")
             
@@ -727,15 +791,17 @@ class ArabicCompilerIDE(QMainWindow):
     
     def show_lexical_analysis(self):
         """عرض التحليل المعجمي الفعلي"""
-        code = self.text_editor.toPlainText().strip()
-        if not code:
+        code = self.text_editor.toPlainText()
+        if not code.strip():
             self.log_to_console("⚠️ لا يوجد كود للتحليل", "warning")
             return
         
+        # الحصول على التحليل المعجمي الفعلي في خيط الخلفية، والعرض عند وصول النتيجة
+        self.compile_service.submit('lexical', code)
+
+    def display_lexical_analysis(self, result):
+        """عرض نتيجة التحليل المعجمي"""
         try:
-            # الحصول على التحليل المعجمي الفعلي
-            result = get_lexical_analysis(code)
-            
             self.log_to_console("📜 ═══════════════ التحليل المعجمي ═══════════════")
             
             if result['success']:
@@ -759,15 +825,17 @@ class ArabicCompilerIDE(QMainWindow):
             
     def show_syntax_analysis(self):
         """عرض التحليل النحوي الفعلي بشكل منسق"""
-        code = self.text_editor.toPlainText().strip()
-        if not code:
+        code = self.text_editor.toPlainText()
+        if not code.strip():
             self.log_to_console("⚠️ لا يوجد كود للتحليل", "warning")
             return
         
+        # الحصول على التحليل النحوي الفعلي في خيط الخلفية، والعرض عند وصول النتيجة
+        self.compile_service.submit('syntax', code)
+
+    def display_syntax_analysis(self, result):
+        """عرض نتيجة التحليل النحوي"""
         try:
-            # الحصول على التحليل النحوي الفعلي
-            result = get_syntax_analysis(code)
-            
             self.log_to_console("🧠 ═══════════════ التحليل النحوي ═══════════════")
             
             if result['success']:
@@ -804,15 +872,17 @@ class ArabicCompilerIDE(QMainWindow):
             
     def show_semantic_analysis(self):
         """عرض التحليل الدلالي الفعلي بشكل شامل (بدون جدول الرموز)"""
-        code = self.text_editor.toPlainText().strip()
-        if not code:
+        code = self.text_editor.toPlainText()
+        if not code.strip():
             self.log_to_console("⚠️ لا يوجد كود للتحليل", "warning")
             return
         
+        # الحصول على التحليل الدلالي الفعلي في خيط الخلفية، والعرض عند وصول النتيجة
+        self.compile_service.submit('semantic', code)
+
+    def display_semantic_analysis(self, result):
+        """عرض نتيجة التحليل الدلالي"""
         try:
-            # الحصول على التحليل الدلالي الفعلي
-            result = get_semantic_analysis(code)
-            
             self.log_to_console("🧩 ═══════════════════════════════════════════════════")
             self.log_to_console("         التحليل الدلالي - Semantic Analysis")
             self.log_to_console("═══════════════════════════════════════════════════")
@@ -906,18 +976,17 @@ class ArabicCompilerIDE(QMainWindow):
     
     def show_generated_code(self):
         """عرض الكود المولد (Python Code Generation)"""
-        code = self.text_editor.toPlainText().strip()
-        if not code:
+        code = self.text_editor.toPlainText()
+        if not code.strip():
             self.log_to_console("⚠️ لا يوجد كود لتوليده", "warning")
             return
         
+        # توليد الكود في خيط الخلفية، والعرض عند وصول النتيجة
+        self.compile_service.submit('code_gen', code)
+
+    def display_generated_code(self, result):
+        """عرض نتيجة توليد الكود"""
         try:
-            # استيراد دالة توليد الكود
-            from compiler_analyzer import generate_intermediate_code
-            
-            # توليد الكود
-            result = generate_intermediate_code(code)
-            
             self.log_to_console("🐍 ═══════════════════════════════════════════════════")
             self.log_to_console("         توليد الكود - Code Generation")
             self.log_to_console("═══════════════════════════════════════════════════")
@@ -1040,6 +1109,7 @@ class ArabicCompilerIDE(QMainWindow):
         else:
             formatted_msg = f"[{timestamp}] ℹ️ {message}"
             
+        self.console_buffer.flush()
         self.console_output.append(formatted_msg)
         
         # التمرير للأسفل
@@ -1048,6 +1118,7 @@ class ArabicCompilerIDE(QMainWindow):
         
     def clear_console(self):
         """مسح وحدة التحكم"""
+        self.console_buffer.discard()
         self.console_output.clear()
         welcome_msg = "🧾 تم مسح وحدة التحكم - جاهز لاستقبال مخرجات جديدة"
         self.console_output.setPlainText(welcome_msg)
@@ -1082,8 +1153,58 @@ class ArabicCompilerIDE(QMainWindow):
         elif "الرموز" in analysis_name:
             self.show_symbol_table()
             
+    def on_compile_finished(self, stage, result):
+        """توزيع نتائج الترجمة في الخلفية على دوال العرض"""
+        if stage == 'diagnostics':
+            self.show_diagnostics(result)
+        elif stage == 'lexical':
+            self.display_lexical_analysis(result)
+        elif stage == 'syntax':
+            self.display_syntax_analysis(result)
+        elif stage == 'semantic':
+            self.display_semantic_analysis(result)
+        elif stage == 'code_gen':
+            self.display_generated_code(result)
+        elif stage == 'run':
+            self.run_compiled_code(result)
+
+    def show_diagnostics(self, result):
+        """تسطير الأخطاء في المحرر (تموج أحمر) وتحديث شريط الحالة"""
+        document = self.text_editor.document()
+        error_format = QTextCharFormat()
+        error_format.setUnderlineStyle(QTextCharFormat.SpellCheckUnderline)
+        error_format.setUnderlineColor(QColor("#FF5555"))
+        
+        selections = []
+        for diagnostic in result['diagnostics']:
+            block = document.findBlockByNumber(diagnostic['line'] - 1)
+            if not block.isValid():
+                continue
+            cursor = QTextCursor(block)
+            cursor.movePosition(QTextCursor.Right, QTextCursor.MoveAnchor,
+                                min(diagnostic['column'], block.length() - 1))
+            cursor.movePosition(QTextCursor.EndOfWord, QTextCursor.KeepAnchor)
+            if not cursor.hasSelection():
+                cursor.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor)
+            selection = QTextEdit.ExtraSelection()
+            selection.cursor = cursor
+            selection.format = error_format
+            selections.append(selection)
+        self.text_editor.setExtraSelections(selections)
+        
+        count = len(result['diagnostics'])
+        if count:
+            self.status_label.setText(f"🔴 {count} خطأ")
+            self.status_label.setToolTip("\n".join(d['message'] for d in result['diagnostics']))
+        else:
+            self.status_label.setText("🟢 جاهز")
+            self.status_label.setToolTip("")
+
     def on_text_changed(self):
         """عند تغيير النص في المحرر"""
+        # فحص الأخطاء بعد توقف الكتابة
+        self.compile_service.schedule()
+        
         # تحديث حالة الحفظ
         if self.current_file:
             self.file_info_label.setText(f"{os.path.basename(self.current_file)} *")
@@ -1374,34 +1495,13 @@ class ArabicCompilerIDE(QMainWindow):
             return False
         return super().eventFilter(obj, event)
     
-    def console_input(self, prompt=""):
-        """دالة الإدخال من الكونسول - تحاكي input()"""
-        from PyQt5.QtCore import QEventLoop
-        
-        # طباعة رسالة الطلب
-        if prompt:
-            self.console_output.insertPlainText(prompt)
-        
-        # تفعيل وضع الإدخال
-        self.waiting_for_input = True
-        self.input_buffer = ""
-        result = None
-        
-        # حلقة انتظار
-        loop = QEventLoop()
-        
-        def callback(value):
-            nonlocal result
-            result = value
-            loop.quit()
-        
-        self.input_callback = callback
-        self.console_output.setFocus()
-        loop.exec_()
-        
-        # طباعة السطر الجديد
-        self.console_output.insertPlainText("\n")
-        return result
+    def closeEvent(self, event):
+        """إيقاف عمليات التنفيذ عند إغلاق النافذة"""
+        if self.running_process:
+            self.running_process.cancel()
+        self.execution_engine.shutdown()
+        self.compile_service.shutdown()
+        super().closeEvent(event)
 
 
 
@@ -1409,6 +1509,9 @@ def main():
     """الدالة الرئيسية"""
     app = QApplication(sys.argv)
     
+    # تحميل حالات DFA المسخّنة مسبقاً (إن وجدت) لتسريع أول ترجمة
+    load_dfa_cache()
+    
     # تعيين معلومات التطبيق
     app.setApplicationName("المترجم العربي")
     app.setApplicationVersion("1.0")
@@ -0,0 +1,444 @@
+"""
+Incremental Lexer for Arabic Programming Language
+المحلل المعجمي التزايدي - إعادة تحليل الجزء المتضرر فقط بعد كل تعديل في المحرر
+
+بعد تعديل نصي (موضع، طول المحذوف، النص المُدرج) يعيد تحليل الرموز بدءاً من
+آخر حد رمز قبل التعديل حتى يتطابق مجرى الرموز الجديد مع القديم، ثم يزيح مواضع
+الرموز التالية فقط. الرموز مخزنة في مقاطع لكل منها إزاحة مؤجلة، فتعديل
+ملف من 10 آلاف سطر لا يمر على كل الرموز.
+
+After a text edit (offset, removed length, inserted text) tokens are
+relexed from the last token boundary before the edit until the new token stream
+resyncs with the old one; later tokens are only shifted. Tokens live in
+chunks that carry deferred position deltas, so an edit does not touch
+every token of a large file.
+
+أخطاء التعرف تُحفظ كرموز مخفية (INVALID_TYPE، القناة المخفية) تحمل
+error_message، فالمحلل النحوي لا يراها ويقرؤها ASTBuilder كأخطاء نحوية.
+Recognition errors are kept as hidden tokens (INVALID_TYPE, hidden
+channel) carrying error_message; parsers skip them and ASTBuilder reports
+them as syntax errors.
+
+الرموز مملوكة لهذا الكائن: مواضعها تُحدّث في مكانها بعد التعديلات.
+Tokens are owned by the lexer: their positions are updated in place.
+"""
+
+from antlr4 import InputStream, Token
+from antlr4.Token import CommonToken
+from antlr4.ListTokenSource import ListTokenSource
+from antlr4.PredictionContext import PredictionContextCache
+from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+from antlr4.dfa.DFA import DFA
+from antlr4.error.ErrorListener import ErrorListener
+from ArabicGrammarLexer import ArabicGrammarLexer
+
+
+# حجم المقطع الافتراضي بعدد الرموز - Default tokens per chunk
+CHUNK_SIZE = 256
+
+# أقل عدد أحرف يُحلل في نافذة واحدة - Minimum characters lexed per window
+MIN_WINDOW = 256
+
+# أقصى نظر أمامي للمحلل بعد نهاية رمز - Max lexer lookahead past a token's end
+LOOKAHEAD = 2
+
+
+class _WideLexerATNSimulator(LexerATNSimulator):
+    """محاكي بحواف DFA تغطي الحروف العربية - DFA edges cover the Arabic block
+
+    محاكي ANTLR الافتراضي لا يخزن حواف DFA إلا للأحرف حتى 127، فكل حرف
+    عربي يمر عبر ATN. هنا تتسع الحواف حتى U+06FF، ولذلك تستخدم قائمة DFA
+    خاصة بها لا تُشارك مع المحلل العادي.
+    The stock simulator only caches DFA edges for chars up to 127, so every
+    Arabic letter goes through the ATN. Edges here reach U+06FF, which is
+    why these DFAs are kept apart from the regular lexer's.
+    """
+    MAX_DFA_EDGE = 0x06FF
+
+
+_wide_decisions_to_dfa = [DFA(ds, i) for i, ds in enumerate(ArabicGrammarLexer.atn.decisionToState)]
+_wide_context_cache = PredictionContextCache()
+
+
+class _ErrorTokenCollector(ErrorListener):
+    """تحويل أخطاء التعرف إلى رموز مخفية - Turn recognition errors into hidden tokens
+
+    رمز الخطأ من نوع INVALID_TYPE على القناة المخفية، يغطي الأحرف التي أهملها
+    المحلل، ويحمل رسالة ANTLR في error_message. بذلك تُزاح الأخطاء مع الرموز
+    عند التعديل ولا يراها المحلل النحوي.
+    An error token has INVALID_TYPE on the hidden channel, spans the
+    characters the lexer dropped and carries ANTLR's message in
+    error_message, so errors shift with the tokens on edits and the parser
+    never sees them.
+    """
+
+    def __init__(self):
+        self.pending = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        stream = recognizer.inputStream
+        start = recognizer._tokenStartCharIndex
+        stop = min(stream.index, stream.size - 1)
+        token = CommonToken(type=Token.INVALID_TYPE, channel=Token.HIDDEN_CHANNEL, start=start, stop=stop)
+        token.line = line
+        token.column = column
+        token.text = stream.getText(start, stop)
+        token.error_message = msg
+        self.pending.append(token)
+
+
+def _make_lexer(text, line=1, column=0):
+    """إنشاء محلل معجمي لنافذة نصية - Create a lexer for a text window
+
+    Returns:
+        tuple: (المحلل، جامع الأخطاء) - (lexer, error collector)
+    """
+    lexer = ArabicGrammarLexer(InputStream(text))
+    lexer._interp = _WideLexerATNSimulator(lexer, lexer.atn, _wide_decisions_to_dfa, _wide_context_cache)
+    collector = _ErrorTokenCollector()
+    lexer.removeErrorListeners()
+    lexer.addErrorListener(collector)
+    lexer.line = line
+    lexer.column = column
+    return lexer, collector
+
+
+class _Chunk:
+    """مقطع رموز مع إزاحة مؤجلة - Token chunk with deferred position deltas"""
+    __slots__ = ('tokens', 'char_delta', 'line_delta')
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.char_delta = 0
+        self.line_delta = 0
+
+    def normalize(self):
+        """تطبيق الإزاحة المؤجلة على الرموز - Apply pending deltas to the tokens"""
+        if self.char_delta or self.line_delta:
+            char_delta, line_delta = self.char_delta, self.line_delta
+            for token in self.tokens:
+                token.start += char_delta
+                token.stop += char_delta
+                token.line += line_delta
+            self.char_delta = 0
+            self.line_delta = 0
+
+    def last_stop(self):
+        return self.tokens[-1].stop + self.char_delta
+
+
+class IncrementalLexer:
+    """محلل معجمي تزايدي - Incremental lexer around ArabicGrammarLexer
+
+    Usage:
+        lexer = IncrementalLexer(text)
+        change = lexer.edit(offset, removed_length, inserted_text)
+        tokens = lexer.tokens
+    """
+
+    def __init__(self, source_code='', chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.reset(source_code)
+
+    # ==================== Full Lexing ====================
+
+    def reset(self, source_code):
+        """تحليل النص كاملاً من جديد - Relex the whole text"""
+        self.text = source_code
+        tokens = self._lex(0, 1, 0, len(source_code), until=None)[0]
+        size = self.chunk_size
+        self.chunks = [_Chunk(tokens[i:i + size]) for i in range(0, len(tokens), size)]
+
+    def _lex(self, start, line, column, end, until):
+        """تحليل من موضع بداية رمز - Lex from a token start
+
+        يحلل على نوافذ تنتهي عند نهاية سطر، ويتوقف عندما تُرجع until(token)
+        قيمة True (نقطة التزامن).
+        Lexes in windows that end at a line end and stops when until(token)
+        returns True (resync point).
+
+        Returns:
+            tuple: (الرموز الجديدة، رمز التزامن أو None) - (new tokens, resync token or None)
+        """
+        text = self.text
+        text_length = len(text)
+        tokens = []
+        span = MIN_WINDOW
+        while True:
+            window_end = self._window_end(max(end, start + span))
+            lexer, collector = _make_lexer(text[start:window_end], line, column)
+            window_done = False
+            while not window_done:
+                token = lexer.nextToken()
+                if collector.pending:
+                    # أخطاء التعرف تسبق الرمز الذي أعاده المحلل بعدها
+                    batch = collector.pending + [token]
+                    collector.pending = []
+                else:
+                    batch = (token,)
+                for token in batch:
+                    if token.type == Token.EOF and window_end < text_length:
+                        window_done = True
+                        break
+                    token.text = token.text  # تثبيت النص قبل نقل المواضع - pin text before shifting
+                    token.source = (None, None)
+                    token.start += start
+                    token.stop += start
+                    if until is not None and until(token):
+                        return tokens, token
+                    tokens.append(token)
+                    if token.type == Token.EOF:
+                        return tokens, None
+            line, column = lexer.line, 0
+            start = window_end
+            span *= 2
+
+    def _window_end(self, position):
+        """أول نهاية سطر آمنة بعد موضع - First safe line end at or after a position
+
+        رمز حرفي مثل '\\n' قد يحتوي سطراً جديداً، فلا تنتهي النافذة بعد سطر
+        ينتهي بعلامة اقتباس.
+        A character literal may contain a newline, so a window never ends
+        after a line whose last character is a quote.
+        """
+        text = self.text
+        while True:
+            newline = text.find('\n', position)
+            if newline == -1:
+                return len(text)
+            if newline == 0 or text[newline - 1] != "'":
+                return newline + 1
+            position = newline + 1
+
+    # ==================== Token Access ====================
+
+    def __len__(self):
+        return sum(len(chunk.tokens) for chunk in self.chunks)
+
+    def __getitem__(self, index):
+        chunk_index, local_index = self._locate(index)
+        chunk = self.chunks[chunk_index]
+        chunk.normalize()
+        return chunk.tokens[local_index]
+
+    @property
+    def tokens(self):
+        """كل الرموز بمواضعها الحالية (تشمل EOF ورموز الأخطاء المخفية)
+        All tokens with current positions (incl. EOF and hidden error tokens)"""
+        result = []
+        for chunk in self.chunks:
+            chunk.normalize()
+            result.extend(chunk.tokens)
+        return result
+
+    def token_source(self):
+        """مصدر رموز لـ CommonTokenStream - Token source for a CommonTokenStream"""
+        return ListTokenSource(self.tokens)
+
+    def _locate(self, index):
+        """تحويل فهرس عام إلى (مقطع، فهرس محلي) - Global index to (chunk, local index)"""
+        if index < 0:
+            index += len(self)
+        for chunk_index, chunk in enumerate(self.chunks):
+            if index < len(chunk.tokens):
+                return chunk_index, index
+            index -= len(chunk.tokens)
+        raise IndexError("فهرس الرمز خارج النطاق")
+
+    def _find(self, position):
+        """أول رمز ينتهي عند موضع أو بعده - First token whose stop is at or after position
+
+        Returns:
+            tuple: (فهرس المقطع، الفهرس المحلي) - (chunk index, local index)
+        """
+        chunks = self.chunks
+        low, high = 0, len(chunks) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if chunks[middle].last_stop() < position:
+                low = middle + 1
+            else:
+                high = middle
+        chunk = chunks[low]
+        chunk.normalize()
+        tokens = chunk.tokens
+        low_token, high_token = 0, len(tokens) - 1
+        while low_token < high_token:
+            middle = (low_token + high_token) // 2
+            if tokens[middle].stop < position:
+                low_token = middle + 1
+            else:
+                high_token = middle
+        return low, low_token
+
+    def _token_before(self, chunk_index, local_index):
+        """الرمز السابق لموضع أو None - Token just before a position, or None"""
+        if local_index > 0:
+            return self.chunks[chunk_index].tokens[local_index - 1]
+        if chunk_index > 0:
+            chunk = self.chunks[chunk_index - 1]
+            chunk.normalize()
+            return chunk.tokens[-1]
+        return None
+
+    def _global_index(self, chunk_index, local_index):
+        return sum(len(chunk.tokens) for chunk in self.chunks[:chunk_index]) + local_index
+
+    # ==================== Editing ====================
+
+    def edit(self, offset, removed_length, inserted_text):
+        """تطبيق تعديل نصي - Apply a text edit and relex the damaged region
+
+        Args:
+            offset: موضع التعديل في النص القديم - edit offset in the old text
+            removed_length: عدد الأحرف المحذوفة - number of characters removed
+            inserted_text: النص المُدرج - inserted text
+
+        Returns:
+            dict: start (فهرس أول رمز متغير)، removed (عدد الرموز القديمة
+                  المستبدلة)، inserted (الرموز الجديدة)
+                  start index of the first changed token, number of old
+                  tokens replaced, and the new tokens
+        """
+        old_text = self.text
+        self.text = old_text[:offset] + inserted_text + old_text[offset + removed_length:]
+        delta = len(inserted_text) - removed_length
+        edit_end_new = offset + len(inserted_text)
+
+        # نقطة البداية: نهاية آخر رمز لم يصل نظر المحلل الأمامي منه إلى التعديل
+        # (أطول نظر أمامي في القواعد حرفان، مثل '12.' قبل رقم)
+        chunk_index, local_index = self._find(offset - LOOKAHEAD)
+        previous = self._token_before(chunk_index, local_index)
+        if previous is None:
+            restart, line, column = 0, 1, 0
+        else:
+            restart = previous.stop + 1
+            previous_text = previous.text
+            newlines = previous_text.count('\n')
+            line = previous.line + newlines
+            if newlines:
+                column = len(previous_text) - previous_text.rfind('\n') - 1
+            else:
+                column = previous.column + len(previous_text)
+
+        # المرور على الرموز القديمة بحثاً عن نقطة التزامن
+        old_cursor = [chunk_index, local_index]
+
+        def resyncs(token):
+            if token.start < edit_end_new:
+                return False
+            target = token.start - delta
+            while True:
+                ci, li = old_cursor
+                chunk = self.chunks[ci]
+                if li >= len(chunk.tokens):
+                    if ci + 1 >= len(self.chunks):
+                        return False
+                    old_cursor[0], old_cursor[1] = ci + 1, 0
+                    continue
+                chunk.normalize()
+                old_token = chunk.tokens[li]
+                if old_token.start < target:
+                    old_cursor[1] = li + 1
+                    continue
+                return old_token.start == target and old_token.type == token.type
+
+        new_tokens, resync_token = self._lex(restart, line, column, edit_end_new, resyncs)
+        start_index = self._global_index(chunk_index, local_index)
+        if resync_token is None:
+            end_chunk, end_local = len(self.chunks) - 1, len(self.chunks[-1].tokens)
+        else:
+            end_chunk, end_local = old_cursor
+        removed_count = self._global_index(end_chunk, end_local) - start_index
+
+        if resync_token is not None:
+            old_resync = self.chunks[end_chunk].tokens[end_local]
+            self._shift_after(end_chunk, end_local, delta, resync_token.line - old_resync.line,
+                              resync_token.column - old_resync.column, old_resync.line)
+        self._splice(chunk_index, local_index, end_chunk, end_local, new_tokens)
+
+        return {
+            'start': start_index,
+            'removed': removed_count,
+            'inserted': new_tokens,
+        }
+
+    def update(self, new_text):
+        """المزامنة مع نص جديد كامل - Sync with a full new text snapshot
+
+        يحسب المقطع المتغير الوحيد (أطول بادئة ولاحقة مشتركتين) ثم يطبقه كتعديل.
+        Finds the single changed span (longest common prefix and suffix) and
+        applies it as one edit.
+
+        Returns:
+            dict أو None: نتيجة edit، أو None إذا لم يتغير النص
+                          the edit result, or None when the text is unchanged
+        """
+        old_text = self.text
+        if new_text == old_text:
+            return None
+        limit = min(len(old_text), len(new_text))
+
+        # بحث ثنائي بمقارنات شرائح (تتم في C) - binary search over slice comparisons
+        low, high = 0, limit
+        while low < high:
+            middle = (low + high + 1) // 2
+            if old_text[:middle] == new_text[:middle]:
+                low = middle
+            else:
+                high = middle - 1
+        prefix = low
+
+        low, high = 0, limit - prefix
+        while low < high:
+            middle = (low + high + 1) // 2
+            if old_text[len(old_text) - middle:] == new_text[len(new_text) - middle:]:
+                low = middle
+            else:
+                high = middle - 1
+        suffix = low
+
+        return self.edit(prefix, len(old_text) - prefix - suffix,
+                         new_text[prefix:len(new_text) - suffix])
+
+    def _shift_after(self, chunk_index, local_index, char_delta, line_delta, column_delta, old_line):
+        """إزاحة الرموز من نقطة التزامن فما بعد - Shift tokens from the resync point on"""
+        if column_delta:
+            ci, li = chunk_index, local_index
+            while ci < len(self.chunks):
+                chunk = self.chunks[ci]
+                chunk.normalize()
+                tokens = chunk.tokens
+                while li < len(tokens) and tokens[li].line == old_line:
+                    tokens[li].column += column_delta
+                    li += 1
+                if li < len(tokens):
+                    break
+                ci, li = ci + 1, 0
+
+        if char_delta or line_delta:
+            chunk = self.chunks[chunk_index]
+            for token in chunk.tokens[local_index:]:
+                token.start += char_delta
+                token.stop += char_delta
+                token.line += line_delta
+            for chunk in self.chunks[chunk_index + 1:]:
+                chunk.char_delta += char_delta
+                chunk.line_delta += line_delta
+
+    def _splice(self, chunk_index, local_index, end_chunk, end_local, new_tokens):
+        """استبدال الرموز القديمة بالجديدة - Replace old tokens with new ones"""
+        head = self.chunks[chunk_index]
+        tail = self.chunks[end_chunk]
+        head.normalize()
+        tail.normalize()
+        merged = head.tokens[:local_index] + new_tokens + tail.tokens[end_local:]
+
+        size = self.chunk_size
+        if len(merged) > 2 * size:
+            replacement = [_Chunk(merged[i:i + size]) for i in range(0, len(merged), size)]
+        elif merged:
+            replacement = [_Chunk(merged)]
+        else:
+            replacement = []
+        self.chunks[chunk_index:end_chunk + 1] = replacement
@@ -0,0 +1,355 @@
+"""
+AST Optimizer for Arabic Programming Language
+المحسّن - تمريرات تحسين على شجرة AST بين الفحص الدلالي وتوليد الكود
+
+التمريرات لا تعدّل الشجرة الأصلية: كل عقدة تتغير تُنسخ، والفروع التي لم
+تتغير تُشارك كما هي. الشجرة الأصلية قد تكون مشتركة (كتل الإجراءات في
+ProcedureCheckCache، وعرض AST في الواجهة) فلا يجوز تعديلها.
+Passes never modify their input: changed nodes are copied and unchanged
+subtrees are shared. The input tree may be shared (procedure blocks in
+ProcedureCheckCache, the IDE's AST view), so it must not be mutated.
+
+تُشغَّل فقط على برامج بلا أخطاء دلالية - Only run on programs without semantic errors.
+"""
+
+import copy
+import math
+import operator
+
+from ast_nodes import *
+
+
+# ==================== Helpers ====================
+
+def _replace(node, **fields):
+    """نسخة من العقدة بحقول جديدة، أو العقدة نفسها إن لم يتغير شيء
+    A copy of the node with new field values, or the node itself if nothing changed
+    """
+    if all(getattr(node, name) is value for name, value in fields.items()):
+        return node
+    node = copy.copy(node)
+    for name, value in fields.items():
+        setattr(node, name, value)
+    return node
+
+
+# ==================== Constant Folding ====================
+
+# العمليات كما ينفذها كود بايثون المولد (انظر CodeGenerator.convert_operator)
+# Operators as the generated Python evaluates them (see CodeGenerator.convert_operator)
+_BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '\\': operator.floordiv,
+    '%': operator.mod,
+    '==': operator.eq,
+    '=!': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+    '&&': lambda left, right: left and right,
+    '||': lambda left, right: left or right,
+}
+
+_UNARY_OPERATORS = {
+    '+': operator.pos,
+    '-': operator.neg,
+    '!': operator.not_,
+}
+
+# نوع القيمة الحرفية حسب نوع بايثون - Literal type by Python type
+_LITERAL_TYPES = {
+    bool: 'منطقي',
+    int: 'صحيح',
+    float: 'حقيقي',
+    str: 'خيط_رمزي',
+}
+
+# حدود القيم المطوية حتى لا يتضخم الكود - Limits that keep folded literals small
+MAX_FOLDED_INT_BITS = 128
+MAX_FOLDED_STRING = 256
+
+# اسم معرّف في نطاق داخلي يحجب الثابت الخارجي - A local name shadowing an outer constant
+_SHADOWED = object()
+
+
+class ConstantFolder:
+    """طي الثوابت ونشرها - Constant folding and propagation
+
+    - يستبدل مراجع الثوابت (VarAccessNode بلا محدد، ConstantRefNode) بقيمها.
+    - يحسب BinOpNode و UnaryOpNode التي كل معاملاتها ثابتة.
+    - يحذف فروع IfNode ذات الشرط الثابت، وحلقات طالما ذات الشرط الخاطئ دائماً.
+    - Replaces constant references (bare VarAccessNode, ConstantRefNode)
+      with their values.
+    - Evaluates BinOpNode / UnaryOpNode whose operands are all constant.
+    - Prunes IfNode branches with constant conditions, and while loops whose
+      condition is always false.
+
+    القيم تُحسب بعمليات بايثون نفسها التي ينفذها الكود المولد، وأي عملية ترفع
+    استثناءً (قسمة على صفر) تُترك ليقع الخطأ عند التنفيذ كما كان.
+    Values are computed with the same Python operations the generated code
+    would run; an operation that raises (division by zero) is left alone so
+    the error still happens at run time.
+
+    Args:
+        symbol_table: جدول الرموز بعد الفحص؛ قيم Symbol.value للثوابت العامة
+                      the checked symbol table; Symbol.value of global constants
+    """
+
+    def __init__(self, symbol_table=None):
+        global_constants = {}
+        if symbol_table is not None:
+            for symbol in symbol_table.scopes[0].values():
+                if symbol.symbol_type == 'CONSTANT' and symbol.value is not None:
+                    global_constants[symbol.name] = (symbol.value, self.literal_type_of(symbol.value))
+        # نطاقات: الاسم -> (القيمة، نوع الحرفي) أو _SHADOWED
+        # Scopes: name -> (value, literal_type) or _SHADOWED
+        self.scopes = [global_constants]
+        self.visitors = {}
+        self.folded = 0
+        self.pruned = 0
+
+    def fold(self, program):
+        """طي برنامج كامل - Fold a whole program; returns the new ProgramNode"""
+        if program is None:
+            return None
+        return _replace(program, block=self.fold_block(program.block))
+
+    # ==================== Scopes ====================
+
+    def lookup(self, name):
+        """قيمة الثابت أو None - (value, literal_type) of a constant, or None"""
+        for scope in reversed(self.scopes):
+            entry = scope.get(name)
+            if entry is not None:
+                return None if entry is _SHADOWED else entry
+        return None
+
+    def define_constant(self, node):
+        value_node = node.value_node
+        if isinstance(value_node, LiteralNode):
+            self.scopes[-1][node.name] = (value_node.value, value_node.literal_type)
+        elif isinstance(value_node, ConstantRefNode) and self.lookup(value_node.name) is not None:
+            self.scopes[-1][node.name] = self.lookup(value_node.name)
+        else:
+            self.scopes[-1][node.name] = _SHADOWED
+
+    def shadow(self, names):
+        for name in names:
+            self.scopes[-1][name] = _SHADOWED
+
+    # ==================== Blocks ====================
+
+    def fold_block(self, block):
+        if block is None:
+            return None
+        for const in block.constants:
+            self.define_constant(const)
+        for var_decl in block.variables:
+            self.shadow(var_decl.names)
+        procedures = [self.fold_procedure(proc) for proc in block.procedures]
+        if all(new is old for new, old in zip(procedures, block.procedures)):
+            procedures = block.procedures
+        instructions = self.statement(block.instructions)
+        if instructions is None and block.instructions is not None:
+            # جسم البرنامج أو الإجراء يبقى عبارة مركبة - A body stays a compound statement
+            instructions = _replace(block.instructions, statements=[])
+        return _replace(block, procedures=procedures, instructions=instructions)
+
+    def fold_procedure(self, node):
+        self.scopes.append({})
+        for param in node.params:
+            self.shadow(param.names)
+        block = self.fold_block(node.block)
+        self.scopes.pop()
+        return _replace(node, block=block)
+
+    # ==================== Statements ====================
+
+    def statement(self, node):
+        """طي عبارة؛ قد تُرجع None إن حُذفت - Fold a statement; None if it was removed"""
+        if node is None:
+            return None
+        try:
+            visitor = self.visitors[node.__class__]
+        except KeyError:
+            visitor = getattr(self, f'fold_{node.__class__.__name__}', None)
+            self.visitors[node.__class__] = visitor
+        if visitor is None:
+            return node
+        return visitor(node)
+
+    def fold_CompoundStmtNode(self, node):
+        statements = [self.statement(stmt) for stmt in node.statements]
+        if all(new is old for new, old in zip(statements, node.statements)):
+            return node
+        statements = [stmt for stmt in statements if stmt is not None]
+        if not statements:
+            return None  # كل العبارات حُذفت - every statement was removed
+        return _replace(node, statements=statements)
+
+    def fold_AssignmentNode(self, node):
+        return _replace(node, variable=self.target(node.variable), expression=self.expression(node.expression))
+
+    def fold_InputNode(self, node):
+        return _replace(node, variable=self.target(node.variable))
+
+    def fold_OutputNode(self, node):
+        items = [self.expression(item) for item in node.items]
+        if all(new is old for new, old in zip(items, node.items)):
+            return node
+        return _replace(node, items=items)
+
+    def fold_CallNode(self, node):
+        # وسيط هو متغير مجرد قد يُمرَّر بالمرجع فلا يُستبدل
+        # A bare variable argument may be passed by reference, so keep it
+        arguments = [
+            self.target(arg) if isinstance(arg, VarAccessNode) else self.expression(arg)
+            for arg in node.arguments
+        ]
+        if all(new is old for new, old in zip(arguments, node.arguments)):
+            return node
+        return _replace(node, arguments=arguments)
+
+    def fold_IfNode(self, node):
+        live = []
+        else_stmt = node.else_stmt
+        for condition, stmt in [(node.condition, node.then_stmt)] + list(node.elif_parts):
+            condition = self.expression(condition)
+            known, value = self.constant_value(condition)
+            if not known:
+                live.append((condition, self.statement(stmt)))
+                continue
+            self.pruned += 1
+            if value:
+                # شرط صحيح دائماً: الفروع بعده لا تُبلغ - Always true: later branches are unreachable
+                else_stmt = stmt
+                break
+        else_stmt = self.statement(else_stmt)
+
+        if not live:
+            return else_stmt
+        (condition, then_stmt), elif_parts = live[0], live[1:]
+        if (else_stmt is node.else_stmt and len(elif_parts) == len(node.elif_parts)
+                and all(new[0] is old[0] and new[1] is old[1] for new, old in zip(elif_parts, node.elif_parts))):
+            return _replace(node, condition=condition, then_stmt=then_stmt)
+        return _replace(node, condition=condition, then_stmt=then_stmt, elif_parts=elif_parts, else_stmt=else_stmt)
+
+    def fold_ForLoopNode(self, node):
+        return _replace(
+            node,
+            start_expr=self.expression(node.start_expr),
+            end_expr=self.expression(node.end_expr),
+            step_expr=self.expression(node.step_expr),
+            body=self.statement(node.body),
+        )
+
+    def fold_WhileLoopNode(self, node):
+        condition = self.expression(node.condition)
+        known, value = self.constant_value(condition)
+        if known and not value:
+            self.pruned += 1
+            return None
+        return _replace(node, condition=condition, body=self.statement(node.body))
+
+    def fold_RepeatUntilNode(self, node):
+        return _replace(node, body=self.statement(node.body), condition=self.expression(node.condition))
+
+    # ==================== Expressions ====================
+
+    def target(self, node):
+        """متغير يُكتب فيه: يُطوى فهرسه فقط - A written variable: only its index is folded"""
+        selector = node.selector
+        if isinstance(selector, IndexedSelectorNode):
+            selector = _replace(selector, index_expr=self.expression(selector.index_expr))
+        return _replace(node, selector=selector)
+
+    def expression(self, node):
+        """طي تعبير - Fold an expression"""
+        if node is None:
+            return None
+        if isinstance(node, BinOpNode):
+            left = self.expression(node.left)
+            right = self.expression(node.right)
+            known_left, left_value = self.constant_value(left)
+            known_right, right_value = self.constant_value(right)
+            if known_left and known_right:
+                function = _BINARY_OPERATORS.get(node.operator)
+                folded = self.evaluate(function, left_value, right_value)
+                if folded is not None:
+                    return self.make_literal(folded, node)
+            return _replace(node, left=left, right=right)
+
+        if isinstance(node, UnaryOpNode):
+            operand = self.expression(node.operand)
+            known, value = self.constant_value(operand)
+            if known:
+                folded = self.evaluate(_UNARY_OPERATORS.get(node.operator), value)
+                if folded is not None:
+                    return self.make_literal(folded, node)
+            return _replace(node, operand=operand)
+
+        if isinstance(node, (VarAccessNode, ConstantRefNode)):
+            if isinstance(node, VarAccessNode) and node.selector is not None:
+                return self.target(node)
+            entry = self.lookup(node.name)
+            if entry is not None:
+                return self.make_literal(entry[0], node, entry[1])
+        return node
+
+    def constant_value(self, node):
+        """(True، القيمة) إن كانت العقدة قيمة حرفية - (True, value) if the node is a literal"""
+        if isinstance(node, LiteralNode):
+            return True, node.value
+        return False, None
+
+    def evaluate(self, function, *operands):
+        """تنفيذ العملية، أو None إن تعذر طيها - Apply the operation, or None if it can't be folded"""
+        if function is None:
+            return None
+        try:
+            value = function(*operands)
+        except Exception:
+            return None
+        if type(value) not in _LITERAL_TYPES:
+            return None
+        if type(value) is int and value.bit_length() > MAX_FOLDED_INT_BITS:
+            return None
+        if type(value) is float and not math.isfinite(value):
+            return None
+        if type(value) is str and len(value) > MAX_FOLDED_STRING:
+            return None
+        return value
+
+    def literal_type_of(self, value):
+        return _LITERAL_TYPES.get(type(value))
+
+    def make_literal(self, value, node, literal_type=None):
+        """قيمة حرفية في موضع العقدة - A literal at the node's position"""
+        self.folded += 1
+        literal = LiteralNode(
+            value=value,
+            literal_type=literal_type or self.literal_type_of(value),
+            line=node.line,
+            column=node.column
+        )
+        if getattr(node, 'expr_type', None) is not None:
+            literal.expr_type = node.expr_type
+        return literal
+
+
+def fold_constants(ast, symbol_table=None):
+    """
+    طي الثوابت في شجرة AST - Fold constants in an AST
+
+    Args:
+        ast: ProgramNode بعد الفحص الدلالي - checked ProgramNode
+        symbol_table: جدول الرموز (اختياري) - symbol table (optional)
+
+    Returns:
+        ProgramNode: شجرة جديدة؛ الأصلية لا تتغير - a new tree; the input is unchanged
+    """
+    return ConstantFolder(symbol_table).fold(ast)
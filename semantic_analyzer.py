@@ -1,7 +1,7 @@
 
 """
 Semantic Analyzer for Arabic Programming Language
-المحلل الدلالي - يبني شجرة AST ويفحص الأخطاء الدلالية
+المحلل الدلالي - يبني شجرة AST ثم يفحص الأخطاء الدلالية عبر SemanticChecker
 """
 
 # NOTE: This assumes you have generated the parser files using ANTLR4
@@ -22,16 +22,32 @@ except ImportError:
             return None
 
 from ast_nodes import *
-from symbol_table import SymbolTable, Symbol, ParamSymbol, TypeInfo, SemanticError, TypeChecker
+from symbol_table import TypeInfo, SemanticError
+from semantic_checker import SemanticChecker, merge_errors
 
 
 class SemanticAnalyzer(ArabicGrammarVisitor):
-    """المحلل الدلالي - Semantic Analyzer Visitor"""
-    
-    def __init__(self):
-        self.symbol_table = SymbolTable()
-        self.current_procedure = None
+    """المحلل الدلالي - Semantic Analyzer Visitor
+
+    يبني شجرة AST من شجرة التحليل النحوي في مرور واحد، ثم يشغّل
+    SemanticChecker عليها في مرور منفصل لفحص النطاقات والأنواع.
+    Builds the AST from the parse tree in one pass, then runs
+    SemanticChecker over it as a separate scope/type checking pass.
+
+    Args:
+        source_code: نص المصدر، لتخزين نتائج فحص الإجراءات
+                     source text, for per-procedure check caching
+        procedure_cache: ProcedureCheckCache اختياري - optional cache
+    """
+    
+    def __init__(self, source_code=None, procedure_cache=None):
+        self.source_code = source_code
+        self.procedure_cache = procedure_cache
+        self.checker = None
+        self.symbol_table = None
         self.errors = []
+        # نطاقات الأنواع المعرفة أثناء البناء - Type names defined so far, per scope
+        self.type_scopes = [{}]
     
     def add_error(self, message, ctx=None):
         """إضافة خطأ دلالي - Add semantic error"""
@@ -41,6 +57,21 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         self.errors.append(error)
         return error
     
+    def check(self, program):
+        """تشغيل مرحلة الفحص الدلالي - Run the checking pass over the built AST"""
+        self.checker = SemanticChecker(self.source_code, self.procedure_cache)
+        self.checker.check(program)
+        self.symbol_table = self.checker.symbol_table
+        self.errors = merge_errors(self.errors, self.checker.errors)
+        return self.errors
+    
+    def resolve_type(self, type_name):
+        """إيجاد نوع معرف سابقاً بالاسم - Resolve a previously defined type by name"""
+        for scope in reversed(self.type_scopes):
+            if type_name in scope:
+                return scope[type_name]
+        return TypeInfo(type_name)
+    
     # ==================== Program & Block ====================
     
     def visitProgram(self, ctx):
@@ -48,12 +79,14 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         program_name = ctx.ID().getText()
         block = self.visit(ctx.block())
         
-        return ProgramNode(
+        program = ProgramNode(
             name=program_name,
             block=block,
             line=ctx.start.line,
             column=ctx.start.column
         )
+        self.check(program)
+        return program
     
     def visitBlock(self, ctx):
         """زيارة كتلة - Visit block node"""
@@ -125,61 +158,16 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         """زيارة تعريف ثابت - Visit constant definition"""
         const_name = ctx.ID().getText()
         const_node = self.visit(ctx.constant_value())
-        
-        # Check if already defined
-        if self.symbol_table.is_defined(const_name):
-            self.add_error(f"الثابت '{const_name}' معرّف مسبقاً", ctx)
-            return None
-        
-        # Determine data_type and value from node
-        data_type = None
-        value = None
-        if hasattr(const_node, 'expr_type') and const_node.expr_type is not None:
-            data_type = const_node.expr_type
-        if hasattr(const_node, 'value'):
-            value = const_node.value
-
-        # Add to symbol table
-        symbol = Symbol(
-            name=const_name,
-            symbol_type='CONSTANT',
-            data_type=data_type,
-            value=value,
-            is_constant=True
-        )
-        self.symbol_table.insert(symbol)
+        value = const_node.value if isinstance(const_node, LiteralNode) else None
         
         return ConstantDefNode(
             name=const_name,
             value=value,
+            value_node=const_node,
             line=ctx.start.line,
             column=ctx.start.column
         )
     
-    def visitConstant_value(self, ctx):
-        """زيارة قيمة ثابتة - Visit constant value"""
-        if ctx.numeric_value():
-            return self.visit(ctx.numeric_value())
-        elif ctx.literal_value():
-            return self.visit(ctx.literal_value())
-        elif ctx.logical_value():
-            return self.visit(ctx.logical_value())
-        elif ctx.ID():
-            # Reference to another constant
-            const_name = ctx.ID().getText()
-            if not self.symbol_table.is_constant(const_name):
-                self.add_error(f"'{const_name}' ليس ثابتاً معرّفاً", ctx)
-                return None
-            # return a constant reference node with its type
-            sym = self.symbol_table.lookup(const_name)
-            node = ConstantRefNode(name=const_name, line=ctx.start.line, column=ctx.start.column)
-            node.expr_type = sym.data_type if sym else None
-            # if constant has a stored primitive value, attach it
-            if sym and sym.value is not None:
-                node.value = sym.value
-            return node
-        return None
-    
     # ==================== Types ====================
     
     def visitTypes_definition(self, ctx):
@@ -194,21 +182,8 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
     def visitType_def(self, ctx):
         """زيارة تعريف نوع - Visit type definition"""
         type_name = ctx.ID().getText()
-        
-        # Check if already defined
-        if self.symbol_table.is_defined(type_name):
-            self.add_error(f"النوع '{type_name}' معرّف مسبقاً", ctx)
-            return None
-        
         type_spec = self.visit(ctx.composite_type())
-        
-        # Add to symbol table
-        symbol = Symbol(
-            name=type_name,
-            symbol_type='TYPE',
-            data_type=type_spec
-        )
-        self.symbol_table.insert(symbol)
+        self.type_scopes[-1].setdefault(type_name, type_spec)
         
         return TypeDefNode(
             name=type_name,
@@ -230,19 +205,11 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         size = int(ctx.INTEGER().getText())
         element_type_name = self.visit(ctx.data_type())
         
-        # Resolve element type
-        element_type = self.symbol_table.lookup_type(element_type_name)
-        if not element_type:
-            self.add_error(f"النوع '{element_type_name}' غير معرّف", ctx)
-            element_type = TypeInfo('صحيح')  # Default fallback
-        
-        type_info = TypeInfo(
+        return TypeInfo(
             base_type=element_type_name,
             is_list=True,
             list_size=size
         )
-        
-        return type_info
     
     def visitRecord_type(self, ctx):
         """زيارة نوع سجل - Visit record type"""
@@ -255,11 +222,7 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
                     if name in fields_dict:
                         self.add_error(f"الحقل '{name}' معرّف مسبقاً في السجل", ctx)
                     else:
-                        # Resolve field type
-                        field_type = self.symbol_table.lookup_type(field_node.data_type)
-                        if not field_type:
-                            field_type = TypeInfo(field_node.data_type)
-                        fields_dict[name] = field_type
+                        fields_dict[name] = self.resolve_type(field_node.data_type)
         
         type_info = TypeInfo(
             base_type='سجل',
@@ -310,25 +273,6 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         names = [id_node.getText() for id_node in ctx.ID()]
         data_type_name = self.visit(ctx.data_type())
         
-        # Resolve type
-        data_type = self.symbol_table.lookup_type(data_type_name)
-        if not data_type:
-            self.add_error(f"النوع '{data_type_name}' غير معرّف", ctx)
-            data_type = TypeInfo('صحيح')  # Default fallback
-        
-        # Add each variable to symbol table
-        for name in names:
-            if self.symbol_table.lookup(name, current_scope_only=True):
-                self.add_error(f"المتغير '{name}' معرّف مسبقاً في هذا النطاق", ctx)
-                continue
-            
-            symbol = Symbol(
-                name=name,
-                symbol_type='VARIABLE',
-                data_type=data_type
-            )
-            self.symbol_table.insert(symbol)
-        
         return VarDeclNode(
             names=names,
             data_type=data_type_name,
@@ -365,70 +309,30 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
     
     def visitProcedure_def(self, ctx):
         """زيارة تعريف إجراء - Visit procedure definition"""
-        # First pass: register procedure in symbol table
         proc_header = ctx.procedure_header()
         proc_name = proc_header.ID().getText()
         
-        # Check if already defined
-        if self.symbol_table.lookup(proc_name, current_scope_only=True):
-            self.add_error(f"الإجراء '{proc_name}' معرّف مسبقاً", ctx)
-            return None
-        
-
         # Get parameters as AST ParamDefNode list
         ast_params = []
         if proc_header.formal_params_list():
             ast_params = self.visit(proc_header.formal_params_list())
-
-        # Build symbol table ParamSymbol list from AST params
-        proc_params_symbols = []
-        for pnode in ast_params:
-            # pnode.names is a list of names for this param group
-            for pname in pnode.names:
-                # Resolve data type for the parameter
-                dtype = self.symbol_table.lookup_type(pnode.data_type)
-                if not dtype:
-                    dtype = TypeInfo(pnode.data_type)
-
-                proc_params_symbols.append(ParamSymbol(
-                    name=pname,
-                    data_type=dtype,
-                    pass_mode=pnode.pass_mode
-                ))
-
-        # Add procedure to symbol table (store ParamSymbol list)
-        symbol = Symbol(
-            name=proc_name,
-            symbol_type='PROCEDURE',
-            params=proc_params_symbols
-        )
-        self.symbol_table.insert(symbol)
-
-        # Enter new scope for procedure body and add parameters into scope
-        self.symbol_table.enter_scope()
-        self.current_procedure = proc_name
-
-        # Add parameters to new scope as symbols
-        for psym in proc_params_symbols:
-            self.symbol_table.insert(Symbol(
-                name=psym.name,
-                symbol_type='PARAMETER',
-                data_type=psym.data_type
-            ))
         
-        # Visit procedure body
+        # Visit procedure body with its own type scope
+        self.type_scopes.append({})
         proc_block = self.visit(ctx.procedure_block())
+        self.type_scopes.pop()
         
-        # Exit procedure scope
-        self.symbol_table.exit_scope()
-        self.current_procedure = None
+        source_range = None
+        if ctx.stop is not None:
+            source_range = (ctx.start.start, ctx.stop.stop + 1)
         
         return ProcedureDefNode(
             name=proc_name,
             params=ast_params,
             block=proc_block,
             line=ctx.start.line,
-            column=ctx.start.column
+            column=ctx.start.column,
+            source_range=source_range
         )
     
     def visitFormal_params_list(self, ctx):
@@ -506,18 +410,6 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         variable = self.visit(ctx.variable_access())
         expression = self.visit(ctx.expression())
         
-        # Type checking
-        if variable and expression:
-            var_type = variable.expr_type
-            expr_type = expression.expr_type
-            
-            if var_type and expr_type:
-                if not TypeChecker.are_compatible(expr_type, var_type):
-                    self.add_error(
-                        f"عدم توافق الأنواع في الإسناد: لا يمكن إسناد {expr_type} إلى {var_type}",
-                        ctx
-                    )
-        
         return AssignmentNode(
             variable=variable,
             expression=expression,
@@ -566,36 +458,11 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         """زيارة استدعاء إجراء - Visit call statement"""
         proc_name = ctx.ID().getText()
         
-        # Check if procedure exists
-        if not self.symbol_table.is_procedure(proc_name):
-            self.add_error(f"الإجراء '{proc_name}' غير معرّف", ctx)
-            return None
-        
         # Get actual arguments
         arguments = []
         if ctx.actual_params_list():
             arguments = self.visit(ctx.actual_params_list())
         
-        # Get expected parameters
-        expected_params = self.symbol_table.get_procedure_params(proc_name)
-        
-        # Check parameter count
-        if len(arguments) != len(expected_params):
-            self.add_error(
-                f"عدد المعاملات غير صحيح للإجراء '{proc_name}': "
-                f"متوقع {len(expected_params)}، موجود {len(arguments)}",
-                ctx
-            )
-        else:
-            # Check parameter types
-            for i, (arg, param) in enumerate(zip(arguments, expected_params)):
-                if hasattr(arg, 'expr_type') and arg.expr_type:
-                    if not TypeChecker.are_compatible(arg.expr_type, param.data_type):
-                        self.add_error(
-                            f"عدم توافق النوع للمعامل {i+1} في استدعاء '{proc_name}'",
-                            ctx
-                        )
-        
         return CallNode(
             procedure_name=proc_name,
             arguments=arguments,
@@ -624,28 +491,23 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
     
     def visitConditional_statement(self, ctx):
         """زيارة عبارة شرطية - Visit conditional statement"""
-        condition = self.visit(ctx.condition(0))
-        then_stmt = self.visit(ctx.instruction(0))
+        conditions = ctx.condition()
+        instructions = ctx.instruction()
         
-        # Check condition type
-        if condition and hasattr(condition, 'expr_type'):
-            if not TypeChecker.is_boolean(condition.expr_type):
-                self.add_error("الشرط يجب أن يكون من نوع منطقي", ctx)
+        condition = self.visit(conditions[0])
+        then_stmt = self.visit(instructions[0])
         
-        # Handle elif parts
+        # Handle elif parts: one instruction per condition, plus an optional else
         elif_parts = []
-        elif_conditions = ctx.condition()[1:]
-        elif_stmts = ctx.instruction()[1:-1] if ctx.ELSE() else ctx.instruction()[1:]
-        
-        for elif_cond_ctx, elif_stmt_ctx in zip(elif_conditions, elif_stmts):
+        for elif_cond_ctx, elif_stmt_ctx in zip(conditions[1:], instructions[1:len(conditions)]):
             elif_cond = self.visit(elif_cond_ctx)
             elif_stmt = self.visit(elif_stmt_ctx)
             elif_parts.append((elif_cond, elif_stmt))
         
         # Handle else part
         else_stmt = None
-        if ctx.ELSE() and len(ctx.instruction()) > len(ctx.condition()):
-            else_stmt = self.visit(ctx.instruction()[-1])
+        if len(instructions) > len(conditions):
+            else_stmt = self.visit(instructions[-1])
         
         return IfNode(
             condition=condition,
@@ -692,19 +554,6 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         end_expr = self.visit(ctx.expression(1))
         step_expr = self.visit(ctx.expression(2)) if len(ctx.expression()) > 2 else None
         
-        # Check if loop variable is defined
-        if not self.symbol_table.is_variable(loop_var):
-            self.add_error(f"متغير الحلقة '{loop_var}' غير معرّف", ctx)
-        
-        # Check types
-        if start_expr and hasattr(start_expr, 'expr_type'):
-            if not TypeChecker.is_numeric(start_expr.expr_type):
-                self.add_error("قيمة البداية يجب أن تكون رقمية", ctx)
-        
-        if end_expr and hasattr(end_expr, 'expr_type'):
-            if not TypeChecker.is_numeric(end_expr.expr_type):
-                self.add_error("قيمة النهاية يجب أن تكون رقمية", ctx)
-        
         return {
             'var': loop_var,
             'start': start_expr,
@@ -717,11 +566,6 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         condition = self.visit(ctx.condition())
         body = self.visit(ctx.instruction())
         
-        # Check condition type
-        if condition and hasattr(condition, 'expr_type'):
-            if not TypeChecker.is_boolean(condition.expr_type):
-                self.add_error("شرط الحلقة يجب أن يكون من نوع منطقي", ctx)
-        
         return WhileLoopNode(
             condition=condition,
             body=body,
@@ -734,11 +578,6 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         body = self.visit(ctx.instruction())
         condition = self.visit(ctx.condition())
         
-        # Check condition type
-        if condition and hasattr(condition, 'expr_type'):
-            if not TypeChecker.is_boolean(condition.expr_type):
-                self.add_error("شرط الحلقة يجب أن يكون من نوع منطقي", ctx)
-        
         return RepeatUntilNode(
             body=body,
             condition=condition,
@@ -756,23 +595,13 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
             operator = self.visit(ctx.relational_op())
             right = self.visit(ctx.simple_expression(1))
             
-            # Type checking
-            result_type = None
-            if left and right and hasattr(left, 'expr_type') and hasattr(right, 'expr_type'):
-                result_type = TypeChecker.get_result_type(operator, left.expr_type, right.expr_type)
-                if not result_type:
-                    self.add_error(f"عملية غير صالحة: {operator} بين {left.expr_type} و {right.expr_type}", ctx)
-                    result_type = TypeInfo('منطقي')  # Default
-            
-            node = BinOpNode(
+            return BinOpNode(
                 left=left,
                 operator=operator,
                 right=right,
                 line=ctx.start.line,
                 column=ctx.start.column
             )
-            node.expr_type = result_type
-            return node
         
         return left
     
@@ -787,30 +616,18 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         
         # Apply sign if present
         if sign and left:
-            if hasattr(left, 'expr_type') and not TypeChecker.is_numeric(left.expr_type):
-                self.add_error(f"لا يمكن تطبيق علامة {sign} على نوع غير رقمي", ctx)
-            
             left = UnaryOpNode(
                 operator=sign,
                 operand=left,
                 line=ctx.start.line,
                 column=ctx.start.column
             )
-            if hasattr(left.operand, 'expr_type'):
-                left.expr_type = left.operand.expr_type
         
         # Handle binary operations
         for i, add_op_ctx in enumerate(ctx.add_op()):
             operator = self.visit(add_op_ctx)
             right = self.visit(ctx.term(i + 1))
             
-            # Type checking
-            result_type = None
-            if left and right and hasattr(left, 'expr_type') and hasattr(right, 'expr_type'):
-                result_type = TypeChecker.get_result_type(operator, left.expr_type, right.expr_type)
-                if not result_type:
-                    self.add_error(f"عملية غير صالحة: {operator} بين {left.expr_type} و {right.expr_type}", ctx)
-            
             left = BinOpNode(
                 left=left,
                 operator=operator,
@@ -818,7 +635,6 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
                 line=ctx.start.line,
                 column=ctx.start.column
             )
-            left.expr_type = result_type
         
         return left
     
@@ -830,13 +646,6 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
             operator = self.visit(mul_op_ctx)
             right = self.visit(ctx.factor(i + 1))
             
-            # Type checking
-            result_type = None
-            if left and right and hasattr(left, 'expr_type') and hasattr(right, 'expr_type'):
-                result_type = TypeChecker.get_result_type(operator, left.expr_type, right.expr_type)
-                if not result_type:
-                    self.add_error(f"عملية غير صالحة: {operator} بين {left.expr_type} و {right.expr_type}", ctx)
-            
             left = BinOpNode(
                 left=left,
                 operator=operator,
@@ -844,7 +653,6 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
                 line=ctx.start.line,
                 column=ctx.start.column
             )
-            left.expr_type = result_type
         
         return left
     
@@ -859,19 +667,12 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         elif ctx.NOT():
             operand = self.visit(ctx.factor())
             
-            # Type checking
-            if operand and hasattr(operand, 'expr_type'):
-                if not TypeChecker.is_boolean(operand.expr_type):
-                    self.add_error("عملية النفي (!) تحتاج نوع منطقي", ctx)
-            
-            node = UnaryOpNode(
+            return UnaryOpNode(
                 operator='!',
                 operand=operand,
                 line=ctx.start.line,
                 column=ctx.start.column
             )
-            node.expr_type = TypeInfo('منطقي')
-            return node
         
         return None
     
@@ -879,43 +680,16 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         """زيارة الوصول لمتغير - Visit variable access"""
         var_name = ctx.ID().getText()
         
-        # Check if variable is defined
-        if not self.symbol_table.is_defined(var_name):
-            self.add_error(f"المتغير '{var_name}' غير معرّف", ctx)
-            return None
-        
-        # Get variable type
-        var_type = self.symbol_table.get_type(var_name)
-        
         selector = None
         if ctx.selector():
             selector = self.visit(ctx.selector())
-            
-            # Handle indexed selector
-            if isinstance(selector, IndexedSelectorNode):
-                if not var_type or not var_type.is_list:
-                    self.add_error(f"'{var_name}' ليس قائمة", ctx)
-                else:
-                    # Type becomes element type
-                    var_type = self.symbol_table.lookup_type(var_type.base_type)
-            
-            # Handle field selector
-            elif isinstance(selector, FieldSelectorNode):
-                if not var_type or not var_type.is_record:
-                    self.add_error(f"'{var_name}' ليس سجلاً", ctx)
-                elif selector.field_name not in var_type.fields:
-                    self.add_error(f"الحقل '{selector.field_name}' غير موجود في السجل", ctx)
-                else:
-                    var_type = var_type.fields[selector.field_name]
         
-        node = VarAccessNode(
+        return VarAccessNode(
             name=var_name,
             selector=selector,
             line=ctx.start.line,
             column=ctx.start.column
         )
-        node.expr_type = var_type
-        return node
     
     def visitSelector(self, ctx):
         """زيارة محدد - Visit selector"""
@@ -929,11 +703,6 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
         """زيارة محدد مفهرس - Visit indexed selector"""
         index_expr = self.visit(ctx.expression())
         
-        # Check index type
-        if index_expr and hasattr(index_expr, 'expr_type'):
-            if not TypeChecker.is_numeric(index_expr.expr_type):
-                self.add_error("الفهرس يجب أن يكون رقمياً", ctx)
-        
         return IndexedSelectorNode(
             index_expr=index_expr,
             line=ctx.start.line,
@@ -953,7 +722,7 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
     # ==================== Literals & Values ====================
     
     def visitConstant_value(self, ctx):
-        """زيارة قيمة ثابتة في تعبير - Visit constant value in expression"""
+        """زيارة قيمة ثابتة - Visit constant value"""
         if ctx.numeric_value():
             return self.visit(ctx.numeric_value())
         elif ctx.literal_value():
@@ -962,94 +731,67 @@ class SemanticAnalyzer(ArabicGrammarVisitor):
             return self.visit(ctx.logical_value())
         elif ctx.ID():
             # Reference to a constant
-            const_name = ctx.ID().getText()
-            if self.symbol_table.is_constant(const_name):
-                const_value = self.symbol_table.get_constant_value(const_name)
-                const_type = self.symbol_table.get_type(const_name)
-                
-                node = ConstantRefNode(
-                    name=const_name,
-                    line=ctx.start.line,
-                    column=ctx.start.column
-                )
-                node.expr_type = const_type
-                return node
-            else:
-                self.add_error(f"الثابت '{const_name}' غير معرّف", ctx)
-        
+            return ConstantRefNode(
+                name=ctx.ID().getText(),
+                line=ctx.start.line,
+                column=ctx.start.column
+            )
         return None
     
     def visitNumeric_value(self, ctx):
         """زيارة قيمة رقمية - Visit numeric value"""
         if ctx.REAL_NUMBER():
-            value = float(ctx.REAL_NUMBER().getText())
-            node = LiteralNode(
-                value=value,
+            return LiteralNode(
+                value=float(ctx.REAL_NUMBER().getText()),
                 literal_type='حقيقي',
                 line=ctx.start.line,
                 column=ctx.start.column
             )
-            # assign TypeInfo
-            node.expr_type = self.symbol_table.lookup_type('حقيقي') or TypeInfo('حقيقي')
-            return node
         elif ctx.INTEGER():
-            value = int(ctx.INTEGER().getText())
-            node = LiteralNode(
-                value=value,
+            return LiteralNode(
+                value=int(ctx.INTEGER().getText()),
                 literal_type='صحيح',
                 line=ctx.start.line,
                 column=ctx.start.column
             )
-            node.expr_type = self.symbol_table.lookup_type('صحيح') or TypeInfo('صحيح')
-            return node
         return None
     
     def visitLiteral_value(self, ctx):
         """زيارة قيمة حرفية - Visit literal value"""
         if ctx.STRING_LITERAL():
             text = ctx.STRING_LITERAL().getText()
-            value = text[1:-1]  # Remove quotes
-            node = LiteralNode(
-                value=value,
+            return LiteralNode(
+                value=text[1:-1],  # Remove quotes
                 literal_type='خيط_رمزي',
                 line=ctx.start.line,
                 column=ctx.start.column
             )
-            node.expr_type = self.symbol_table.lookup_type('خيط_رمزي') or TypeInfo('خيط_رمزي')
-            return node
         elif ctx.CHAR_LITERAL():
             text = ctx.CHAR_LITERAL().getText()
-            value = text[1:-1]  # Remove quotes
-            node = LiteralNode(
-                value=value,
+            return LiteralNode(
+                value=text[1:-1],  # Remove quotes
                 literal_type='حرفي',
                 line=ctx.start.line,
                 column=ctx.start.column
             )
-            node.expr_type = self.symbol_table.lookup_type('حرفي') or TypeInfo('حرفي')
-            return node
         return None
     
     def visitLogical_value(self, ctx):
         """زيارة قيمة منطقية - Visit logical value"""
         if ctx.TRUE():
-            node = LiteralNode(
+            return LiteralNode(
                 value=True,
                 literal_type='منطقي',
                 line=ctx.start.line,
                 column=ctx.start.column
             )
-            node.expr_type = self.symbol_table.lookup_type('منطقي') or TypeInfo('منطقي')
-            return node
         elif ctx.FALSE():
-            node = LiteralNode(
+            return LiteralNode(
                 value=False,
                 literal_type='منطقي',
                 line=ctx.start.line,
                 column=ctx.start.column
             )
-            node.expr_type = self.symbol_table.lookup_type('منطقي') or TypeInfo('منطقي')
-            return node
         return None
     
     # ==================== Operators ====================
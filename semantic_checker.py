@@ -0,0 +1,560 @@
+"""
+Semantic Checker for Arabic Programming Language
+الفاحص الدلالي - يفحص النطاقات والأنواع على شجرة AST بعد بنائها
+
+يمر على ast_nodes (من SemanticAnalyzer أو ASTBuilder) فيبني جدول الرموز،
+ويضع expr_type على التعابير، ويجمع الأخطاء الدلالية. نتائج فحص كل إجراء
+في المستوى الأعلى تُحفظ في ProcedureCheckCache، فبعد تعديل داخل إجراء واحد
+لا يُعاد إلا فحص ذلك الإجراء.
+
+Walks ast_nodes after construction: fills the symbol table, annotates
+expressions with expr_type and collects semantic errors. Results for each
+top-level procedure are cached, so an edit inside one procedure only
+re-checks that procedure.
+"""
+
+import hashlib
+import heapq
+from collections import OrderedDict
+
+from ast_nodes import *
+from symbol_table import SymbolTable, Symbol, ParamSymbol, TypeInfo, SemanticError, TypeChecker
+
+
+_RELATIONAL_OPERATORS = ('==', '=!', '>', '<', '>=', '<=')
+
+
+class ProcedureCheckCache:
+    """ذاكرة نتائج فحص الإجراءات - LRU cache of per-procedure check results
+
+    المفتاح بصمة نص الإجراء وبيئته (الرموز العامة المرئية له)، والقيمة
+    كتلة الإجراء بعد فحصها وسطر بدايته والأخطاء بأسطر نسبية إليه. الكتل
+    المخزنة قد تُشارك بين عدة أشجار فلا يجوز تعديلها بعد الفحص.
+    Keys fingerprint the procedure text and the global symbols it can see;
+    values hold the checked (annotated) procedure block, its start line and
+    errors with procedure-relative lines. Cached blocks may be shared by
+    several ASTs and must not be mutated after checking.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def merge_errors(first, second):
+    """دمج قائمتي أخطاء حسب السطر - Merge two error lists into source order"""
+    return list(heapq.merge(first, second, key=lambda e: e.line or 0))
+
+
+def _type_signature(type_info):
+    """تمثيل ثابت لنوع - Canonical, hashable form of a TypeInfo"""
+    if not isinstance(type_info, TypeInfo):
+        return repr(type_info)
+    fields = tuple((name, _type_signature(field_type)) for name, field_type in type_info.fields.items())
+    return (type_info.base_type, type_info.is_list, type_info.list_size, type_info.is_record, fields)
+
+
+def _symbol_signature(symbol):
+    """تمثيل ثابت لرمز - Canonical form of a symbol as seen by procedure bodies"""
+    params = tuple((p.name, _type_signature(p.data_type), p.pass_mode) for p in symbol.params)
+    return (symbol.name, symbol.symbol_type, _type_signature(symbol.data_type), symbol.is_constant, params)
+
+
+def iter_expressions(node):
+    """كل عقد التعابير في شجرة فرعية بترتيب ثابت - Expression nodes in a fixed order
+
+    يُستخدم لنقل expr_type المحفوظة إلى شجرة جديدة لها نفس البنية.
+    Used to transfer cached expr_type values onto a subtree of the same shape.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            continue
+        if isinstance(node, (list, tuple)):
+            stack.extend(reversed(node))
+        elif isinstance(node, (BinOpNode, UnaryOpNode, VarAccessNode, LiteralNode, ConstantRefNode)):
+            yield node
+            if isinstance(node, BinOpNode):
+                stack.append(node.right)
+                stack.append(node.left)
+            elif isinstance(node, UnaryOpNode):
+                stack.append(node.operand)
+            elif isinstance(node, VarAccessNode) and isinstance(node.selector, IndexedSelectorNode):
+                stack.append(node.selector.index_expr)
+        elif isinstance(node, ProcedureDefNode):
+            stack.append(node.block)
+        elif isinstance(node, BlockNode):
+            stack.extend([node.instructions, node.procedures, node.constants])
+        elif isinstance(node, ConstantDefNode):
+            stack.append(node.value_node)
+        elif isinstance(node, CompoundStmtNode):
+            stack.append(node.statements)
+        elif isinstance(node, AssignmentNode):
+            stack.extend([node.expression, node.variable])
+        elif isinstance(node, InputNode):
+            stack.append(node.variable)
+        elif isinstance(node, OutputNode):
+            stack.append(node.items)
+        elif isinstance(node, CallNode):
+            stack.append(node.arguments)
+        elif isinstance(node, IfNode):
+            stack.extend([node.else_stmt, node.elif_parts, node.then_stmt, node.condition])
+        elif isinstance(node, ForLoopNode):
+            stack.extend([node.body, node.step_expr, node.end_expr, node.start_expr])
+        elif isinstance(node, WhileLoopNode):
+            stack.extend([node.body, node.condition])
+        elif isinstance(node, RepeatUntilNode):
+            stack.extend([node.condition, node.body])
+
+
+class SemanticChecker:
+    """الفاحص الدلالي - Semantic checking pass over the AST
+
+    Args:
+        source_code: نص المصدر، مطلوب لتخزين نتائج الإجراءات
+                     source text; needed for per-procedure caching
+        procedure_cache: ProcedureCheckCache اختياري - optional cache
+    """
+
+    def __init__(self, source_code=None, procedure_cache=None):
+        self.source_code = source_code
+        self.procedure_cache = procedure_cache
+        self.symbol_table = SymbolTable()
+        self.current_procedure = None
+        self.errors = []
+        self.procedures_checked = 0
+        self.procedures_reused = 0
+        self.visitors = {}  # صنف العقدة -> دالة الزيارة أو None - node class -> bound visitor or None
+
+    def add_error(self, message, node=None):
+        """إضافة خطأ دلالي - Add semantic error"""
+        line = node.line if node else None
+        column = node.column if node else None
+        error = SemanticError(message, line, column)
+        self.errors.append(error)
+        return error
+
+    def check(self, program):
+        """فحص برنامج كامل - Check a whole program
+
+        Returns:
+            list: الأخطاء الدلالية - semantic errors
+        """
+        if program is not None:
+            self.check_block(program.block, top_level=True)
+        return self.errors
+
+    # ==================== Dispatch ====================
+
+    def visit(self, node):
+        """زيارة عقدة - Visit a node
+
+        تعيد عقد التعابير نفسها، أو None حيث كان المحلل الدلالي يُسقط العقدة
+        (مثل متغير غير معرّف) حتى لا تتكرر الأخطاء المتتالية.
+        Expression visitors return the node, or None where the analyzer
+        used to drop it (e.g. an undefined variable) to avoid cascades.
+        """
+        if node is None:
+            return None
+        try:
+            visitor = self.visitors[node.__class__]
+        except KeyError:
+            visitor = getattr(self, f'visit_{node.__class__.__name__}', None)
+            self.visitors[node.__class__] = visitor
+        if visitor is None:
+            return node
+        return visitor(node)
+
+    # ==================== Program & Block ====================
+
+    def check_block(self, block, top_level=False):
+        """فحص كتلة - Check block definitions and instructions"""
+        if block is None:
+            return
+        for const in block.constants:
+            self.visit(const)
+        for type_def in block.types:
+            self.visit(type_def)
+        for var_decl in block.variables:
+            self.visit(var_decl)
+
+        environment = None
+        if top_level and self.procedure_cache is not None and self.source_code is not None:
+            environment = hashlib.sha256()
+            for symbol in self.symbol_table.scopes[0].values():
+                environment.update(repr(_symbol_signature(symbol)).encode('utf-8'))
+
+        for proc in block.procedures:
+            symbol = self.declare_procedure(proc)
+            if symbol is None:
+                continue
+            if environment is not None and proc.source_range is not None:
+                environment.update(repr(_symbol_signature(symbol)).encode('utf-8'))
+                self.check_procedure_cached(proc, environment.hexdigest())
+            else:
+                self.check_procedure_body(proc, symbol)
+
+        self.visit(block.instructions)
+
+    # ==================== Definitions ====================
+
+    def visit_ConstantDefNode(self, node):
+        """فحص تعريف ثابت - Check constant definition"""
+        const_node = self.visit(node.value_node)
+
+        if self.symbol_table.is_defined(node.name):
+            self.add_error(f"الثابت '{node.name}' معرّف مسبقاً", node)
+            return None
+
+        data_type = None
+        value = None
+        if hasattr(const_node, 'expr_type') and const_node.expr_type is not None:
+            data_type = const_node.expr_type
+        if hasattr(const_node, 'value'):
+            value = const_node.value
+
+        self.symbol_table.insert(Symbol(
+            name=node.name,
+            symbol_type='CONSTANT',
+            data_type=data_type,
+            value=value,
+            is_constant=True
+        ))
+        return node
+
+    def visit_TypeDefNode(self, node):
+        """فحص تعريف نوع - Check type definition"""
+        if self.symbol_table.is_defined(node.name):
+            self.add_error(f"النوع '{node.name}' معرّف مسبقاً", node)
+            return None
+
+        type_spec = node.type_spec
+        if isinstance(type_spec, TypeInfo) and type_spec.is_list:
+            if not self.symbol_table.lookup_type(type_spec.base_type):
+                self.add_error(f"النوع '{type_spec.base_type}' غير معرّف", node)
+
+        self.symbol_table.insert(Symbol(
+            name=node.name,
+            symbol_type='TYPE',
+            data_type=type_spec
+        ))
+        return node
+
+    def visit_VarDeclNode(self, node):
+        """فحص تعريف متغيرات - Check variables group"""
+        data_type = self.symbol_table.lookup_type(node.data_type)
+        if not data_type:
+            self.add_error(f"النوع '{node.data_type}' غير معرّف", node)
+            data_type = TypeInfo('صحيح')  # Default fallback
+
+        for name in node.names:
+            if self.symbol_table.lookup(name, current_scope_only=True):
+                self.add_error(f"المتغير '{name}' معرّف مسبقاً في هذا النطاق", node)
+                continue
+            self.symbol_table.insert(Symbol(
+                name=name,
+                symbol_type='VARIABLE',
+                data_type=data_type
+            ))
+        return node
+
+    # ==================== Procedures ====================
+
+    def declare_procedure(self, node):
+        """تسجيل إجراء في جدول الرموز - Register a procedure symbol"""
+        if self.symbol_table.lookup(node.name, current_scope_only=True):
+            self.add_error(f"الإجراء '{node.name}' معرّف مسبقاً", node)
+            return None
+
+        params = []
+        for param_node in node.params:
+            data_type = self.symbol_table.lookup_type(param_node.data_type)
+            if not data_type:
+                self.add_error(f"النوع '{param_node.data_type}' غير معرّف", param_node)
+                data_type = TypeInfo(param_node.data_type)
+            for name in param_node.names:
+                params.append(ParamSymbol(
+                    name=name,
+                    data_type=data_type,
+                    pass_mode=param_node.pass_mode
+                ))
+
+        symbol = Symbol(
+            name=node.name,
+            symbol_type='PROCEDURE',
+            params=params
+        )
+        self.symbol_table.insert(symbol)
+        return symbol
+
+    def check_procedure_body(self, node, symbol):
+        """فحص جسم إجراء في نطاق جديد - Check a procedure body in its own scope"""
+        self.symbol_table.enter_scope()
+        self.current_procedure = node.name
+        for param in symbol.params:
+            self.symbol_table.insert(Symbol(
+                name=param.name,
+                symbol_type='PARAMETER',
+                data_type=param.data_type
+            ))
+        self.check_block(node.block)
+        self.symbol_table.exit_scope()
+        self.current_procedure = None
+        self.procedures_checked += 1
+
+    def visit_ProcedureDefNode(self, node):
+        """فحص إجراء متداخل - Check a nested procedure"""
+        symbol = self.declare_procedure(node)
+        if symbol is not None:
+            self.check_procedure_body(node, symbol)
+        return node
+
+    def check_procedure_cached(self, node, environment):
+        """فحص إجراء عبر الذاكرة المؤقتة - Check a top-level procedure through the cache"""
+        start, stop = node.source_range
+        digest = hashlib.sha256()
+        digest.update(environment.encode('ascii'))
+        digest.update(str(node.column).encode('ascii'))
+        digest.update(b'\0')
+        digest.update(self.source_code[start:stop].encode('utf-8'))
+        key = digest.hexdigest()
+
+        entry = self.procedure_cache.get(key)
+        if entry is not None:
+            block, line, errors = entry
+            if line == node.line:
+                # نفس الموضع: إعادة استخدام الكتلة المفحوصة كما هي
+                node.block = block
+            else:
+                # انزاحت الأسطر: نقل الأنواع إلى العقد الجديدة
+                for expr, cached_expr in zip(iter_expressions(node.block), iter_expressions(block)):
+                    expr.expr_type = cached_expr.expr_type
+                self.procedure_cache.put(key, (node.block, node.line, errors))
+            for message, line_offset, column in errors:
+                line = node.line + line_offset if line_offset is not None else None
+                self.errors.append(SemanticError(message, line, column))
+            self.procedures_reused += 1
+            return
+
+        first_error = len(self.errors)
+        self.check_procedure_body(node, self.symbol_table.lookup(node.name))
+        errors = [
+            (error.message, error.line - node.line if error.line is not None else None, error.column)
+            for error in self.errors[first_error:]
+        ]
+        self.procedure_cache.put(key, (node.block, node.line, errors))
+
+    # ==================== Statements ====================
+
+    def visit_CompoundStmtNode(self, node):
+        for statement in node.statements:
+            self.visit(statement)
+        return node
+
+    def visit_AssignmentNode(self, node):
+        variable = self.visit(node.variable)
+        expression = self.visit(node.expression)
+
+        if variable and expression:
+            var_type = variable.expr_type
+            expr_type = expression.expr_type
+            if var_type and expr_type:
+                if not TypeChecker.are_compatible(expr_type, var_type):
+                    self.add_error(
+                        f"عدم توافق الأنواع في الإسناد: لا يمكن إسناد {expr_type} إلى {var_type}",
+                        node
+                    )
+        return node
+
+    def visit_InputNode(self, node):
+        self.visit(node.variable)
+        return node
+
+    def visit_OutputNode(self, node):
+        for item in node.items:
+            self.visit(item)
+        return node
+
+    def visit_CallNode(self, node):
+        proc_name = node.procedure_name
+        if not self.symbol_table.is_procedure(proc_name):
+            self.add_error(f"الإجراء '{proc_name}' غير معرّف", node)
+            return None
+
+        arguments = [arg for arg in (self.visit(arg) for arg in node.arguments) if arg]
+        expected_params = self.symbol_table.get_procedure_params(proc_name)
+
+        if len(arguments) != len(expected_params):
+            self.add_error(
+                f"عدد المعاملات غير صحيح للإجراء '{proc_name}': "
+                f"متوقع {len(expected_params)}، موجود {len(arguments)}",
+                node
+            )
+        else:
+            for i, (arg, param) in enumerate(zip(arguments, expected_params)):
+                if hasattr(arg, 'expr_type') and arg.expr_type:
+                    if not TypeChecker.are_compatible(arg.expr_type, param.data_type):
+                        self.add_error(
+                            f"عدم توافق النوع للمعامل {i+1} في استدعاء '{proc_name}'",
+                            node
+                        )
+        return node
+
+    # ==================== Control Flow ====================
+
+    def visit_IfNode(self, node):
+        condition = self.visit(node.condition)
+        self.visit(node.then_stmt)
+
+        if condition and hasattr(condition, 'expr_type'):
+            if not TypeChecker.is_boolean(condition.expr_type):
+                self.add_error("الشرط يجب أن يكون من نوع منطقي", node)
+
+        for elif_cond, elif_stmt in node.elif_parts:
+            self.visit(elif_cond)
+            self.visit(elif_stmt)
+        self.visit(node.else_stmt)
+        return node
+
+    def visit_ForLoopNode(self, node):
+        start_expr = self.visit(node.start_expr)
+        end_expr = self.visit(node.end_expr)
+        self.visit(node.step_expr)
+
+        if not self.symbol_table.is_variable(node.loop_var):
+            self.add_error(f"متغير الحلقة '{node.loop_var}' غير معرّف", node)
+
+        if start_expr and hasattr(start_expr, 'expr_type'):
+            if not TypeChecker.is_numeric(start_expr.expr_type):
+                self.add_error("قيمة البداية يجب أن تكون رقمية", node)
+
+        if end_expr and hasattr(end_expr, 'expr_type'):
+            if not TypeChecker.is_numeric(end_expr.expr_type):
+                self.add_error("قيمة النهاية يجب أن تكون رقمية", node)
+
+        self.visit(node.body)
+        return node
+
+    def visit_WhileLoopNode(self, node):
+        condition = self.visit(node.condition)
+        self.visit(node.body)
+
+        if condition and hasattr(condition, 'expr_type'):
+            if not TypeChecker.is_boolean(condition.expr_type):
+                self.add_error("شرط الحلقة يجب أن يكون من نوع منطقي", node)
+        return node
+
+    def visit_RepeatUntilNode(self, node):
+        self.visit(node.body)
+        condition = self.visit(node.condition)
+
+        if condition and hasattr(condition, 'expr_type'):
+            if not TypeChecker.is_boolean(condition.expr_type):
+                self.add_error("شرط الحلقة يجب أن يكون من نوع منطقي", node)
+        return node
+
+    # ==================== Expressions ====================
+
+    def visit_BinOpNode(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        operator = node.operator
+
+        result_type = None
+        if left and right and hasattr(left, 'expr_type') and hasattr(right, 'expr_type'):
+            result_type = TypeChecker.get_result_type(operator, left.expr_type, right.expr_type)
+            if not result_type:
+                self.add_error(f"عملية غير صالحة: {operator} بين {left.expr_type} و {right.expr_type}", node)
+                if operator in _RELATIONAL_OPERATORS:
+                    result_type = TypeInfo('منطقي')  # Default
+        node.expr_type = result_type
+        return node
+
+    def visit_UnaryOpNode(self, node):
+        operand = self.visit(node.operand)
+
+        if node.operator == '!':
+            if operand and hasattr(operand, 'expr_type'):
+                if not TypeChecker.is_boolean(operand.expr_type):
+                    self.add_error("عملية النفي (!) تحتاج نوع منطقي", node)
+            node.expr_type = TypeInfo('منطقي')
+            return node
+
+        # Sign: the analyzer drops the sign when its operand was dropped
+        if not operand:
+            return None
+        if hasattr(operand, 'expr_type') and not TypeChecker.is_numeric(operand.expr_type):
+            self.add_error(f"لا يمكن تطبيق علامة {node.operator} على نوع غير رقمي", node)
+        node.expr_type = getattr(operand, 'expr_type', None)
+        return node
+
+    def visit_VarAccessNode(self, node):
+        var_name = node.name
+        if not self.symbol_table.is_defined(var_name):
+            self.add_error(f"المتغير '{var_name}' غير معرّف", node)
+            return None
+
+        var_type = self.symbol_table.get_type(var_name)
+        selector = node.selector
+
+        if isinstance(selector, IndexedSelectorNode):
+            index_expr = self.visit(selector.index_expr)
+            if index_expr and hasattr(index_expr, 'expr_type'):
+                if not TypeChecker.is_numeric(index_expr.expr_type):
+                    self.add_error("الفهرس يجب أن يكون رقمياً", selector)
+            if not var_type or not var_type.is_list:
+                self.add_error(f"'{var_name}' ليس قائمة", node)
+            else:
+                var_type = self.symbol_table.lookup_type(var_type.base_type)
+
+        elif isinstance(selector, FieldSelectorNode):
+            if not var_type or not var_type.is_record:
+                self.add_error(f"'{var_name}' ليس سجلاً", node)
+            elif selector.field_name not in var_type.fields:
+                self.add_error(f"الحقل '{selector.field_name}' غير موجود في السجل", node)
+            else:
+                var_type = var_type.fields[selector.field_name]
+
+        node.expr_type = var_type
+        return node
+
+    def visit_ConstantRefNode(self, node):
+        const_name = node.name
+        if not self.symbol_table.is_constant(const_name):
+            self.add_error(f"الثابت '{const_name}' غير معرّف", node)
+            return None
+        node.expr_type = self.symbol_table.get_type(const_name)
+        return node
+
+    def visit_LiteralNode(self, node):
+        literal_type = node.literal_type
+        node.expr_type = self.symbol_table.lookup_type(literal_type) or TypeInfo(literal_type)
+        return node
+
+
+# الذاكرة الافتراضية المستخدمة من الدوال المساعدة
+# Default cache used by the get_*_analysis helpers
+default_check_cache = ProcedureCheckCache()